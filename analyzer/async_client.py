@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 OpenRouter 분석 클라이언트 (asyncio + aiohttp)
+ - 분당 요청 수(RPM) / 분당 토큰 수(TPM) 토큰 버킷을 모든 호출이 공유
+ - 동시 호출 수는 세마포어로 제한
+ - 429 / 5xx 응답은 Retry-After 를 우선 따르고, 없으면 지터를 넣은 지수 백오프로 재시도
+ - OpenRouter 장애(연결 오류/5xx)가 이어지면 gpt_analyzer 와 같은 서킷 브레이커가 열려 바로 CircuitOpen
+ - gather 형태의 일괄 API 제공
+ - 긴 기사는 analyze_bias 와 같은 방식으로 조각별 분석 후 종합 (조각 호출도 같은 한도 공유)
+
+사용 예:
+    from analyzer.async_client import analyze_many
+    results = analyze_many(texts)        # 실패한 항목은 예외 객체로 반환
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+
+import aiohttp
+
+from analyzer import gpt_analyzer
+from analyzer.chunking import chunk_text
+from analyzer.gpt_analyzer import (
+    ANALYSIS_CHUNK_TOKENS,
+    ANALYSIS_MERGE_FANIN,
+    PROMPT_VERSION,
+    build_chunk_prompt,
+    build_headers,
+    build_merge_prompt,
+    build_payload,
+    build_prompt,
+    estimate_tokens,
+    merge_groups,
+)
+from analyzer.metrics import record_usage
+from analyzer.result_cache import get_result_cache, make_key
+from analyzer.result_model import AnalysisResult
+from analyzer.scheduler import get_breaker
+
+OPENROUTER_RPM = float(os.getenv("OPENROUTER_RPM", "60"))
+OPENROUTER_TPM = float(os.getenv("OPENROUTER_TPM", "200000"))
+OPENROUTER_MAX_CONCURRENCY = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "8"))
+OPENROUTER_MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "5"))
+OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "60"))
+# 응답 토큰 예산 (TPM 계산용 추정치)
+EXPECTED_COMPLETION_TOKENS = int(os.getenv("EXPECTED_COMPLETION_TOKENS", "600"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class AsyncTokenBucket:
+    """초당 rate 만큼 채워지는 용량 capacity 의 토큰 버킷 (대기자는 도착 순서대로 처리)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        # 용량보다 큰 요청은 용량만큼만 요구 (영원히 못 받는 상황 방지)
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """요청 수 + 토큰 수 두 개의 버킷을 함께 사용"""
+
+    def __init__(self, rpm: float = OPENROUTER_RPM, tpm: float = OPENROUTER_TPM):
+        self.requests = AsyncTokenBucket(rpm / 60.0, max(1.0, rpm / 60.0 * 5))
+        self.tokens = AsyncTokenBucket(tpm / 60.0, tpm / 60.0 * 5)
+
+    async def acquire(self, tokens: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+def _retry_after(headers) -> float:
+    value = headers.get("Retry-After")
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return 0.0
+
+
+class AsyncOpenRouterClient:
+    """
+    async with AsyncOpenRouterClient() as client:
+        result = await client.analyze(text)
+        results = await client.analyze_many(texts)
+    """
+
+    def __init__(self, rpm=OPENROUTER_RPM, tpm=OPENROUTER_TPM,
+                 max_concurrency=OPENROUTER_MAX_CONCURRENCY, max_retries=OPENROUTER_MAX_RETRIES,
+                 base_delay=1.0, max_delay=60.0, timeout=OPENROUTER_TIMEOUT, use_cache=True):
+        self.limiter = RateLimiter(rpm, tpm)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.use_cache = use_cache and gpt_analyzer.RESULT_CACHE_ENABLED
+        self._semaphore = asyncio.BoundedSemaphore(max_concurrency)
+        self._session = None
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "cache_hits": 0, "failures": 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _backoff(self, attempt: int, retry_after: float) -> float:
+        if retry_after:
+            # 서버가 알려준 대기 시간 + 약간의 지터 (동시에 몰리지 않도록)
+            return retry_after + random.uniform(0, self.base_delay)
+        # full jitter: 0 ~ min(max_delay, base * 2^attempt)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _post(self, prompt: str, structured: bool = False) -> str:
+        extra = gpt_analyzer.structured_options(structured)
+        body = json.dumps(build_payload(prompt, **extra), ensure_ascii=False).encode("utf-8")
+        tokens = estimate_tokens(prompt) + EXPECTED_COMPLETION_TOKENS
+        attempt = 0
+        structured_retry = False
+        breaker = get_breaker(gpt_analyzer.OPENROUTER_BREAKER)
+        while True:
+            await self.limiter.acquire(tokens)
+            async with self._semaphore:
+                # 동기 호출(gpt_analyzer)과 같은 브레이커: 열려 있으면 요청 없이 바로 CircuitOpen
+                breaker.before()
+                self.stats["calls"] += 1
+                reported = False    # 이번 시도 결과를 브레이커에 알렸는지 (취소 등으로 끝나도 한 번은 알려야 함)
+                try:
+                    async with self._session.post(
+                        gpt_analyzer.OPENROUTER_URL, data=body, headers=build_headers()
+                    ) as resp:
+                        reported = True
+                        if resp.status >= 500:
+                            breaker.failure()
+                        else:
+                            breaker.success()
+                        if resp.status < 400:
+                            if structured_retry:
+                                # 옵션을 빼자 성공 → 이 모델은 구조화 출력 미지원
+                                gpt_analyzer.mark_structured_unsupported()
+                            data = await resp.json(content_type=None)
+                            record_usage(data.get("usage"), gpt_analyzer.MODEL_NAME)
+                            return data["choices"][0]["message"]["content"]
+                        if extra and resp.status == 400:
+                            # 구조화 출력 미지원일 수 있음 → 옵션 없이 바로 재요청 (재시도 횟수에 넣지 않음)
+                            # 오류가 옵션을 지목했거나 재요청이 성공했을 때만 미지원으로 기억
+                            if gpt_analyzer.names_structured_option(await resp.text()):
+                                gpt_analyzer.mark_structured_unsupported()
+                            structured_retry = True
+                            extra = {}
+                            body = json.dumps(build_payload(prompt), ensure_ascii=False).encode("utf-8")
+                            continue
+                        if resp.status not in RETRY_STATUS or attempt >= self.max_retries:
+                            text = await resp.text()
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, resp.history,
+                                status=resp.status, message=text[:300], headers=resp.headers,
+                            )
+                        if resp.status == 429:
+                            self.stats["rate_limited"] += 1
+                        delay = self._backoff(attempt, _retry_after(resp.headers))
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if not reported:
+                        breaker.failure()
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt, 0.0)
+                except BaseException:
+                    # 취소(CancelledError) 등: 시험 요청이 결과 없이 사라지면 브레이커가 HALF_OPEN 에 묶임
+                    if not reported:
+                        breaker.failure()
+                    raise
+            # 세마포어를 반납한 뒤에 대기해야 다른 호출이 막히지 않음
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def _final_prompt(self, text: str) -> str:
+        chunks = chunk_text(text, ANALYSIS_CHUNK_TOKENS)
+        if len(chunks) <= 1:
+            return build_prompt(text, structured=True)
+        n = len(chunks)
+        partials = await asyncio.gather(
+            *(self._post(build_chunk_prompt(c, i, n)) for i, c in enumerate(chunks, 1))
+        )
+        while len(partials) > ANALYSIS_MERGE_FANIN:
+            partials = await asyncio.gather(
+                *(self._post(build_merge_prompt(g)) for g in merge_groups(partials))
+            )
+        return build_merge_prompt(partials, structured=True)
+
+    async def analyze(self, text: str) -> AnalysisResult:
+        """analyze_bias 와 같은 프롬프트/결과 형식 (결과 캐시도 공유)"""
+        if self._session is None:
+            raise RuntimeError("use 'async with AsyncOpenRouterClient()'")
+        key = None
+        if self.use_cache:
+            key = make_key(gpt_analyzer.MODEL_NAME, PROMPT_VERSION, text)
+            cached = get_result_cache().get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return AnalysisResult.parse(cached)
+        try:
+            result = AnalysisResult.parse(await self._post(await self._final_prompt(text), structured=True))
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        if key is not None:
+            get_result_cache().set(key, result.to_json(), model=gpt_analyzer.MODEL_NAME)
+        return result
+
+    async def analyze_many(self, texts, return_exceptions: bool = True) -> list:
+        """입력 순서대로 결과 목록 반환 (return_exceptions=True 면 실패는 예외 객체로)"""
+        return await asyncio.gather(
+            *(self.analyze(t) for t in texts), return_exceptions=return_exceptions
+        )
+
+
+async def analyze_many_async(texts, return_exceptions: bool = True, **client_kwargs) -> list:
+    async with AsyncOpenRouterClient(**client_kwargs) as client:
+        return await client.analyze_many(texts, return_exceptions=return_exceptions)
+
+
+def analyze_many(texts, return_exceptions: bool = True, **client_kwargs) -> list:
+    """동기 코드에서 호출하는 일괄 분석 진입점"""
+    return asyncio.run(analyze_many_async(texts, return_exceptions, **client_kwargs))
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+대량 URL 일괄 분석기
+ - URL 목록 파일을 읽어 기사 수집 + 편향 분석을 동시에 수행
+ - 수집: 전체 동시성 + 호스트별 동시성 상한
+ - 분석 전 본문 정리(normalize.py)로 중복/잡음 문장 제거
+ - 이미 분석한 기사와 거의 같으면 결과 재사용 / 달라진 문장만 분석 (dedup.py)
+ - --triage: 로컬 사전 분류기가 확신하는 저위험 기사는 LLM 호출 생략 (triage.py)
+ - 분석 결과는 기록 저장소(history.py)에도 남겨서 앱의 기록/추이 화면에서 조회
+ - 분석: 별도의 LLM 동시성 상한
+ - 완료되는 순서대로 결과를 JSONL 로 스트리밍 기록
+ - URL 단위 실패는 기록만 하고 전체 실행은 계속
+
+사용 예:
+    python -m analyzer.batch urls.txt -o results.jsonl --per-host 4 --llm-workers 4
+    python -m analyzer.batch urls.txt -o results.jsonl --metrics batch.prom
+    python -m analyzer.batch urls.txt -o results.jsonl --include-text   # 사전 분류기 학습 데이터
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from analyzer.canonical import article_key
+from analyzer.crawler_auto import get_article_text
+from analyzer.dedup import analyze_with_dedup
+from analyzer.history import record_analysis
+from analyzer.metrics import write_textfile
+from analyzer.normalize import normalize_article
+from analyzer.triage import get_triage_model, needs_llm
+
+BATCH_CRAWL_WORKERS = int(os.getenv("BATCH_CRAWL_WORKERS", "16"))
+BATCH_PER_HOST = int(os.getenv("BATCH_PER_HOST", "4"))
+BATCH_LLM_WORKERS = int(os.getenv("BATCH_LLM_WORKERS", "4"))
+MIN_ARTICLE_LENGTH = 200
+
+
+def read_urls(path: str) -> list:
+    """한 줄에 URL 하나 (빈 줄, '#' 주석 무시, 같은 기사는 한 번만)"""
+    with open(path, encoding="utf-8") as f:
+        return unique_articles(f)
+
+
+def unique_articles(lines) -> list:
+    """같은 기사 키(모바일/AMP/추적 파라미터 변형 포함)는 첫 URL 만 남김"""
+    urls = {}
+    for line in lines:
+        u = line.strip()
+        if u and not u.startswith("#"):
+            urls.setdefault(article_key(u), u)
+    return list(urls.values())
+
+
+class JsonlWriter:
+    """여러 스레드에서 한 줄씩 안전하게 기록 (줄마다 flush)"""
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._fp.write(line + "\n")
+            self._fp.flush()
+
+
+def _host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _crawl(url: str) -> dict:
+    start = time.perf_counter()
+    record = {"url": url, "host": _host_of(url), "ok": False, "fetched_at": round(time.time(), 3)}
+    try:
+        article = get_article_text(url)
+    except Exception as e:
+        article = f"__ERROR__: {e}"
+    record["crawl_seconds"] = round(time.perf_counter() - start, 3)
+    if not article or article.startswith("__ERROR__") or len(article) < MIN_ARTICLE_LENGTH:
+        record["stage"] = "crawl"
+        record["error"] = article[:300] if article else "empty article"
+        return record
+    record["text"] = article
+    return record
+
+
+def _analyze(record: dict, include_text: bool = False, triage=None) -> dict:
+    start = time.perf_counter()
+    article = record.pop("text")
+    record["text_length"] = len(article)
+    try:
+        cleaned = normalize_article(article, record["url"])
+        record["normalized_length"] = len(cleaned.text)
+        record["tokens_saved"] = cleaned.tokens_saved
+        if include_text:
+            record["text"] = cleaned.text
+        if triage is not None:
+            score = triage.score([cleaned.text])[0]
+            record["triage"] = {"risk": score.risk, "confidence": round(score.confidence, 3)}
+            if not needs_llm(score):
+                record["ok"] = True
+                record["llm_skipped"] = True
+                return record
+        outcome = analyze_with_dedup(cleaned.text, record["url"])
+        record["result"] = outcome.result.to_dict()
+        record["dedup"] = outcome.status
+        if outcome.match is not None:
+            record["duplicate_of"] = outcome.match.url
+        record["ok"] = True
+    except Exception as e:
+        record["stage"] = "analyze"
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+    finally:
+        record["analyze_seconds"] = round(time.perf_counter() - start, 3)
+    # 기록 저장 실패가 이미 끝난(비용을 낸) 분석 결과를 실패로 만들지 않도록 따로 처리
+    try:
+        record_analysis(record["url"], cleaned.text, outcome.result,
+                        fetched_at=record.get("fetched_at"), status=outcome.status)
+    except Exception as e:
+        print(f"분석 기록 저장 실패 ({record['url']}): {type(e).__name__}: {e}", file=sys.stderr)
+    return record
+
+
+def run_batch(urls, out, crawl_workers=BATCH_CRAWL_WORKERS, per_host=BATCH_PER_HOST,
+              llm_workers=BATCH_LLM_WORKERS, analyze=True, on_record=None,
+              include_text=False, triage=False) -> dict:
+    """
+    URL 목록을 수집/분석하여 out(파일 객체 또는 경로)에 JSONL 로 기록한다.
+    on_record 가 주어지면 각 결과 레코드를 완료 시점에 콜백으로도 전달한다.
+    include_text: 정리된 본문도 기록 (사전 분류기 학습용)
+    triage: 저장된 사전 분류기로 확신하는 저위험 기사는 LLM 분석 생략
+    반환값: {"total", "ok", "failed", "seconds"} 요약
+    """
+    if isinstance(out, str):
+        with open(out, "w", encoding="utf-8") as fp:
+            return run_batch(urls, fp, crawl_workers, per_host, llm_workers, analyze, on_record,
+                             include_text, triage)
+
+    crawl_workers, per_host, llm_workers = max(1, crawl_workers), max(1, per_host), max(1, llm_workers)
+    triage_model = get_triage_model() if triage else None
+    if triage and triage_model is None:
+        print("사전 분류기 모델이 없어 --triage 없이 진행합니다 (python -m analyzer.triage train)", file=sys.stderr)
+    writer = JsonlWriter(out)
+    summary = {"total": 0, "ok": 0, "failed": 0}
+    started = time.perf_counter()
+
+    def emit(record):
+        summary["ok" if record["ok"] else "failed"] += 1
+        writer.write(record)
+        if on_record:
+            on_record(record)
+
+    # 호스트별 대기열 (라운드로빈으로 채워서 한 언론사가 워커를 독점하지 않도록)
+    pending = {}
+    for u in urls:
+        pending.setdefault(_host_of(u), deque()).append(u)
+        summary["total"] += 1
+    inflight = {host: 0 for host in pending}
+    # 수집은 끝났지만 분석을 기다리는 본문이 무한정 쌓이지 않도록 상한
+    max_waiting = llm_workers * 4
+
+    crawl_pool = ThreadPoolExecutor(max_workers=crawl_workers, thread_name_prefix="crawl")
+    llm_pool = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm")
+    crawl_futs = {}
+    llm_futs = set()
+    try:
+        while pending or crawl_futs or llm_futs:
+            # ① 호스트별/전체 상한 안에서 수집 작업 채우기
+            progressed = True
+            while progressed and len(crawl_futs) < crawl_workers and len(llm_futs) < max_waiting:
+                progressed = False
+                for host in list(pending):
+                    if len(crawl_futs) >= crawl_workers:
+                        break
+                    if inflight[host] >= per_host:
+                        continue
+                    url = pending[host].popleft()
+                    if not pending[host]:
+                        del pending[host]
+                    inflight[host] += 1
+                    crawl_futs[crawl_pool.submit(_crawl, url)] = host
+                    progressed = True
+
+            if not crawl_futs and not llm_futs:
+                continue
+
+            done, _ = wait(set(crawl_futs) | llm_futs, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in llm_futs:
+                    llm_futs.discard(fut)
+                    emit(fut.result())
+                    continue
+                inflight[crawl_futs.pop(fut)] -= 1
+                record = fut.result()
+                if "error" in record:
+                    emit(record)
+                elif analyze:
+                    llm_futs.add(llm_pool.submit(_analyze, record, include_text, triage_model))
+                else:
+                    text = record.pop("text")
+                    record["text_length"] = len(text)
+                    if include_text:
+                        record["text"] = text
+                    record["ok"] = True
+                    emit(record)
+    finally:
+        crawl_pool.shutdown(wait=True, cancel_futures=True)
+        llm_pool.shutdown(wait=True, cancel_futures=True)
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="뉴스 기사 URL 목록 일괄 수집/분석")
+    parser.add_argument("input", help="URL 목록 파일 (한 줄에 하나, '-' 이면 stdin)")
+    parser.add_argument("-o", "--output", default="-", help="결과 JSONL 경로 (기본: stdout)")
+    parser.add_argument("--crawl-workers", type=int, default=BATCH_CRAWL_WORKERS)
+    parser.add_argument("--per-host", type=int, default=BATCH_PER_HOST)
+    parser.add_argument("--llm-workers", type=int, default=BATCH_LLM_WORKERS)
+    parser.add_argument("--no-analyze", action="store_true", help="본문 수집만 수행")
+    parser.add_argument("--include-text", action="store_true", help="정리된 본문도 기록 (사전 분류기 학습용)")
+    parser.add_argument("--triage", action="store_true", help="사전 분류기가 확신하는 저위험 기사는 LLM 생략")
+    parser.add_argument("--metrics", help="종료 시 단계별 지표를 Prometheus 텍스트 포맷으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        urls = unique_articles(sys.stdin)
+    else:
+        urls = read_urls(args.input)
+
+    kwargs = dict(
+        crawl_workers=args.crawl_workers,
+        per_host=args.per_host,
+        llm_workers=args.llm_workers,
+        analyze=not args.no_analyze,
+        include_text=args.include_text,
+        triage=args.triage,
+    )
+    if args.output == "-":
+        summary = run_batch(urls, sys.stdout, **kwargs)
+    else:
+        summary = run_batch(urls, args.output, **kwargs)
+    if args.metrics:
+        write_textfile(args.metrics)
+
+    print(
+        f"완료: 전체 {summary['total']} / 성공 {summary['ok']} / 실패 {summary['failed']} "
+        f"({summary['seconds']}s)",
+        file=sys.stderr,
+    )
+    return 0 if summary["failed"] < summary["total"] or not summary["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
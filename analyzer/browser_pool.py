@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Headless Chrome WebDriver 풀
+ - 미리 띄워 둔 브라우저를 임대(lease)/반납하여 기사마다 콜드 스타트를 피함
+ - 임대 시 헬스 체크, N 페이지 처리 후 또는 크래시 시 재생성
+ - 브라우저마다 탭 하나를 계속 재사용
+ - 유휴 시간이 지난 브라우저는 백그라운드에서 정리
+ - 임대 대기 시간 / 재시작 횟수 등 지표 제공
+"""
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+CHROME_POOL_SIZE = int(os.getenv("CHROME_POOL_SIZE", "2"))
+CHROME_MAX_PAGES = int(os.getenv("CHROME_MAX_PAGES", "50"))          # 이 횟수만큼 쓰면 재생성
+CHROME_IDLE_TIMEOUT = float(os.getenv("CHROME_IDLE_TIMEOUT", "300"))  # 초
+CHROME_LEASE_TIMEOUT = float(os.getenv("CHROME_LEASE_TIMEOUT", "60")) # 초
+
+
+def _chrome_options():
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_opts = Options()
+    chrome_opts.add_argument("--headless=new")
+    chrome_opts.add_argument("--disable-gpu")
+    chrome_opts.add_argument("--no-sandbox")
+    chrome_opts.add_argument("--log-level=3")
+    chrome_opts.add_argument("--window-size=1280,2000")
+    # DOMContentLoaded 까지만 기다림 (광고/이미지 로딩 대기 X)
+    chrome_opts.page_load_strategy = "eager"
+    return chrome_opts
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "pages", "last_used")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.last_used = time.monotonic()
+
+
+class ChromePool:
+    """제한된 개수의 WebDriver 를 공유하는 풀"""
+
+    def __init__(self, size=CHROME_POOL_SIZE, max_pages=CHROME_MAX_PAGES,
+                 idle_timeout=CHROME_IDLE_TIMEOUT, lease_timeout=CHROME_LEASE_TIMEOUT):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+        self.lease_timeout = lease_timeout
+
+        self._idle = []       # 반납된 _PooledDriver (LIFO: 최근 사용한 것이 가장 따뜻함)
+        self._total = 0       # 생성되어 살아 있는 드라이버 수 (임대 중 포함)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._driver_path = None
+        self._reaper = None
+
+        self._stats = {
+            "leases": 0,
+            "lease_wait_total": 0.0,
+            "lease_wait_max": 0.0,
+            "created": 0,
+            "restarts": 0,
+            "recycled": 0,
+            "idle_reaped": 0,
+        }
+
+    # ---------- 드라이버 생성/종료 ----------
+    def _create_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        if self._driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            self._driver_path = ChromeDriverManager().install()
+        driver = webdriver.Chrome(service=Service(self._driver_path), options=_chrome_options())
+        with self._cond:
+            self._stats["created"] += 1
+        self._start_reaper()
+        return _PooledDriver(driver)
+
+    @staticmethod
+    def _quit(item):
+        try:
+            item.driver.quit()
+        except Exception:
+            pass
+
+    def _discard(self, item, stat):
+        self._quit(item)
+        with self._cond:
+            self._total -= 1
+            self._stats[stat] += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(item) -> bool:
+        try:
+            return bool(item.driver.window_handles)
+        except Exception:
+            return False
+
+    # ---------- 유휴 정리 ----------
+    def _start_reaper(self):
+        if self._reaper is not None or self.idle_timeout <= 0:
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="chrome-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self):
+        while not self._closed:
+            time.sleep(max(1.0, self.idle_timeout / 2))
+            self.reap_idle()
+
+    def reap_idle(self) -> int:
+        """idle_timeout 이상 쉬고 있는 드라이버 종료"""
+        now = time.monotonic()
+        with self._cond:
+            expired = [it for it in self._idle if now - it.last_used >= self.idle_timeout]
+            self._idle = [it for it in self._idle if it not in expired]
+        for item in expired:
+            self._discard(item, "idle_reaped")
+        return len(expired)
+
+    # ---------- 임대/반납 ----------
+    def _acquire(self):
+        start = time.monotonic()
+        deadline = start + self.lease_timeout
+        create = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("ChromePool is closed")
+                if self._idle:
+                    item = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    item, create = None, True
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("ChromePool lease timed out")
+                self._cond.wait(remaining)
+
+        if not create and not self._is_healthy(item):
+            # 죽은 브라우저 → 같은 슬롯에서 새로 기동
+            self._quit(item)
+            with self._cond:
+                self._stats["restarts"] += 1
+            create = True
+
+        if create:
+            try:
+                item = self._create_driver()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._stats["leases"] += 1
+            self._stats["lease_wait_total"] += waited
+            self._stats["lease_wait_max"] = max(self._stats["lease_wait_max"], waited)
+        return item
+
+    def _release(self, item):
+        item.pages += 1
+        item.last_used = time.monotonic()
+        if self._closed or (self.max_pages and item.pages >= self.max_pages):
+            self._discard(item, "recycled")
+            return
+        try:
+            # 같은 탭을 재사용하되 이전 페이지의 메모리는 비움
+            item.driver.get("about:blank")
+        except Exception:
+            self._discard(item, "restarts")
+            return
+        with self._cond:
+            self._idle.append(item)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self):
+        """with pool.lease() as driver: ... 형태로 드라이버 임대"""
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
+        item = self._acquire()
+        try:
+            yield item.driver
+        except TimeoutException:
+            # 요소 대기 실패는 브라우저 문제가 아님 → 정상 반납
+            self._release(item)
+            raise
+        except WebDriverException:
+            # 크래시/세션 끊김 → 폐기 후 다음 임대 때 새로 생성
+            self._discard(item, "restarts")
+            raise
+        except BaseException:
+            self._release(item)
+            raise
+        else:
+            self._release(item)
+
+    # ---------- 지표/종료 ----------
+    def metrics(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["alive"] = self._total
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._total - len(self._idle)
+        stats["lease_wait_avg"] = stats["lease_wait_total"] / stats["leases"] if stats["leases"] else 0.0
+        return stats
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for item in idle:
+            self._discard(item, "recycled")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_chrome_pool() -> ChromePool:
+    """프로세스 공용 Chrome 풀 (최초 호출 시 생성, 브라우저는 첫 임대 때 기동)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ChromePool()
+                atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+기사 URL 정규화 / 기사 키
+ - canonical_url(url): 실제로 요청할 대표 URL
+   · scheme/host 소문자, fragment·추적 파라미터 제거 (경로 대소문자는 유지: 조선 기사 ID 등)
+   · 모바일/AMP 호스트(m., amp., mnews. 등)와 AMP 경로(/amp, .amp.html, ?outputType=amp) → 일반 기사 URL
+   · Google AMP 캐시(*.cdn.ampproject.org) URL → 원래 기사 URL
+   · 언론사 규칙(publishers.py 의 article_id / article_url)이 있으면 기사 ID 만 남긴 URL 로 재구성
+ - article_key(url): 캐시·중복 제거·작업 큐에서 쓰는 안정적인 키
+   · 기사 ID 를 알 수 있으면 "언론사:ID" (예: "jtbc:12265505"), 아니면 canonical_url
+   · 같은 기사의 PC/모바일/AMP/추적 파라미터 변형이 모두 같은 키
+
+사용 예:
+    canonical_url("https://m.yna.co.kr/amp/view/AKR20251018000100001?utm_source=x")
+    → "https://www.yna.co.kr/view/AKR20251018000100001"
+    article_key("https://news.jtbc.co.kr/article/article.aspx?news_id=nb12265505")  → "jtbc:12265505"
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from analyzer.publishers import find_publisher
+
+_TRACKING_PREFIXES = ("utm_", "fbclid", "gclid", "igshid", "mc_", "_ga")
+_TRACKING_PARAMS = frozenset({"ref", "ref_src", "ocid", "cmpid"})
+# 이 첫 라벨을 가진 호스트는 언론사 대표 호스트로 바꿈 (m.hani.co.kr → www.hani.co.kr)
+_MOBILE_LABELS = frozenset({"m", "mobile", "amp", "mnews"})
+_AMP_PATH = re.compile(r"(?:/amp(?=/|$)|\.amp(?=\.html?$|$))", re.I)
+_AMP_CACHE_HOST = ".cdn.ampproject.org"
+_AMP_CACHE_PATH = re.compile(r"^/[cv]/(s/)?(.+)$")
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name.startswith(_TRACKING_PREFIXES) or name in _TRACKING_PARAMS
+
+
+def _is_amp_param(name: str, value: str) -> bool:
+    name = name.lower()
+    return name == "amp" or (name == "outputtype" and value.lower() == "amp")
+
+
+def _unwrap_amp_cache(parts):
+    """https://www-x-com.cdn.ampproject.org/c/s/www.x.com/a → https://www.x.com/a"""
+    m = _AMP_CACHE_PATH.match(parts.path)
+    if not m:
+        return parts
+    inner = ("https://" if m.group(1) else "http://") + m.group(2)
+    if parts.query:
+        inner += "?" + parts.query
+    return urlsplit(inner)
+
+
+@lru_cache(maxsize=65536)
+def canonical_url(url: str) -> str:
+    """요청/기록에 쓸 대표 URL (알 수 없는 사이트는 추적 파라미터·fragment 만 정리)"""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.endswith(_AMP_CACHE_HOST):
+        parts = _unwrap_amp_cache(parts)
+        host = (parts.hostname or "").lower()
+    scheme = parts.scheme.lower() or "https"
+    netloc = host if parts.port in (None, 80, 443) else f"{host}:{parts.port}"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+
+    spec = find_publisher(f"{scheme}://{host}/")
+    if spec is None:
+        return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+    # 등록된 언론사: https + 대표 호스트, AMP 경로/파라미터 제거
+    label, _, rest = host.partition(".")
+    if spec.canonical_host and (host in spec.hosts or (label in _MOBILE_LABELS and rest)):
+        netloc = spec.canonical_host
+    path = _AMP_PATH.sub("", parts.path) or "/"
+    query = [(k, v) for k, v in query if not _is_amp_param(k, v)]
+    article_id = _article_id(spec, path, query)
+    if article_id is None:
+        return urlunsplit(("https", netloc, path, urlencode(query), ""))
+    if spec.article_url:
+        return spec.article_url.format(id=article_id)
+    # 기사 ID 가 경로에 있는 언론사: 기사 페이지에는 쿼리가 필요 없음
+    return urlunsplit(("https", netloc, path, urlencode([(k, v) for k, v in query if k in spec.keep_params]), ""))
+
+
+def _article_id(spec, path: str, query) -> Optional[str]:
+    """
+    경로만으로 먼저 찾고 (경로 끝에 $ 로 고정된 규칙이 다른 쿼리 때문에 빗나가지 않도록),
+    없을 때만 "경로?쿼리" 에서 찾음 (KBS ncd=, SBS news_id= 처럼 ID 가 쿼리에 있는 언론사)
+    """
+    if spec.article_id_pattern is None:
+        return None
+    m = spec.article_id_pattern.search(path)
+    if m is None and query:
+        m = spec.article_id_pattern.search(path + "?" + urlencode(query))
+    return m.group(1) if m else None
+
+
+def article_key(url: str) -> str:
+    """같은 기사면 같은 값: "언론사:기사 ID", ID 규칙이 없거나 맞지 않으면 canonical_url"""
+    canonical = canonical_url(url)
+    spec = find_publisher(canonical)
+    if spec is not None and spec.article_id_pattern is not None:
+        parts = urlsplit(canonical)
+        article_id = _article_id(spec, parts.path, parse_qsl(parts.query, keep_blank_values=True))
+        if article_id is not None:
+            return f"{spec.name}:{article_id}"
+    return canonical
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+긴 기사 본문을 토큰 예산에 맞는 조각으로 나누기
+ - 문장 경계(마침표/물음표/느낌표, 한국어 종결 "다." 등)에서만 자름
+ - 한 문장이 예산보다 길면 그 문장만 글자 단위로 자름
+ - 조각 크기를 고르게 맞춰서 마지막 조각만 아주 짧아지는 일을 피함
+"""
+
+import math
+import re
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。…])[\"'”’)\]]*\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 대략 추정 (한글 등 비ASCII 는 글자당 1, ASCII 는 4글자당 1 — 넉넉하게 잡음)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return max(1, (len(text) - ascii_chars) + (ascii_chars + 3) // 4)
+
+
+def split_sentences(text: str) -> list:
+    """공백으로 끝나는 문장 경계 기준 분리 (구분 공백은 버림)"""
+    parts = []
+    start = 0
+    for m in _SENTENCE_END.finditer(text):
+        parts.append(text[start:m.start() + len(m.group(0).rstrip())])
+        start = m.end()
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _hard_split(sentence: str, max_tokens: int) -> list:
+    """
+    예산보다 긴 한 문장을 글자 단위로 자름.
+    estimate_tokens 와 같은 식을 ASCII/비ASCII 글자 수로 누적 계산 (글자마다 다시 세면 O(n²))
+    """
+    pieces = []
+    start = 0
+    ascii_chars = other_chars = 0   # 현재 조각의 ASCII / 비ASCII 글자 수
+    for i, ch in enumerate(sentence):
+        is_ascii = ord(ch) < 128
+        if i > start and (other_chars + (not is_ascii)) + (ascii_chars + is_ascii + 3) // 4 > max_tokens:
+            pieces.append(sentence[start:i])
+            start = i
+            ascii_chars = other_chars = 0
+        ascii_chars += is_ascii
+        other_chars += not is_ascii
+    if start < len(sentence):
+        pieces.append(sentence[start:])
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int) -> list:
+    """
+    text 를 문장 단위로 묶어 각 조각이 max_tokens 를 넘지 않게 나눈다.
+    전체가 예산 안이면 [text] 그대로 반환.
+    """
+    text = text.strip()
+    total = estimate_tokens(text)
+    if total <= max_tokens:
+        return [text] if text else []
+
+    sentences = []
+    for s in split_sentences(text):
+        if estimate_tokens(s) > max_tokens:
+            sentences.extend(_hard_split(s, max_tokens))
+        else:
+            sentences.append(s)
+
+    # 필요한 조각 수로 나눈 평균 크기를 목표로 채움 (최대 max_tokens)
+    target = min(max_tokens, math.ceil(total / math.ceil(total / max_tokens)))
+    chunks = []
+    current, current_tokens = [], 0
+    for s in sentences:
+        n = estimate_tokens(s)
+        if current and (current_tokens + n > max_tokens or current_tokens >= target):
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(s)
+        current_tokens += n
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
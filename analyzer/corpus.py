@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+말뭉치 단위 프레이밍 지표 (LLM 없이 대량 기사 통계)
+ - 감정적 표현 밀도, 인용/서술 비율, 유보(헤징)·단정 표현 빈도를 언론사별/일자별로 집계
+ - 사전(LEXICONS) 단어 출현을 문서 × 단어 희소 행렬로 한 번에 계산 (scikit-learn CountVectorizer)
+ - 문서 단위 특징 → 그룹 단위 합계는 희소 지시 행렬 곱 한 번으로 계산
+ - CORPUS_CHUNK_SIZE 건씩 나눠 처리하고 그룹 합계만 유지 → 메모리는 기사 수와 무관
+
+입력: batch --include-text (또는 --no-analyze --include-text) 로 만든 JSONL (text, url 필드)
+      date / published_at 필드가 있으면 그 날짜, 없으면 수집 시각(fetched_at) 기준
+
+사용 예:
+    python -m analyzer.corpus results.jsonl -o framing.csv
+    python -m analyzer.corpus day1.jsonl day2.jsonl --by publisher
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from analyzer.publishers import find_publisher
+
+CORPUS_CHUNK_SIZE = int(os.getenv("CORPUS_CHUNK_SIZE", "5000"))
+CORPUS_TOP_TERMS = 5
+
+# 범주 → 단어/어구 (부분 문자열로 셈. 한국어 활용형을 위해 어간 위주)
+LEXICONS = {
+    "emotional": (
+        "충격", "경악", "분노", "격분", "참담", "참혹", "끔찍", "비극", "날벼락", "발칵",
+        "파문", "맹비난", "막말", "폭주", "공포", "몰락", "초토화", "아수라장", "대란",
+        "폭등", "폭락", "비명", "통곡", "눈물", "사상 최악", "최악의", "망신", "굴욕",
+        "황당", "어처구니", "섬뜩", "처참", "광기", "꼼수", "민낯",
+    ),
+    "hedging": (
+        "것으로 보인다", "것으로 보여", "것으로 알려졌다", "것으로 전해졌다", "것으로 추정",
+        "것으로 예상", "가능성이 있", "가능성이 크", "가능성도", "관측이 나온", "전망이 나온",
+        "우려가 나온", "지적이 나온", "분석이 나온", "듯하다", "듯 보인다", "것 같다",
+        "여겨진다", "일 수 있다", "할 수도 있", "알려졌다", "전해졌다", "추정된다", "예상된다",
+    ),
+    "certainty": (
+        "분명히", "분명하다", "확실히", "확실하다", "명백히", "명백하다", "틀림없", "반드시",
+        "결코", "당연히", "명확히", "단언", "확인됐다", "드러났다", "밝혀졌다", "사실상",
+        "의심의 여지", "두말할 나위",
+    ),
+}
+
+# 큰따옴표 인용 ("…", “…”). 작은따옴표는 강조 용도가 많아 제외
+_QUOTE = re.compile(r"[\"“]([^\"“”\n]{2,500})[\"”]")
+_SENTENCE_END = re.compile(r"[.!?。…][\"'”’)\]]*(?:\s|$)")
+
+# 문서 단위 특징 열
+FEATURES = ("articles", "chars", "sentences", "quote_chars")
+GroupStats = namedtuple(
+    "GroupStats",
+    "key articles chars emotional_per_1k hedging_per_1k certainty_per_1k "
+    "quote_ratio hedge_share top_terms",
+)
+GROUP_DIMS = ("publisher", "day")
+
+
+# -------------------------------------------------
+# 레코드 → (본문, 언론사, 날짜)
+# -------------------------------------------------
+def publisher_of(record: dict) -> str:
+    if record.get("publisher"):
+        return record["publisher"]
+    url = record.get("url") or ""
+    spec = find_publisher(url) if url else None
+    if spec is not None:
+        return spec.name
+    return record.get("host") or "unknown"
+
+
+def day_of(record: dict) -> str:
+    for field in ("date", "published_at"):
+        value = record.get(field)
+        if isinstance(value, str) and len(value) >= 10:
+            return value[:10]
+    fetched = record.get("fetched_at")
+    if isinstance(fetched, (int, float)):
+        return datetime.fromtimestamp(fetched).strftime("%Y-%m-%d")
+    return "unknown"
+
+
+def iter_jsonl_records(paths):
+    """본문이 있는 레코드만 (깨진 줄은 건너뜀)"""
+    for path in paths:
+        fp = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        with fp:
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("text"):
+                    yield record
+
+
+# -------------------------------------------------
+# 집계기
+# -------------------------------------------------
+class CorpusAnalyzer:
+    """
+    feed() 로 청크 단위 기사를 넣고 results() 로 그룹별 지표를 받는다.
+    by: 그룹 기준 ("publisher", "day" 중 하나 이상)
+    """
+
+    def __init__(self, lexicons=None, by=GROUP_DIMS):
+        from scipy import sparse
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self._sparse = sparse
+        lexicons = LEXICONS if lexicons is None else lexicons
+        unknown = set(by) - set(GROUP_DIMS)
+        if not by or unknown:
+            raise ValueError(f"그룹 기준은 {GROUP_DIMS} 중에서 선택: {sorted(unknown)}")
+        self.by = tuple(by)
+        self.categories = tuple(lexicons)
+
+        # 단어 → 열 번호 (여러 범주에 겹치는 단어는 처음 범주만)
+        self.terms = []
+        term_category = []
+        for c, category in enumerate(self.categories):
+            for term in lexicons[category]:
+                if term not in self.terms:
+                    self.terms.append(term)
+                    term_category.append(c)
+        # 긴 어구부터 맞춰야 "것으로 알려졌다" 가 "알려졌다" 로 두 번 세지지 않음
+        alternation = "|".join(re.escape(t) for t in sorted(self.terms, key=len, reverse=True))
+        self._vectorizer = CountVectorizer(
+            analyzer=re.compile(alternation).findall,
+            vocabulary={t: i for i, t in enumerate(self.terms)},
+            dtype=np.int32,
+        )
+        # 단어 × 범주 지시 행렬: (문서 × 단어) @ 이것 = (문서 × 범주)
+        self._term_to_category = sparse.csr_matrix(
+            (np.ones(len(self.terms), dtype=np.int32), (np.arange(len(self.terms)), term_category)),
+            shape=(len(self.terms), len(self.categories)),
+        )
+        self._keys = {}              # 그룹 키 → 행 번호
+        self._features = np.zeros((0, len(FEATURES)), dtype=np.int64)
+        self._term_counts = np.zeros((0, len(self.terms)), dtype=np.int64)
+        self.documents = 0
+
+    def _group_key(self, record: dict) -> tuple:
+        key = []
+        if "publisher" in self.by:
+            key.append(publisher_of(record))
+        if "day" in self.by:
+            key.append(day_of(record))
+        return tuple(key)
+
+    def _grow(self, n_groups: int):
+        extra = n_groups - self._features.shape[0]
+        if extra > 0:
+            self._features = np.vstack([self._features, np.zeros((extra, len(FEATURES)), np.int64)])
+            self._term_counts = np.vstack([self._term_counts, np.zeros((extra, len(self.terms)), np.int64)])
+
+    def feed(self, records):
+        """레코드(dict, text 필드 필수) 한 청크를 집계에 더한다"""
+        records = [r for r in records if r.get("text")]
+        if not records:
+            return
+        texts = [r["text"] for r in records]
+        rows = np.fromiter(
+            (self._keys.setdefault(self._group_key(r), len(self._keys)) for r in records),
+            dtype=np.int64, count=len(records),
+        )
+        self._grow(len(self._keys))
+
+        term_matrix = self._vectorizer.transform(texts)                     # 문서 × 단어 (희소)
+        doc_features = np.column_stack([
+            np.ones(len(texts), dtype=np.int64),
+            np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)),
+            np.fromiter((len(_SENTENCE_END.findall(t)) or 1 for t in texts), dtype=np.int64, count=len(texts)),
+            np.fromiter((sum(len(m) for m in _QUOTE.findall(t)) for t in texts), dtype=np.int64, count=len(texts)),
+        ])
+
+        # 청크 안의 그룹들 × 문서 지시 행렬 한 번으로 그룹 합계
+        groups, local = np.unique(rows, return_inverse=True)
+        indicator = self._sparse.csr_matrix(
+            (np.ones(len(texts), dtype=np.int64), (local, np.arange(len(texts)))),
+            shape=(len(groups), len(texts)),
+        )
+        self._features[groups] += indicator @ doc_features
+        self._term_counts[groups] += (indicator @ term_matrix).toarray()
+        self.documents += len(texts)
+
+    def feed_all(self, records, chunk_size=CORPUS_CHUNK_SIZE):
+        """레코드 반복자를 chunk_size 건씩 나눠 집계 (전체를 메모리에 올리지 않음)"""
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return self
+            self.feed(chunk)
+
+    def results(self) -> list:
+        """그룹별 GroupStats (키 순 정렬)"""
+        if not self._keys:
+            return []
+        features = self._features.astype(np.float64)
+        category_counts = (self._sparse.csr_matrix(self._term_counts) @ self._term_to_category).toarray()
+        chars = np.maximum(features[:, FEATURES.index("chars")], 1)
+        per_1k = category_counts / chars[:, None] * 1000
+        quote = features[:, FEATURES.index("quote_chars")]
+        quote_ratio = quote / np.maximum(chars - quote, 1)
+
+        def column(name):
+            return category_counts[:, self.categories.index(name)] if name in self.categories else np.zeros(len(chars))
+
+        hedging, certainty = column("hedging"), column("certainty")
+        hedge_share = np.divide(hedging, hedging + certainty, out=np.full(len(chars), np.nan),
+                                where=(hedging + certainty) > 0)
+        top = np.argsort(-self._term_counts, axis=1, kind="stable")[:, :CORPUS_TOP_TERMS]
+
+        def rate(name, row):
+            return float(per_1k[row, self.categories.index(name)]) if name in self.categories else 0.0
+
+        out = []
+        for key, row in sorted(self._keys.items()):
+            out.append(GroupStats(
+                key=key,
+                articles=int(features[row, FEATURES.index("articles")]),
+                chars=int(features[row, FEATURES.index("chars")]),
+                emotional_per_1k=rate("emotional", row),
+                hedging_per_1k=rate("hedging", row),
+                certainty_per_1k=rate("certainty", row),
+                quote_ratio=float(quote_ratio[row]),
+                hedge_share=float(hedge_share[row]),
+                top_terms=[(self.terms[t], int(self._term_counts[row, t])) for t in top[row]
+                           if self._term_counts[row, t] > 0],
+            ))
+        return out
+
+
+def analyze_corpus(records, by=GROUP_DIMS, chunk_size=CORPUS_CHUNK_SIZE, lexicons=None) -> list:
+    """레코드 반복자 → 그룹별 GroupStats 목록"""
+    return CorpusAnalyzer(lexicons, by).feed_all(records, chunk_size).results()
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def write_csv(stats, by, fp):
+    writer = csv.writer(fp)
+    writer.writerow([*by, *GroupStats._fields[1:]])
+    for s in stats:
+        writer.writerow([
+            *s.key, s.articles, s.chars, f"{s.emotional_per_1k:.3f}", f"{s.hedging_per_1k:.3f}",
+            f"{s.certainty_per_1k:.3f}", f"{s.quote_ratio:.3f}",
+            "" if np.isnan(s.hedge_share) else f"{s.hedge_share:.3f}",
+            " ".join(f"{t}:{n}" for t, n in s.top_terms),
+        ])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="언론사/일자별 프레이밍 지표 집계 (LLM 미사용)")
+    parser.add_argument("inputs", nargs="+", help="text 필드가 있는 JSONL ('-' 이면 stdin)")
+    parser.add_argument("-o", "--output", default="-", help="결과 CSV 경로 (기본: stdout)")
+    parser.add_argument("--by", default="publisher,day", help="그룹 기준: publisher, day (쉼표 구분)")
+    parser.add_argument("--chunk-size", type=int, default=CORPUS_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    by = tuple(d.strip() for d in args.by.split(",") if d.strip())
+    started = time.perf_counter()
+    analyzer = CorpusAnalyzer(by=by).feed_all(iter_jsonl_records(args.inputs), max(1, args.chunk_size))
+    stats = analyzer.results()
+    if args.output == "-":
+        write_csv(stats, by, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as fp:
+            write_csv(stats, by, fp)
+
+    seconds = time.perf_counter() - started
+    print(f"{analyzer.documents}건 / {len(stats)}개 그룹 / {seconds:.2f}s "
+          f"({analyzer.documents / seconds if seconds else 0:.0f}건/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,8 +8,10 @@
 """
 
 import re
-import requests
-from bs4 import BeautifulSoup
+
+from analyzer.canonical import canonical_url
+from analyzer.http_client import http_get
+from analyzer.parsing import make_soup
 
 # -------------------------------------------------
 # 🧼 공통: 텍스트 정리 함수
@@ -33,11 +35,11 @@ def get_chosun_text(url):
     """조선일보 JSON + HTML"""
     # ① JSON 시도
     try:
-        m = re.search(r"chosun\.com/(.+?)/(\d{4})/(\d{2})/([A-Z0-9]+)/", url)
+        m = re.search(r"chosun\.com/(.+?)/(\d{4})/(\d{2})/(\d{2})/([A-Z0-9]{10,})/", url)
         if m:
-            section, year, month, article_id = m.groups()
-            json_url = f"https://www.chosun.com/__data/fusion/cached/page/article/{section}/{year}/{month}/{article_id}.json"
-            res = requests.get(json_url, timeout=10)
+            section, year, month, day, article_id = m.groups()
+            json_url = f"https://www.chosun.com/__data/fusion/cached/page/article/{section}/{year}/{month}/{day}/{article_id}.json"
+            res = http_get(json_url)
             res.raise_for_status()
             data = res.json()
             body_html = (
@@ -47,7 +49,7 @@ def get_chosun_text(url):
                 .get("body", "")
             )
             if body_html:
-                soup = BeautifulSoup(body_html, "html.parser")
+                soup = make_soup(body_html)
                 text = " ".join(p.get_text(strip=True) for p in soup.find_all("p"))
                 if len(text) > 200:
                     return clean_text(text)
@@ -56,9 +58,9 @@ def get_chosun_text(url):
 
     # ② HTML 시도
     try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        res = http_get(url, headers=HEADERS)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = make_soup(res.text)
         article = soup.select_one(
             "div.article-body, section.article-body, div[data-fusion-container]"
         )
@@ -76,9 +78,9 @@ def get_chosun_text(url):
 def get_jtbc_text(url):
     """JTBC 뉴스 본문 수집"""
     try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        res = http_get(url, headers=HEADERS)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = make_soup(res.text)
 
         # ✅ 최신 구조: id="ijam_content"
         article = soup.select_one(
@@ -115,9 +117,9 @@ def get_jtbc_text(url):
 def get_hani_text(url):
     """한겨레 본문"""
     try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        res = http_get(url, headers=HEADERS)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = make_soup(res.text)
         article = soup.select_one("div.article-text, div.text, #article-text")
         if article:
             text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
@@ -133,9 +135,9 @@ def get_hani_text(url):
 def get_kbs_text(url):
     """KBS 본문"""
     try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        res = http_get(url, headers=HEADERS)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = make_soup(res.text)
         article = soup.select_one("div.detail-body, div.detail_body, .view_cont")
         if article:
             text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
@@ -151,9 +153,9 @@ def get_kbs_text(url):
 def get_mbc_text(url):
     """MBC 본문"""
     try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        res = http_get(url, headers=HEADERS)
         res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = make_soup(res.text)
         article = soup.select_one("div.news_cont, div.news_body, div#content")
         if article:
             text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
@@ -168,24 +170,26 @@ def get_mbc_text(url):
 # -------------------------------------------------
 def get_article_text(url):
     """URL 기반으로 언론사 감지 후 본문 자동 수집"""
-    url = url.strip().lower()
+    # 경로는 대소문자를 구분하므로 (조선 기사 ID, JTBC NB...) 판별에만 소문자 호스트 사용
+    url = canonical_url(url)
+    host = url.split("/")[2].lower()
 
-    if "chosun.com" in url:
+    if "chosun.com" in host:
         text = get_chosun_text(url)
-    elif "jtbc.co.kr" in url:
+    elif "jtbc.co.kr" in host:
         text = get_jtbc_text(url)
-    elif "hani.co.kr" in url:
+    elif "hani.co.kr" in host:
         text = get_hani_text(url)
-    elif "kbs.co.kr" in url:
+    elif "kbs.co.kr" in host:
         text = get_kbs_text(url)
-    elif "mbc.co.kr" in url:
+    elif "mbc.co.kr" in host or "imbc.com" in host:
         text = get_mbc_text(url)
     else:
         # Fallback: <p> 전체 수집
         try:
-            res = requests.get(url, headers=HEADERS, timeout=10)
+            res = http_get(url, headers=HEADERS)
             res.raise_for_status()
-            soup = BeautifulSoup(res.text, "html.parser")
+            soup = make_soup(res.text)
             text = " ".join(p.get_text(strip=True) for p in soup.find_all("p"))
             text = clean_text(text)
         except Exception:
@@ -1,18 +1,40 @@
 # -*- coding: utf-8 -*-
 """
-국내 주요 언론 자동 뉴스 본문 수집기 (v7.0)
+국내 주요 언론 자동 뉴스 본문 수집기 (v8.0)
+ - 언론사별 규칙은 analyzer/publishers.py 레지스트리에 선언 (호스트, 셀렉터, 제거/수집 태그, JSON)
+ - 모든 언론사가 하나의 추출 엔진(extract_with_spec)을 공유
  - JTBC: Selenium(headless)로 렌더링된 DOM에서 본문 추출
- - 조선/한겨레/KBS/MBC: JSON 또는 HTML 파싱 방식 사용
  - 광고, iframe, script 제거
+ - 입력 URL 은 대표 URL 로 정규화한 뒤 수집 (모바일/AMP/추적 파라미터 변형, analyzer/canonical.py)
+ - 다운로드/파싱/렌더링 단계별 소요 시간은 analyzer/metrics.py 로 기록
+ - 본문은 스트리밍으로 받음: 바이트 상한(HTTP_MAX_BODY_BYTES) + 기사 컨테이너가 닫히면 나머지 다운로드 중단
+ - 모든 요청은 호스트별 스케줄러를 거침 (속도 제한, robots.txt Crawl-delay, 429 감속, 서킷 브레이커 — analyzer/scheduler.py)
 """
 
+import json
+import os
 import re
-import requests
-from bs4 import BeautifulSoup
+import time
+from functools import partial
+
+from analyzer.browser_pool import get_chrome_pool
+from analyzer.canonical import canonical_url
+from analyzer.fetch_cache import FETCH_CACHE_ENABLED, get_fetch_cache
+from analyzer.http_client import get_crawl_session, http_get, http_get_streamed
+from analyzer.metrics import record_article, record_download, record_stage, timed
+from analyzer.parsing import compile_strainer, make_soup
+from analyzer.publishers import CHOSUN, HANI, JTBC, JTBC_RENDERED, KBS, MBC, find_publisher
+from analyzer.scheduler import get_crawl_scheduler
+from analyzer.strategy_stats import get_strategy_stats
 
 USE_SELENIUM_FOR_JTBC = True
 JTBC_WAIT_SELECTOR = "#ijam_content"
 JTBC_WAIT_TIMEOUT = 18
+JTBC_MIN_LENGTH = 180   # 이보다 짧으면 다음 단계(브라우저)로 승격
+# 0 이면 예전처럼 응답 전체를 한 번에 받음
+FETCH_STREAMING = os.getenv("FETCH_STREAMING", "1") != "0"
+
+_P_STRAINER = compile_strainer("p")
 
 def clean_text(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
@@ -24,203 +46,321 @@ HEADERS = {
     "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
 }
 
-# 조선일보
-def get_chosun_text(url: str) -> str:
-    try:
-        m = re.search(r"chosun\.com/(.+?)/(\d{4})/(\d{2})/([A-Z0-9]+)/", url)
-        if m:
-            section, year, month, article_id = m.groups()
-            json_url = (
-                f"https://www.chosun.com/__data/fusion/cached/page/article/"
-                f"{section}/{year}/{month}/{article_id}.json"
-            )
-            r = requests.get(json_url, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            body_html = (
-                data.get("props", {})
-                    .get("pageProps", {})
-                    .get("article", {})
-                    .get("body", "")
-            )
-            if body_html:
-                soup = BeautifulSoup(body_html, "html.parser")
-                text = " ".join(p.get_text(strip=True) for p in soup.find_all("p"))
-                if len(text) > 200:
+# 공통: 계측된 GET
+def _timed_get(url: str, publisher: str, headers=None, end_detector=None):
+    """
+    (응답, 본문 텍스트, 조기 종료 여부, 바이트 상한으로 잘림 여부).
+    fetch: 요청 전체 / fetch.headers: 응답 헤더 수신까지(DNS·연결·TLS·서버 대기 포함)
+    requests 는 DNS/TLS 구간을 따로 노출하지 않으므로 헤더 수신 전/후로만 나눈다.
+    FETCH_STREAMING 이면 end_detector() 가 컨테이너 닫힘을 알리는 순간 다운로드를 멈춘다.
+    """
+    scheduler = get_crawl_scheduler()
+    if not FETCH_STREAMING:
+        with scheduler.slot(url) as slot, timed("fetch", publisher) as st:
+            r = http_get(url, headers=headers, session=get_crawl_session())
+            slot.response(r)
+            st.outcome = str(r.status_code)
+        record_stage("fetch.headers", r.elapsed.total_seconds(), publisher, st.outcome)
+        record_download(len(r.content), "http", publisher)
+        return r, r.text, False, False
+
+    stop = end_detector().push if end_detector is not None else None
+    with scheduler.slot(url) as slot, timed("fetch", publisher) as st:
+        body = http_get_streamed(url, headers=headers, stop=stop, session=get_crawl_session())
+        slot.response(body.response)
+        st.outcome = str(body.response.status_code)
+    headers_seconds = body.response.elapsed.total_seconds()
+    record_stage("fetch.headers", headers_seconds, publisher, st.outcome)
+    if body.text:
+        outcome = "early_stop" if body.stopped else "capped" if body.truncated else "complete"
+        record_stage("fetch.body", max(0.0, st.seconds - headers_seconds), publisher, outcome)
+    record_download(body.nbytes, "http", publisher)
+    return body.response, body.text, body.stopped, body.truncated
+
+# 공통: 조건부 GET + 수집 캐시
+def fetch_page(url: str, publisher: str, parse, headers=None, end_detector=None) -> str:
+    """
+    url 을 받아 parse(원문) 결과를 돌려준다.
+    캐시에 ETag/Last-Modified 가 있으면 조건부 GET 을 보내고,
+    304 응답이면 다운로드와 파싱 없이 캐시된 추출 결과를 그대로 반환한다.
+    end_detector 를 주면 내용이 있는 기사 컨테이너가 닫힌 뒤의 본문은 받지 않는다
+    (그런데도 parse 가 본문을 못 찾으면 한 번은 전체를 다시 받음).
+    일부만 받은 원문은 전체 원문처럼 캐시에 남기지 않는다 (추출 본문과 검증자만 저장)
+    """
+    if not FETCH_CACHE_ENABLED:
+        r, html, stopped, _ = _timed_get(url, publisher, headers, end_detector)
+        r.raise_for_status()
+        with timed("parse", publisher):
+            text = parse(html)
+        if stopped and not text:
+            return fetch_page(url, publisher, parse, headers)
+        return text
+
+    cache = get_fetch_cache()
+    entry = cache.get(url)
+    req_headers = dict(headers or {})
+    req_headers.update(cache.conditional_headers(entry))
+
+    r, html, stopped, truncated = _timed_get(url, publisher, req_headers, end_detector)
+    if r.status_code == 304 and entry is not None:
+        cache.touch(url)
+        return entry.text or ""
+    r.raise_for_status()
+    with timed("parse", publisher):
+        text = parse(html)
+    if stopped and not text:
+        return fetch_page(url, publisher, parse, headers)
+    cache.store_response(
+        url, publisher, None if stopped or truncated else html, text,
+        etag=r.headers.get("ETag"),
+        last_modified=r.headers.get("Last-Modified"),
+    )
+    return text
+
+# 공용 추출 엔진
+def parse_article_html(spec, html: str):
+    """spec 규칙으로 본문 추출, 컨테이너를 못 찾으면 None"""
+    soup = make_soup(html, parse_only=spec.strainer)
+    article = None
+    for selector in spec.container_selectors:
+        article = selector.select_one(soup)
+        if article is not None:
+            break
+    if article is None and spec.container_fallback is not None:
+        article = soup.find(lambda tag: spec.container_fallback(tag.name, tag.attrs))
+    if article is None:
+        return None
+
+    if spec.strip_selector is not None:
+        for tag in spec.strip_selector.select(article):
+            tag.decompose()
+
+    if not spec.collect:
+        return clean_text(article.get_text(" ", strip=True))
+
+    texts = (tag.get_text(strip=True) for tag in article.find_all(list(spec.collect)))
+    if spec.skip_prefixes:
+        texts = (t for t in texts if t and not t.lower().startswith(spec.skip_prefixes))
+    return clean_text(" ".join(texts))
+
+def _parse_json_body(spec, raw: str) -> str:
+    data = json.loads(raw)
+    for key in spec.json_body_path:
+        data = data.get(key, {}) if isinstance(data, dict) else {}
+    if not data or not isinstance(data, str):
+        return ""
+    soup = make_soup(data)
+    return " ".join(p.get_text(strip=True) for p in soup.find_all(list(spec.collect) or "p"))
+
+# 원문 HTML 에 심어진 JSON(ld+json, __NEXT_DATA__ 등)에서 본문 찾기
+_EMBEDDED_SCRIPT = re.compile(
+    r'<script[^>]*(?:type="application/(?:ld\+)?json"|id="__NEXT_DATA__")[^>]*>(.*?)</script>',
+    re.S | re.I,
+)
+_EMBEDDED_BODY_KEYS = ("articleBody", "article_body", "articleContent", "content", "body")
+
+def _longest_body(node, depth=0):
+    best = ""
+    if depth > 12:
+        return best
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in _EMBEDDED_BODY_KEYS and isinstance(value, str) and len(value) > len(best):
+                best = value
+            elif isinstance(value, (dict, list)):
+                found = _longest_body(value, depth + 1)
+                if len(found) > len(best):
+                    best = found
+    elif isinstance(node, list):
+        for value in node:
+            found = _longest_body(value, depth + 1)
+            if len(found) > len(best):
+                best = found
+    return best
+
+def extract_embedded_text(html: str) -> str:
+    """페이지에 포함된 구조화 데이터 중 가장 긴 본문 필드 (없으면 "")"""
+    best = ""
+    for m in _EMBEDDED_SCRIPT.finditer(html):
+        try:
+            found = _longest_body(json.loads(m.group(1)))
+        except ValueError:
+            continue
+        if len(found) > len(best):
+            best = found
+    if "<" in best:
+        best = make_soup(best).get_text(" ", strip=True)
+    return clean_text(best)
+
+def extract_with_spec(spec, url: str) -> str:
+    """JSON 엔드포인트(있으면) → HTML 순으로 시도"""
+    if spec.json_url is not None:
+        try:
+            json_url = spec.json_url(url)
+            if json_url:
+                text = fetch_page(json_url, spec.name, partial(_parse_json_body, spec))
+                if len(text) > spec.json_min_length:
                     return clean_text(text)
-    except Exception:
-        pass
+        except Exception:
+            pass
 
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        article = soup.select_one("div.article-body, section.article-body, div[data-fusion-container]")
-        if article:
-            text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
-            return clean_text(text)
+        return fetch_page(url, spec.name, partial(parse_article_html, spec), headers=HEADERS,
+                          end_detector=spec.end_detector) or ""
     except Exception:
-        pass
+        return ""
 
-    return ""
+# 조선일보
+def get_chosun_text(url: str) -> str:
+    return extract_with_spec(CHOSUN, url)
 
 # JTBC (Selenium)
 def get_jtbc_text_selenium(url: str) -> str:
     try:
-        import time
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-        from webdriver_manager.chrome import ChromeDriverManager
-
-        chrome_opts = Options()
-        chrome_opts.add_argument("--headless=new")
-        chrome_opts.add_argument("--disable-gpu")
-        chrome_opts.add_argument("--no-sandbox")
-        chrome_opts.add_argument("--log-level=3")
-        chrome_opts.add_argument("--window-size=1280,2000")
-
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_opts)
-        driver.get(url)
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#ijam_content"))
-        )
-        time.sleep(1.5)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        article = soup.select_one("#ijam_content") or soup.select_one("#article_content, .article_content, article")
-        if not article:
-            driver.quit()
-            return "__ERROR__: 본문 div를 찾지 못했습니다."
-
-        for tag in article.select("script, iframe, figure, div.ad_area, .set_contents_image_ad, .set_contents_video_ad"):
-            tag.decompose()
 
-        texts = []
-        for tag in article.find_all(["p", "span", "b"]):
-            t = tag.get_text(strip=True)
-            if t and not t.lower().startswith("advertisement"):
-                texts.append(t)
+        # 풀에서 미리 띄워 둔 브라우저를 임대 → 페이지 로드 1회 비용만 발생
+        lease_start = time.perf_counter()
+        with get_chrome_pool().lease() as driver:
+            record_stage("selenium.lease", time.perf_counter() - lease_start, "jtbc")
+            with timed("selenium.render", "jtbc"):
+                with get_crawl_scheduler().slot(url):
+                    driver.get(url)
+                # 고정 sleep 대신 본문 텍스트가 채워질 때까지만 대기
+                WebDriverWait(driver, JTBC_WAIT_TIMEOUT).until(
+                    lambda d: len(d.find_element(By.CSS_SELECTOR, JTBC_WAIT_SELECTOR).text.strip()) >= 100
+                )
+                page_source = driver.page_source
+        record_download(len(page_source.encode("utf-8")), "selenium", "jtbc")
 
-        text = re.sub(r"\s+", " ", " ".join(texts)).strip()
-        driver.quit()
+        with timed("parse", "jtbc"):
+            text = parse_article_html(JTBC_RENDERED, page_source)
+        if text is None:
+            return "__ERROR__: 본문 div를 찾지 못했습니다."
 
         if len(text) < 100:
             return "__ERROR__: 본문 추출 실패 (짧음)"
         return text
 
     except Exception as e:
-        try:
-            driver.quit()
-        except Exception:
-            pass
         return f"__ERROR__: {e}"
 
-# JTBC (Requests)
+# JTBC (Requests + 임베디드 JSON)
+def _parse_jtbc_http(html: str, used: list) -> str:
+    text = parse_article_html(JTBC, html) or ""
+    if len(text) < JTBC_MIN_LENGTH:
+        embedded = extract_embedded_text(html)
+        if len(embedded) > len(text):
+            used.append("embedded")
+            return embedded
+    used.append("requests")
+    return text
+
 def get_jtbc_text_requests(url: str) -> str:
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        article = soup.select_one("#ijam_content, #article_content, #article_content_area, .article_content")
-        if not article:
-            article = soup.find("div", id=lambda x: x and "jam_content" in x)
-        if not article:
-            return ""
-
-        for tag in article.select("script, iframe, figure, div.ad_area, .set_contents_image_ad, .set_contents_video_ad"):
-            tag.decompose()
-
-        texts = []
-        for tag in article.find_all(["p", "span", "b"]):
-            t = tag.get_text(strip=True)
-            if t and not t.lower().startswith("advertisement"):
-                texts.append(t)
-
-        return clean_text(" ".join(texts))
+        return fetch_page(url, "jtbc", partial(_parse_jtbc_http, used=[]), headers=HEADERS)
     except Exception:
         return ""
 
+def _jtbc_http_tier(url: str):
+    used = []
+    try:
+        text = fetch_page(url, "jtbc", partial(_parse_jtbc_http, used=used), headers=HEADERS)
+    except Exception:
+        text = ""
+    # 304 재검증이면 파싱 없이 캐시 결과 → 하위 전략은 알 수 없으므로 "requests" 로 기록
+    return text, (used[0] if used else "requests")
+
+def _jtbc_selenium_tier(url: str):
+    return get_jtbc_text_selenium(url), "selenium"
+
+_JTBC_TIERS = {"http": _jtbc_http_tier, "selenium": _jtbc_selenium_tier}
+
 def get_jtbc_text(url: str) -> str:
-    if "/article/nb" in url:
-        url = url.replace("/article/nb", "/article/NB")
-    if USE_SELENIUM_FOR_JTBC:
-        text = get_jtbc_text_selenium(url)
-        if len(text) >= 180:
+    """
+    싼 단계부터 시도: 일반 HTTP(+임베디드 JSON) → 부족하면 Selenium.
+    단계별 성공률을 기록해서, 계속 실패하는 단계는 뒤로 미룬다.
+    """
+    tiers = ["http", "selenium"] if USE_SELENIUM_FOR_JTBC else ["http"]
+    stats = get_strategy_stats()
+
+    best = ""
+    for tier in stats.order("jtbc", tiers):
+        start = time.perf_counter()
+        text, strategy = _JTBC_TIERS[tier](url)
+        ok = len(text) >= JTBC_MIN_LENGTH and not text.startswith("__ERROR__")
+        seconds = time.perf_counter() - start
+        stats.record("jtbc", tier, ok, seconds)
+        record_stage(f"tier.{tier}", seconds, "jtbc", "ok" if ok else "fail")
+        if strategy != tier:
+            stats.record("jtbc", strategy, ok)
+        if ok:
             return text
-        return get_jtbc_text_requests(url)
-    else:
-        return get_jtbc_text_requests(url)
+        if not text.startswith("__ERROR__") and len(text) > len(best):
+            best = text
+    return best
 
 # 한겨레
 def get_hani_text(url: str) -> str:
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        article = soup.select_one("div.article-text, div.text, #article-text")
-        if article:
-            text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
-            return clean_text(text)
-    except Exception:
-        pass
-    return ""
+    return extract_with_spec(HANI, url)
 
 # KBS
 def get_kbs_text(url: str) -> str:
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        article = soup.select_one("div.detail-body, div.detail_body, .view_cont")
-        if article:
-            text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
-            return clean_text(text)
-    except Exception:
-        pass
-    return ""
+    return extract_with_spec(KBS, url)
 
 # MBC
 def get_mbc_text(url: str) -> str:
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        article = soup.select_one("div.news_cont, div.news_body, div#content")
-        if article:
-            text = " ".join(p.get_text(strip=True) for p in article.find_all("p"))
-            return clean_text(text)
-    except Exception:
-        pass
-    return ""
+    return extract_with_spec(MBC, url)
+
+# 기타 언론사: <p> 전체 수집
+def _parse_generic_html(html: str) -> str:
+    soup = make_soup(html, parse_only=_P_STRAINER)
+    return clean_text(" ".join(p.get_text(strip=True) for p in soup.find_all("p")))
+
+# 엔진 대신 별도 흐름이 필요한 언론사 (렌더링 등)
+CUSTOM_EXTRACTORS = {
+    "jtbc": get_jtbc_text,
+}
 
 # 통합 진입점
 def get_article_text(url: str) -> str:
-    url_l = url.strip().lower()
-    if "chosun.com" in url_l:
-        text = get_chosun_text(url)
-    elif "jtbc.co.kr" in url_l:
-        text = get_jtbc_text(url)
-    elif "hani.co.kr" in url_l:
-        text = get_hani_text(url)
-    elif "kbs.co.kr" in url_l:
-        text = get_kbs_text(url)
-    elif "mbc.co.kr" in url_l:
-        text = get_mbc_text(url)
-    else:
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=10)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.text, "html.parser")
-            text = " ".join(p.get_text(strip=True) for p in soup.find_all("p"))
-            text = clean_text(text)
-        except Exception:
-            text = ""
+    url = canonical_url(url)
+    spec = find_publisher(url)
+    publisher = spec.name if spec is not None else "generic"
+    with timed("article", publisher) as st:
+        text = _get_article_text(url, spec, publisher)
+        if text.startswith("__ERROR__"):
+            st.outcome = "error"
+        else:
+            record_article(publisher, text)
+    return text
+
+def _get_article_text(url: str, spec, publisher: str) -> str:
+    # max-age 이내로 수집해 둔 본문이면 네트워크 없이 바로 반환
+    if FETCH_CACHE_ENABLED:
+        cache = get_fetch_cache()
+        entry = cache.get(url)
+        if entry is not None and entry.text and len(entry.text) >= 180 and cache.is_fresh(entry):
+            cache.count("fresh_hits")
+            record_stage("cache", 0.0, publisher, "fresh_hit")
+            return entry.text
+        cache.count("misses")
+
+    with timed("extract", publisher):
+        if spec is not None:
+            extract = CUSTOM_EXTRACTORS.get(publisher) or partial(extract_with_spec, spec)
+            text = extract(url)
+        else:
+            try:
+                text = fetch_page(url, publisher, _parse_generic_html, headers=HEADERS)
+            except Exception:
+                text = ""
     if not text or len(text) < 180:
         return f"__ERROR__: 본문 수집 실패 ({url})"
+
+    if FETCH_CACHE_ENABLED:
+        get_fetch_cache().store_text(url, publisher, text)
     return text
 
 # 테스트
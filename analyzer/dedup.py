@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+유사(거의 같은) 기사 인덱스 — 통신사 기사 전재/가벼운 재편집본의 중복 분석 방지
+ - 본문 SimHash(64비트, 글자 4-gram 가중치) 를 SQLite 에 저장 (실행 간 유지)
+ - 8비트 × 8 밴드 LSH: 밴드 하나라도 같은 후보만 인덱스로 조회 → 전체 스캔 없음
+   (해밍 거리 7 이하는 비둘기집 원리로 반드시 후보에 포함됨 → DEDUP_DIFF_DISTANCE 기본값도 7.
+    더 크게 잡아도 밴드가 겹치지 않는 먼 후보는 찾지 못함)
+ - 거리 DEDUP_DIFF_DISTANCE 이하 후보와 문장 단위로 비교해서
+   · 달라진 문장이 거의 없으면(DEDUP_REUSE_MAX_RATIO) 기존 분석 결과 재사용
+   · 일부만 달라졌으면(DEDUP_DIFF_MAX_RATIO) 달라진 문장만 보내는 저렴한 갱신 분석
+   · 그 외에는 전체 분석 후 인덱스에 등록
+
+사용 예:
+    outcome = analyze_with_dedup(text, url)
+    outcome.result, outcome.status   # result: AnalysisResult, status: "reused" / "diff" / "new"
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from analyzer import gpt_analyzer
+from analyzer.canonical import article_key, canonical_url
+from analyzer.chunking import estimate_tokens, split_sentences
+from analyzer.result_cache import normalize_text
+from analyzer.result_model import AnalysisResult
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") != "0"
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", os.path.join(".cache", "dedup.sqlite3"))
+# 밴드 구성이 보장하는 거리(BANDS - 1) 이하로 둘 것
+DEDUP_DIFF_DISTANCE = int(os.getenv("DEDUP_DIFF_DISTANCE", "7"))
+# 달라진 문장(추정 토큰)이 본문의 이 비율 이하면 결과 재사용
+DEDUP_REUSE_MAX_RATIO = float(os.getenv("DEDUP_REUSE_MAX_RATIO", "0.05"))
+# 이 비율보다 많으면 갱신 분석 대신 전체 분석
+DEDUP_DIFF_MAX_RATIO = float(os.getenv("DEDUP_DIFF_MAX_RATIO", "0.4"))
+# 길이 차이가 이 비율을 넘으면 거리가 가까워도 같은 기사로 보지 않음
+DEDUP_MIN_LENGTH_RATIO = 0.8
+
+SHINGLE = 4
+BANDS = 8
+BAND_BITS = 64 // BANDS
+_BAND_MASK = (1 << BAND_BITS) - 1
+_BAND_COLUMNS = ", ".join(f"b{i}" for i in range(BANDS))
+_BAND_COLUMNS_DDL = ", ".join(f"b{i} INTEGER NOT NULL" for i in range(BANDS))
+
+Match = namedtuple("Match", "id url publisher distance length result model prompt_version")
+DedupPlan = namedtuple("DedupPlan", "status match added removed")
+DedupOutcome = namedtuple("DedupOutcome", "result status match")
+
+
+# -------------------------------------------------
+# SimHash
+# -------------------------------------------------
+def _shingle_key(text: str) -> str:
+    return re.sub(r"[\W_]+", "", normalize_text(text)).lower()
+
+
+def simhash(text: str) -> int:
+    """글자 4-gram(출현 횟수 가중치) 기반 64비트 SimHash"""
+    key = _shingle_key(text)
+    if len(key) < SHINGLE:
+        key = key.ljust(SHINGLE, "\0")
+    counts = Counter(key[i:i + SHINGLE] for i in range(len(key) - SHINGLE + 1))
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in counts),
+        dtype=np.uint64, count=len(counts),
+    )
+    weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    # (N, 64) 비트 행렬: 열 0 이 최상위 비트
+    bits = np.unpackbits(hashes.astype(">u8").view(np.uint8).reshape(-1, 8), axis=1)
+    score = weights @ (bits.astype(np.float64) * 2 - 1)
+    return int.from_bytes(np.packbits(score > 0).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def bands(fingerprint: int) -> tuple:
+    return tuple((fingerprint >> (BAND_BITS * (BANDS - 1 - i))) & _BAND_MASK for i in range(BANDS))
+
+
+def _to_signed(value: int) -> int:
+    # SQLite INTEGER 는 부호 있는 64비트
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+# -------------------------------------------------
+# 인덱스
+# -------------------------------------------------
+class NearDuplicateIndex:
+    def __init__(self, path=DEDUP_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {"lookups": 0, "reused": 0, "diff": 0, "new": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                f"""CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT UNIQUE,
+                    key TEXT,
+                    publisher TEXT,
+                    fingerprint INTEGER NOT NULL,
+                    {_BAND_COLUMNS_DDL},
+                    length INTEGER NOT NULL,
+                    text BLOB,
+                    result TEXT,
+                    model TEXT,
+                    prompt_version TEXT,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._migrate_bands(db)
+            self._migrate_key(db)
+            for i in range(BANDS):
+                db.execute(f"CREATE INDEX IF NOT EXISTS idx_articles_b{i} ON articles (b{i})")
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def _migrate_bands(db):
+        """예전 밴드 구성(16비트 × 4)으로 만든 파일: 밴드 열을 추가하고 저장된 지문으로 다시 계산"""
+        columns = {row[1] for row in db.execute("PRAGMA table_info(articles)")}
+        if all(f"b{i}" in columns for i in range(BANDS)):
+            return
+        for i in range(BANDS):
+            if f"b{i}" not in columns:
+                db.execute(f"ALTER TABLE articles ADD COLUMN b{i} INTEGER NOT NULL DEFAULT 0")
+        rows = db.execute("SELECT id, fingerprint FROM articles").fetchall()
+        db.execute("BEGIN")
+        db.executemany(
+            f"UPDATE articles SET {', '.join(f'b{i} = ?' for i in range(BANDS))} WHERE id = ?",
+            [(*bands(_to_unsigned(fp)), id_) for id_, fp in rows],
+        )
+        db.execute("COMMIT")
+
+    @staticmethod
+    def _migrate_key(db):
+        """기사 키 열이 없던 파일: 저장된 URL 로 키를 채우고, 같은 기사의 예전 행은 최신 것만 남김"""
+        columns = {row[1] for row in db.execute("PRAGMA table_info(articles)")}
+        if "key" not in columns:
+            db.execute("ALTER TABLE articles ADD COLUMN key TEXT")
+            rows = db.execute("SELECT id, url FROM articles").fetchall()
+            db.execute("BEGIN")
+            db.executemany("UPDATE articles SET key = ? WHERE id = ?",
+                           [(article_key(url) if url else None, id_) for id_, url in rows])
+            db.execute("DELETE FROM articles WHERE key IS NOT NULL "
+                       "AND id NOT IN (SELECT MAX(id) FROM articles WHERE key IS NOT NULL GROUP BY key)")
+            db.execute("COMMIT")
+        db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_key ON articles (key)")
+
+    def find(self, text: str, fingerprint=None, max_distance=DEDUP_DIFF_DISTANCE) -> list:
+        """밴드가 하나라도 같은 후보 중 해밍 거리 max_distance 이하, 가까운 순"""
+        fp = simhash(text) if fingerprint is None else fingerprint
+        # 밴드별 인덱스 조회를 UNION 으로 합침 (각 밴드 버킷은 평균 N / 256 개 → 지문만 먼저 읽고 거르기)
+        sql = " UNION ".join(f"SELECT id, fingerprint FROM articles WHERE b{i} = ?" for i in range(BANDS))
+        with self._lock:
+            candidates = self._conn().execute(sql, bands(fp)).fetchall()
+            near = {}
+            for id_, stored in candidates:
+                distance = hamming(fp, _to_unsigned(stored))
+                if distance <= max_distance:
+                    near[id_] = distance
+            rows = self._conn().execute(
+                "SELECT id, url, publisher, length, result, model, prompt_version FROM articles "
+                f"WHERE id IN ({', '.join('?' * len(near))})", tuple(near),
+            ).fetchall() if near else []
+        matches = [Match(id_, url, publisher, near[id_], length, result, model, version)
+                   for id_, url, publisher, length, result, model, version in rows]
+        matches.sort(key=lambda m: (m.distance, -m.id))
+        return matches
+
+    def add(self, url: str, text: str, publisher: str = "", result=None, model: str = "",
+            prompt_version: str = "", fingerprint=None) -> int:
+        """기사 등록 (같은 기사 키(canonical.py)면 교체, url 은 표시/링크용으로 그대로 보관). 반환값: 지문"""
+        fp = simhash(text) if fingerprint is None else fingerprint
+        key = article_key(url) if url else None
+        with self._lock:
+            self._conn().execute(
+                f"INSERT OR REPLACE INTO articles (url, key, publisher, fingerprint, {_BAND_COLUMNS}, length, "
+                f"text, result, model, prompt_version, created_at) VALUES ({', '.join('?' * (BANDS + 10))})",
+                (url, key, publisher, _to_signed(fp), *bands(fp), len(text),
+                 zlib.compress(text.encode("utf-8")), result, model, prompt_version, time.time()),
+            )
+        return fp
+
+    def get_text(self, id_: int):
+        with self._lock:
+            row = self._conn().execute("SELECT text FROM articles WHERE id = ?", (id_,)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def iter_analyzed(self):
+        """분석 결과가 있는 (본문, 결과) 전체 — 사전 분류기 학습용 (triage.py)"""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT text, result FROM articles WHERE result IS NOT NULL AND text IS NOT NULL"
+            ).fetchall()
+        for blob, result in rows:
+            yield zlib.decompress(blob).decode("utf-8"), result
+
+    def record_lookup(self, status: str):
+        """plan_analysis 조회 결과 집계 (여러 작업 스레드가 함께 호출)"""
+        with self._lock:
+            self.stats["lookups"] += 1
+            self.stats[status] += 1
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> NearDuplicateIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDuplicateIndex()
+    return _index
+
+
+# -------------------------------------------------
+# 분석 연결
+# -------------------------------------------------
+def _sentence_key(sentence: str) -> str:
+    return re.sub(r"[\W_]+", "", sentence)
+
+
+def sentence_diff(old: str, new: str):
+    """(new 에만 있는 문장, old 에만 있는 문장)"""
+    old_sents, new_sents = split_sentences(old), split_sentences(new)
+    old_keys = {_sentence_key(s) for s in old_sents}
+    new_keys = {_sentence_key(s) for s in new_sents}
+    added = [s for s in new_sents if _sentence_key(s) not in old_keys]
+    removed = [s for s in old_sents if _sentence_key(s) not in new_keys]
+    return added, removed
+
+
+def plan_analysis(text: str, index=None) -> DedupPlan:
+    """
+    분석 전에 인덱스를 조회해서 처리 방식을 정한다.
+    status: "reused"(결과 재사용) / "diff"(달라진 문장만 갱신 분석) / "new"(전체 분석)
+    """
+    if not DEDUP_ENABLED:
+        return DedupPlan("new", None, [], [])
+    index = index or get_dedup_index()
+    plan = _plan(text, index, gpt_analyzer.MODEL_NAME, gpt_analyzer.PROMPT_VERSION)
+    index.record_lookup(plan.status)
+    return plan
+
+
+def _plan(text, index, model, prompt_version) -> DedupPlan:
+    for match in index.find(text):
+        if match.result is None or match.model != model or match.prompt_version != prompt_version:
+            continue
+        if min(len(text), match.length) < DEDUP_MIN_LENGTH_RATIO * max(len(text), match.length):
+            continue
+        added, removed = sentence_diff(index.get_text(match.id) or "", text)
+        changed = estimate_tokens(" ".join(added + removed)) if added or removed else 0
+        total = estimate_tokens(text)
+        if changed <= DEDUP_REUSE_MAX_RATIO * total:
+            return DedupPlan("reused", match, [], [])
+        if changed <= DEDUP_DIFF_MAX_RATIO * total:
+            return DedupPlan("diff", match, added, removed)
+        break
+    return DedupPlan("new", None, [], [])
+
+
+def resolve_plan(plan: DedupPlan) -> AnalysisResult:
+    """"reused" / "diff" 계획의 분석 결과 ("new" 는 호출 측에서 전체 분석)"""
+    if plan.status == "reused":
+        return AnalysisResult.parse(plan.match.result)
+    if plan.status == "diff":
+        return gpt_analyzer.analyze_bias_diff(plan.match.result, plan.added, plan.removed)
+    raise ValueError(f"plan status {plan.status!r} needs a full analysis")
+
+
+def remember_analysis(url: str, text: str, result, publisher: str = "", index=None):
+    """분석이 끝난 기사를 인덱스에 등록 (다음 유사 기사가 재사용). result 는 JSON 으로 저장"""
+    if not DEDUP_ENABLED or not url:
+        return
+    (index or get_dedup_index()).add(
+        canonical_url(url), text, publisher=publisher, result=AnalysisResult.coerce(result).to_json(),
+        model=gpt_analyzer.MODEL_NAME, prompt_version=gpt_analyzer.PROMPT_VERSION,
+    )
+
+
+def analyze_with_dedup(text: str, url: str = "", publisher: str = "") -> DedupOutcome:
+    """analyze_bias 앞단: 유사 기사가 있으면 재사용 또는 갱신 분석"""
+    plan = plan_analysis(text)
+    if plan.status == "new":
+        result = gpt_analyzer.analyze_bias(text)
+    else:
+        result = resolve_plan(plan)
+    if plan.status != "reused":
+        remember_analysis(url, text, result, publisher)
+    return DedupOutcome(result, plan.status, plan.match)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+기사 페이지 수집 캐시 (SQLite)
+ - 기사 키(canonical.py, 예: "jtbc:12265505") 단위로 원문(body, zlib 압축), 추출 본문, ETag/Last-Modified 저장
+   → 같은 기사의 모바일/AMP/추적 파라미터 URL 이 한 캐시 항목을 공유
+ - 언론사별 max-age 이내면 네트워크 없이 캐시된 본문을 그대로 사용
+ - 그 이후에는 조건부 GET 으로 재검증 → 304 면 다운로드와 파싱을 모두 생략
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+FETCH_CACHE_PATH = os.getenv("FETCH_CACHE_PATH", os.path.join(".cache", "fetch.sqlite3"))
+FETCH_CACHE_ENABLED = os.getenv("FETCH_CACHE_ENABLED", "1") != "0"
+
+# 언론사별 max-age (초): 이 시간 안에는 재검증 없이 캐시 본문 사용
+DEFAULT_MAX_AGE = 3600
+PUBLISHER_MAX_AGE = {
+    "chosun": 6 * 3600,
+    "jtbc": 6 * 3600,
+    "hani": 6 * 3600,
+    "kbs": 6 * 3600,
+    "mbc": 6 * 3600,
+}
+
+CacheEntry = namedtuple(
+    "CacheEntry", "url publisher text etag last_modified fetched_at has_body"
+)
+
+
+def cache_key(url: str) -> str:
+    """캐시 키 = 기사 키 (publishers → fetch_cache 순환 import 를 피하려고 호출 시점에 import)"""
+    from analyzer.canonical import article_key
+    return article_key(url)
+
+
+class FetchCache:
+    def __init__(self, path=FETCH_CACHE_PATH, max_age=None):
+        self.path = path
+        self.max_age = dict(PUBLISHER_MAX_AGE if max_age is None else max_age)
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "refetched": 0, "misses": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    publisher TEXT,
+                    body BLOB,
+                    text TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )"""
+            )
+            self._db = db
+        return self._db
+
+    def get(self, url: str):
+        key = cache_key(url)
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT url, publisher, text, etag, last_modified, fetched_at, body IS NOT NULL "
+                "FROM pages WHERE url = ?",
+                (key,),
+            ).fetchone()
+        return CacheEntry(*row[:6], bool(row[6])) if row else None
+
+    def get_body(self, url: str):
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT body FROM pages WHERE url = ?", (cache_key(url),)
+            ).fetchone()
+        if not row or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        max_age = self.max_age.get(entry.publisher, DEFAULT_MAX_AGE)
+        return time.time() - entry.fetched_at < max_age
+
+    def conditional_headers(self, entry) -> dict:
+        """재검증용 If-None-Match / If-Modified-Since 헤더"""
+        headers = {}
+        if entry is not None and entry.has_body:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store_response(self, url, publisher, body, text, etag=None, last_modified=None):
+        """다운로드한 원문 + 추출 본문 + 검증자 저장 (기존 값 덮어씀)"""
+        blob = zlib.compress(body.encode("utf-8")) if body is not None else None
+        with self._lock:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO pages (url, publisher, body, text, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url), publisher, blob, text, etag, last_modified, time.time()),
+            )
+            self.stats["refetched"] += 1
+
+    def store_text(self, url, publisher, text):
+        """최종 추출 본문만 갱신 (원문/검증자는 유지)"""
+        with self._lock:
+            self._conn().execute(
+                "INSERT INTO pages (url, publisher, text, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET publisher = excluded.publisher, "
+                "text = excluded.text, fetched_at = excluded.fetched_at",
+                (cache_key(url), publisher, text, time.time()),
+            )
+
+    def touch(self, url):
+        """304 재검증 성공 → max-age 재시작"""
+        with self._lock:
+            self._conn().execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), cache_key(url))
+            )
+            self.stats["revalidated"] += 1
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_fetch_cache() -> FetchCache:
+    """프로세스 공용 수집 캐시"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FetchCache()
+    return _cache
@@ -1,19 +1,42 @@
 # -*- coding: utf-8 -*-
-def result_to_html_table(result_text: str) -> str:
+def parse_result_line(line: str):
+    """'항목명: 내용' 한 줄 → (항목명, 내용), 형식이 아니면 None"""
+    line = line.strip()
+    if ":" not in line:
+        return None
+    k, v = line.split(":", 1)
+    return k.strip(), v.strip()
+
+
+def parse_result_rows(result_text: str) -> list:
     pairs = []
-    for line in (ln.strip() for ln in result_text.splitlines()):
-        if ":" not in line:
-            continue
-        k, v = line.split(":", 1)
-        pairs.append((k.strip(), v.strip()))
+    for line in result_text.splitlines():
+        pair = parse_result_line(line)
+        if pair:
+            pairs.append(pair)
+    return pairs
+
+
+def result_to_html_table(result) -> str:
+    """AnalysisResult 또는 '항목명: 내용' 텍스트 → HTML 표"""
+    from analyzer.result_model import AnalysisResult
+
+    result = AnalysisResult.coerce(result)
+    return rows_to_html_table(result.rows(), risk=result.risk)
+
 
+def rows_to_html_table(pairs, risk=None) -> str:
+    """
+    (항목명, 내용) 목록 → HTML 표 (스트리밍 중 일부 행만 있어도 렌더링 가능)
+    risk(RiskLevel) 를 주면 위험도 배지 색을 그대로 사용, 없으면 내용의 등급 표현으로 판단
+    """
     def badge_html(value: str) -> str:
-        low = any(w in value for w in ["낮음", "low"])
-        mid = any(w in value for w in ["보통", "중간", "medium"])
-        high = any(w in value for w in ["높음", "high"])
-        cls = "badge-mid"
-        if low: cls = "badge-low"
-        if high: cls = "badge-high"
+        level = risk.value if risk is not None else None
+        if level is None:
+            low = any(w in value for w in ["낮음", "low"])
+            high = any(w in value for w in ["높음", "high"])
+            level = "high" if high else "low" if low else "medium"
+        cls = {"low": "badge-low", "high": "badge-high"}.get(level, "badge-mid")
         return f'<span class="badge {cls}">{value}</span>'
 
     rows_html = []
@@ -1,49 +1,369 @@
 # -*- coding: utf-8 -*-
 import os
 import json
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from dotenv import load_dotenv
 
+from analyzer.chunking import chunk_text, estimate_tokens  # noqa: F401 (estimate_tokens 재노출)
+from analyzer.formatter import parse_result_line
+from analyzer.metrics import record_stage, record_usage, timed
+from analyzer.result_cache import get_result_cache, make_key
+from analyzer.result_model import RESPONSE_FORMAT, TEXT_FIELDS, AnalysisResult, RiskLevel
+from analyzer.scheduler import get_breaker
+
 # 환경 변수 로드 (.env 파일 사용)
 load_dotenv()
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
 MODEL_NAME = os.getenv("MODEL_NAME", "openai/gpt-3.5-turbo")
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+# 최종 분석 호출에 JSON schema 구조화 출력 요청 (지원하지 않는 모델은 자동으로 텍스트 형식)
+ANALYSIS_STRUCTURED = os.getenv("ANALYSIS_STRUCTURED", "1") != "0"
+# OpenRouter 호출이 함께 쓰는 서킷 브레이커 이름 (async_client 도 같은 브레이커 사용)
+OPENROUTER_BREAKER = "openrouter"
 
-def analyze_bias(text: str) -> str:
-    """
-    뉴스 기사 본문을 분석하여 프레이밍, 감정 표현, 사실·의견 구분,
-    정보의 균형성, 출처 신뢰도, 종합 위험도 등을 간결히 요약한다.
-    """
-    prompt = f"""
-다음 뉴스 기사 본문을 분석하여 아래 항목을 '항목명: 내용' 형식으로 간결하게 작성해줘.
+# 긴 기사: 이 토큰 예산을 넘으면 문장 단위로 나눠 조각별 분석(map) 후 종합(reduce)
+ANALYSIS_CHUNK_TOKENS = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "3000"))
+ANALYSIS_CHUNK_WORKERS = int(os.getenv("ANALYSIS_CHUNK_WORKERS", "4"))
+# 종합 호출 하나에 넣는 부분 분석 최대 개수 (넘으면 여러 단계로 종합)
+ANALYSIS_MERGE_FANIN = int(os.getenv("ANALYSIS_MERGE_FANIN", "8"))
+
+# 프롬프트 문구를 바꾸면 이 값을 올려서 이전 캐시 결과가 재사용되지 않도록 한다
+PROMPT_VERSION = "v3"
 
+SYSTEM_PROMPT = "You are a strict and neutral media framing analyst."
+
+ANALYSIS_ITEMS = """
 1. 프레이밍 방식 및 관점
 2. 감정적 표현 및 선동 요소
 3. 사실과 의견 구분의 명확성
 4. 정보의 균형성 및 누락 여부
 5. 출처와 근거의 신뢰도
 6. 종합 위험도 평가 (낮음/보통/높음) 및 이유
+"""
+
+# 결과 형식 지시문 (최종 분석만 구조화 출력, 조각/중간 종합은 텍스트)
+TEXT_FORMAT = "'항목명: 내용' 형식으로"
+JSON_FORMAT = (
+    f"JSON 객체 하나로 (키 {', '.join(TEXT_FIELDS)} 는 위 1~6번 항목 내용, "
+    f"risk 는 {'/'.join(level.value for level in RiskLevel)} 중 하나)"
+)
 
+PROMPT_TEMPLATE = """
+다음 뉴스 기사 본문을 분석하여 아래 항목을 {format} 간결하게 작성해줘.
+{items}
 [뉴스 본문]
-{text[:4000]}
-""".strip()
+{body}
+"""
+
+CHUNK_PROMPT_TEMPLATE = """
+다음은 긴 뉴스 기사를 {total}개 부분으로 나눈 것 중 {index}번째 부분이야.
+이 부분에서 확인되는 근거를 바탕으로 아래 항목을 '항목명: 내용' 형식으로 간결하게 작성해줘.
+다른 부분에 있을 수 있는 내용의 누락 여부는 단정하지 마.
+{items}
+[기사 일부 {index}/{total}]
+{body}
+"""
+
+MERGE_PROMPT_TEMPLATE = """
+아래는 하나의 뉴스 기사를 여러 부분으로 나누어 각각 분석한 결과야.
+기사 전체에 대한 하나의 평가로 종합하여 아래 항목을 {format} 간결하게 작성해줘.
+부분별 평가가 엇갈리면 기사 전체 흐름을 기준으로 판단하고, 종합 위험도도 전체 기준으로 다시 판정해줘.
+{items}
+[부분별 분석]
+{partials}
+"""
+
+DIFF_PROMPT_TEMPLATE = """
+아래 [기존 분석]은 거의 같은 내용의 다른 기사(통신사 전재/재편집본)에 대한 분석이야.
+새 기사는 [추가된 문장]이 더해지고 [빠진 문장]이 제외된 것 말고는 같아.
+달라진 문장이 평가에 주는 영향만 반영해서 아래 항목을 {format} 다시 작성해줘.
+{items}
+[기존 분석]
+{previous}
+
+[추가된 문장]
+{added}
+
+[빠진 문장]
+{removed}
+"""
+
+
+def _format(structured: bool) -> str:
+    return JSON_FORMAT if structured else TEXT_FORMAT
+
+
+def build_prompt(text: str, structured: bool = False) -> str:
+    return PROMPT_TEMPLATE.format(items=ANALYSIS_ITEMS, body=text, format=_format(structured)).strip()
 
-    headers = {
+
+def build_chunk_prompt(chunk: str, index: int, total: int) -> str:
+    return CHUNK_PROMPT_TEMPLATE.format(items=ANALYSIS_ITEMS, body=chunk, index=index, total=total).strip()
+
+
+def build_merge_prompt(partials, structured: bool = False) -> str:
+    body = "\n\n".join(f"[부분 {i}]\n{p.strip()}" for i, p in enumerate(partials, 1))
+    return MERGE_PROMPT_TEMPLATE.format(items=ANALYSIS_ITEMS, partials=body, format=_format(structured)).strip()
+
+
+def build_diff_prompt(previous, added, removed, structured: bool = False) -> str:
+    """previous: 기존 분석 (AnalysisResult 또는 텍스트) — 프롬프트에는 항목 텍스트로 넣음"""
+    return DIFF_PROMPT_TEMPLATE.format(
+        items=ANALYSIS_ITEMS,
+        format=_format(structured),
+        previous=AnalysisResult.coerce(previous).to_text().strip(),
+        added="\n".join(f"- {s}" for s in added) or "(없음)",
+        removed="\n".join(f"- {s}" for s in removed) or "(없음)",
+    ).strip()
+
+
+def merge_groups(partials, fanin: int = ANALYSIS_MERGE_FANIN) -> list:
+    """부분 분석이 fanin 보다 많으면 중간 종합용 묶음으로 나눈다 (고르게 분배)"""
+    fanin = max(2, fanin)
+    groups = -(-len(partials) // fanin)
+    size = -(-len(partials) // groups)
+    return [partials[i:i + size] for i in range(0, len(partials), size)]
+
+
+def build_headers() -> dict:
+    return {
         "Authorization": f"Bearer {OPENROUTER_API_KEY.strip()}",
         "Content-Type": "application/json; charset=utf-8",
     }
 
+
+def build_payload(prompt: str, **extra) -> dict:
     payload = {
         "model": MODEL_NAME,
         "messages": [
-            {"role": "system", "content": "You are a strict and neutral media framing analyst."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
     }
+    payload.update(extra)
+    return payload
+
+
+# response_format 을 거부한(400) 모델 — 이후 호출은 텍스트 형식으로
+_structured_unsupported = set()
+
+
+def structured_options(structured: bool = True) -> dict:
+    """최종 분석 호출에 붙일 구조화 출력 옵션 (비활성/미지원 모델이면 빈 dict)"""
+    if structured and ANALYSIS_STRUCTURED and MODEL_NAME not in _structured_unsupported:
+        return {"response_format": RESPONSE_FORMAT}
+    return {}
+
+
+def mark_structured_unsupported():
+    _structured_unsupported.add(MODEL_NAME)
+
+
+def names_structured_option(error_text: str) -> bool:
+    """400 오류 본문이 구조화 출력 옵션을 문제 삼는지 (문맥 길이 초과 등 다른 400 과 구분)"""
+    text = (error_text or "").lower()
+    return "response_format" in text or "json_schema" in text
 
+
+def _complete(prompt: str, stage: str = "llm.request", structured: bool = False) -> str:
+    extra = structured_options(structured)
+    with timed(stage):
+        # 연결 오류/타임아웃/5xx 가 이어지면 브레이커가 열려 잠시 바로 CircuitOpen (4xx 는 요청 문제라 제외)
+        with get_breaker(OPENROUTER_BREAKER).guard() as guard:
+            data = json.dumps(build_payload(prompt, **extra), ensure_ascii=False).encode("utf-8")
+            r = requests.post(OPENROUTER_URL, headers=build_headers(), data=data, timeout=30)
+            if extra and r.status_code == 400:
+                # 구조화 출력 미지원일 수 있음 → 같은 프롬프트를 옵션 없이 재요청 (응답은 parse 가 JSON/텍스트 모두 처리)
+                # 오류가 옵션을 지목했거나 옵션 없이 성공했을 때만 미지원으로 기억 (다른 400 은 모델 탓이 아님)
+                named = names_structured_option(r.text)
+                data = json.dumps(build_payload(prompt), ensure_ascii=False).encode("utf-8")
+                r = requests.post(OPENROUTER_URL, headers=build_headers(), data=data, timeout=30)
+                if named or r.status_code < 400:
+                    mark_structured_unsupported()
+            guard.status = r.status_code
+        r.raise_for_status()
+        body = r.json()
+    record_usage(body.get("usage"), MODEL_NAME)
+    return body["choices"][0]["message"]["content"]
+
+
+def _cached_complete(prompt: str, key, stage: str) -> str:
+    """key 가 있으면 결과 캐시를 먼저 확인 (조각/중간 종합 결과 재사용용)"""
+    if key is not None:
+        cached = get_result_cache().get(key)
+        if cached is not None:
+            return cached
+    result = _complete(prompt, stage)
+    if key is not None:
+        get_result_cache().set(key, result, model=MODEL_NAME)
+    return result
+
+
+def _parallel(calls) -> list:
+    """(prompt, key, stage) 목록을 동시에 호출, 입력 순서대로 결과 반환"""
+    if len(calls) == 1:
+        return [_cached_complete(*calls[0])]
+    workers = max(1, min(ANALYSIS_CHUNK_WORKERS, len(calls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk") as pool:
+        # 계측 trace 가 작업 스레드에서도 이어지도록 컨텍스트 복사
+        futures = [
+            pool.submit(contextvars.copy_context().run, _cached_complete, *call) for call in calls
+        ]
+        return [f.result() for f in futures]
+
+
+def _final_prompt(text: str, use_cache: bool, structured: bool = False) -> str:
+    """
+    예산 안이면 기존 단일 프롬프트.
+    길면 조각별 분석(병렬) → 필요 시 중간 종합(병렬) → 최종 종합 프롬프트를 만든다.
+    structured: 최종 프롬프트만 JSON 형식 요청 (조각/중간 종합은 텍스트)
+    """
+    chunks = chunk_text(text, ANALYSIS_CHUNK_TOKENS)
+    if len(chunks) <= 1:
+        return build_prompt(text, structured)
+
+    def key(kind, body):
+        return make_key(MODEL_NAME, f"{PROMPT_VERSION}/{kind}", body) if use_cache else None
+
+    n = len(chunks)
+    partials = _parallel([
+        (build_chunk_prompt(c, i, n), key(f"chunk{i}/{n}", c), "llm.map")
+        for i, c in enumerate(chunks, 1)
+    ])
+    while len(partials) > ANALYSIS_MERGE_FANIN:
+        prompts = [build_merge_prompt(g) for g in merge_groups(partials)]
+        partials = _parallel([(p, key("merge", p), "llm.reduce") for p in prompts])
+    return build_merge_prompt(partials, structured)
+
+
+def _request_analysis(text: str, use_cache: bool = False) -> AnalysisResult:
+    return AnalysisResult.parse(_complete(_final_prompt(text, use_cache, True), structured=True))
+
+
+def analyze_bias(text: str, use_cache: bool = True) -> AnalysisResult:
+    """
+    뉴스 기사 본문을 분석하여 프레이밍, 감정 표현, 사실·의견 구분,
+    정보의 균형성, 출처 신뢰도, 종합 위험도 등을 간결히 요약한다.
+    같은 모델·프롬프트 버전·본문이면 캐시된 결과를 돌려준다.
+    긴 기사는 자르지 않고 조각별로 병렬 분석한 뒤 같은 6개 항목으로 종합한다.
+    결과는 AnalysisResult (JSON 구조화 출력, 안 되면 텍스트 파싱).
+    """
+    with timed("analyze") as st:
+        if not (use_cache and RESULT_CACHE_ENABLED):
+            return _request_analysis(text)
+
+        cache = get_result_cache()
+        key = make_key(MODEL_NAME, PROMPT_VERSION, text)
+        cached = cache.get(key)
+        if cached is not None:
+            st.outcome = "cache_hit"
+            return AnalysisResult.parse(cached)
+
+        result = _request_analysis(text, use_cache=True)
+        cache.set(key, result.to_json(), model=MODEL_NAME)
+        return result
+
+
+def analyze_bias_diff(previous, added, removed, use_cache: bool = True) -> AnalysisResult:
+    """
+    거의 같은 기사의 기존 분석 결과 + 달라진 문장만으로 분석을 갱신한다 (dedup.py 에서 사용).
+    본문 전체를 다시 보내지 않으므로 프롬프트가 훨씬 짧다.
+    """
+    prompt = build_diff_prompt(previous, added, removed, structured=True)
+    key = make_key(MODEL_NAME, f"{PROMPT_VERSION}/diff", prompt) if use_cache and RESULT_CACHE_ENABLED else None
+    with timed("analyze") as st:
+        st.outcome = "diff"
+        if key is not None:
+            cached = get_result_cache().get(key)
+            if cached is not None:
+                return AnalysisResult.parse(cached)
+        result = AnalysisResult.parse(_complete(prompt, "llm.diff", structured=True))
+        if key is not None:
+            get_result_cache().set(key, result.to_json(), model=MODEL_NAME)
+        return result
+
+
+def _iter_sse_content(response, usage=None):
+    """
+    OpenRouter SSE 응답에서 토큰(delta.content) 문자열을 순서대로 꺼낸다.
+    usage dict 를 넘기면 마지막 청크의 토큰 사용량을 채워 준다.
+    """
+    # chunk_size=None: 도착한 만큼 바로 처리 (512바이트 버퍼링으로 토큰이 지연되지 않도록)
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        # 빈 줄은 이벤트 구분자, ':' 로 시작하면 keep-alive 주석
+        if not line or line.startswith(":") or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        chunk = json.loads(data)
+        if "error" in chunk:
+            raise RuntimeError(chunk["error"].get("message", "OpenRouter stream error"))
+        if usage is not None and chunk.get("usage"):
+            usage.update(chunk["usage"])
+        choices = chunk.get("choices") or []
+        if choices:
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
+
+
+def analyze_bias_stream(text: str, use_cache: bool = True):
+    """
+    analyze_bias 의 스트리밍 버전.
+    응답 토큰을 받는 대로 모아 '항목명: 내용' 한 줄이 완성될 때마다
+    (항목명, 내용) 튜플을 yield 한다. 완료된 전체 결과는 캐시에 저장된다.
+    긴 기사는 조각별 분석을 먼저 마친 뒤 최종 종합 호출만 스트리밍한다.
+    줄 단위로 바로 보여 줘야 하므로 구조화 출력 대신 텍스트 형식을 요청한다.
+    """
+    use_cache = use_cache and RESULT_CACHE_ENABLED
+    if use_cache:
+        cache = get_result_cache()
+        key = make_key(MODEL_NAME, PROMPT_VERSION, text)
+        cached = cache.get(key)
+        if cached is not None:
+            record_stage("analyze", 0.0, outcome="cache_hit")
+            yield from AnalysisResult.parse(cached).rows()
+            return
+
+    # stream_options: 마지막 청크에 토큰 사용량(usage) 포함 요청
+    prompt = _final_prompt(text, use_cache)
+    payload = build_payload(prompt, stream=True, stream_options={"include_usage": True})
     data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    r = requests.post(OPENROUTER_URL, headers=headers, data=data, timeout=30)
+    full = []
+    buf = ""
+    usage = {}
+    start = time.perf_counter()
+    # 본문 도중 끊김/읽기 타임아웃도 브레이커 실패로 세도록 스트림을 다 읽을 때까지 guard 안에서 처리
+    with get_breaker(OPENROUTER_BREAKER).guard() as guard:
+        r = requests.post(OPENROUTER_URL, headers=build_headers(), data=data, timeout=30, stream=True)
+        guard.status = r.status_code
+        with r:
+            if r.ok:
+                r.encoding = "utf-8"
+                for piece in _iter_sse_content(r, usage):
+                    if not full:
+                        record_stage("llm.first_token", time.perf_counter() - start)
+                    full.append(piece)
+                    buf += piece
+                    while "\n" in buf:
+                        line, buf = buf.split("\n", 1)
+                        row = parse_result_line(line)
+                        if row:
+                            yield row
     r.raise_for_status()
-    return r.json()["choices"][0]["message"]["content"]
+    # 표 렌더링 등 소비자 쪽 시간도 포함된 전체 스트리밍 시간
+    record_stage("analyze", time.perf_counter() - start)
+    record_usage(usage, MODEL_NAME)
+    row = parse_result_line(buf)
+    if row:
+        yield row
+
+    if use_cache:
+        cache.set(key, "".join(full), model=MODEL_NAME)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+분석 기록 저장소 (SQLite)
+ - 분석할 때마다 URL, 언론사, 수집 시각, 본문 해시, 모델, 분석 항목/위험도를 한 행으로 기록
+ - 언론사·위험도·시각 복합 인덱스 → "이번 주 X 언론사 고위험 기사" 같은 조회가 인덱스 범위 탐색 한 번
+ - 페이지 조회는 OFFSET 대신 (fetched_at, id) 키셋 커서 → 뒤 페이지도 같은 속도
+ - 기간별 위험도 추이(trend)는 같은 인덱스로 집계, LLM 재호출 없음
+
+사용 예:
+    get_history_store().record(url, text, result)
+    page = get_history_store().query(publisher="kbs", risk="high", since=time.time() - 7 * 86400)
+    page.entries, page.next_cursor   # 다음 페이지: query(..., cursor=page.next_cursor)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from analyzer.canonical import canonical_url
+from analyzer.publishers import find_publisher
+from analyzer.result_cache import normalize_text
+from analyzer.result_model import TEXT_FIELDS, AnalysisResult, RiskLevel
+
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "1") != "0"
+HISTORY_PATH = os.getenv("HISTORY_PATH", os.path.join(".cache", "history.sqlite3"))
+HISTORY_PAGE_SIZE = 50
+
+_COLUMNS = ("id", "url", "publisher", "fetched_at", "text_hash", "text_length", "model",
+            "prompt_version", "status", "risk", *TEXT_FIELDS)
+HistoryEntry = namedtuple("HistoryEntry", _COLUMNS)
+HistoryPage = namedtuple("HistoryPage", "entries next_cursor")
+TrendRow = namedtuple("TrendRow", "day publisher low medium high unknown")
+
+# 위험도는 정수로 저장 (정렬/범위 조건이 가능하도록)
+_RISK_CODES = {RiskLevel.LOW: 1, RiskLevel.MEDIUM: 2, RiskLevel.HIGH: 3}
+_RISK_BY_CODE = {code: level for level, code in _RISK_CODES.items()}
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def publisher_for(url: str) -> str:
+    """등록된 언론사 이름, 없으면 호스트명"""
+    spec = find_publisher(url) if url else None
+    if spec is not None:
+        return spec.name
+    return (urlsplit(url).hostname or "").lower() or "unknown"
+
+
+def _risk_code(risk):
+    if risk is None or risk == "":
+        return None
+    return _RISK_CODES[RiskLevel(risk)]
+
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                f"""CREATE TABLE IF NOT EXISTS analyses (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    publisher TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    text_length INTEGER NOT NULL,
+                    model TEXT,
+                    prompt_version TEXT,
+                    status TEXT,
+                    risk INTEGER,
+                    {", ".join(f"{field} TEXT" for field in TEXT_FIELDS)}
+                )"""
+            )
+            # 조회 패턴별 인덱스 (모두 fetched_at, id 로 끝나서 최신순 키셋 페이지에 그대로 사용)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_analyses_time ON analyses (fetched_at, id)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_analyses_pub ON analyses (publisher, fetched_at, id)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_analyses_risk ON analyses (risk, fetched_at, id)")
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analyses_pub_risk ON analyses (publisher, risk, fetched_at, id)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_analyses_url ON analyses (url)")
+            self._db = db
+        return self._db
+
+    # ---------- 기록 ----------
+    def record(self, url: str, text: str, result, publisher: str = "", fetched_at=None,
+               model: str = "", prompt_version: str = "", status: str = "new") -> int:
+        """분석 한 번을 기록 (같은 URL 을 다시 분석하면 행이 추가됨). 반환값: 행 id"""
+        if not model or not prompt_version:
+            from analyzer import gpt_analyzer
+            model = model or gpt_analyzer.MODEL_NAME
+            prompt_version = prompt_version or gpt_analyzer.PROMPT_VERSION
+        result = AnalysisResult.coerce(result)
+        url = canonical_url(url)
+        row = (
+            url, publisher or publisher_for(url), fetched_at or time.time(), text_hash(text), len(text),
+            model, prompt_version, status, _risk_code(result.risk),
+            *(getattr(result, field) for field in TEXT_FIELDS),
+        )
+        with self._lock:
+            cur = self._conn().execute(
+                f"INSERT INTO analyses ({', '.join(_COLUMNS[1:])}) VALUES ({', '.join('?' * len(row))})", row
+            )
+        return cur.lastrowid
+
+    # ---------- 조회 ----------
+    @staticmethod
+    def _where(publisher, risk, since, until):
+        clauses, params = [], []
+        if publisher:
+            clauses.append("publisher = ?")
+            params.append(publisher)
+        if risk:
+            clauses.append("risk = ?")
+            params.append(_risk_code(risk))
+        if since is not None:
+            clauses.append("fetched_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("fetched_at < ?")
+            params.append(until)
+        return clauses, params
+
+    def query(self, publisher=None, risk=None, since=None, until=None,
+              limit=HISTORY_PAGE_SIZE, cursor=None) -> HistoryPage:
+        """
+        최신순 한 페이지. risk: "low"/"medium"/"high" 또는 RiskLevel, since/until: epoch 초.
+        cursor: 이전 페이지의 next_cursor (마지막 행의 (fetched_at, id)), 더 없으면 next_cursor 는 None
+        """
+        clauses, params = self._where(publisher, risk, since, until)
+        if cursor is not None:
+            clauses.append("(fetched_at, id) < (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM analyses {where} ORDER BY fetched_at DESC, id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn().execute(sql, (*params, limit + 1)).fetchall()
+        entries = [self._entry(r) for r in rows[:limit]]
+        next_cursor = (entries[-1].fetched_at, entries[-1].id) if len(rows) > limit else None
+        return HistoryPage(entries, next_cursor)
+
+    @staticmethod
+    def _entry(row) -> HistoryEntry:
+        entry = HistoryEntry(*row)
+        return entry._replace(risk=_RISK_BY_CODE.get(entry.risk))
+
+    def count(self, publisher=None, risk=None, since=None, until=None) -> int:
+        clauses, params = self._where(publisher, risk, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn().execute(f"SELECT COUNT(*) FROM analyses {where}", params).fetchone()[0]
+
+    def latest_for_url(self, url: str):
+        """같은 기사(대표 URL)의 가장 최근 기록 (없으면 None)"""
+        url = canonical_url(url)
+        with self._lock:
+            row = self._conn().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM analyses WHERE url = ? ORDER BY fetched_at DESC, id DESC LIMIT 1",
+                (url,),
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def trend(self, publisher=None, since=None, until=None) -> list:
+        """일자(현지 시각) × 언론사별 위험도 건수"""
+        clauses, params = self._where(publisher, None, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT date(fetched_at, 'unixepoch', 'localtime') AS day, publisher, "
+            "SUM(risk = 1), SUM(risk = 2), SUM(risk = 3), SUM(risk IS NULL) "
+            f"FROM analyses {where} GROUP BY day, publisher ORDER BY day, publisher"
+        )
+        with self._lock:
+            rows = self._conn().execute(sql, params).fetchall()
+        return [TrendRow(*r) for r in rows]
+
+    def publishers(self) -> list:
+        with self._lock:
+            rows = self._conn().execute("SELECT DISTINCT publisher FROM analyses ORDER BY publisher").fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+    return _store
+
+
+def record_analysis(url: str, text: str, result, publisher: str = "", fetched_at=None, status: str = "new"):
+    """분석 결과를 기록 (HISTORY_ENABLED=0 이면 아무 것도 하지 않음)"""
+    if not HISTORY_ENABLED or not url or result is None:
+        return None
+    return get_history_store().record(url, text, result, publisher=publisher,
+                                      fetched_at=fetched_at, status=status)
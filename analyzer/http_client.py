@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+공용 HTTP 전송 계층
+ - 프로세스 전체가 하나의 requests.Session 을 공유 (호스트별 커넥션 풀 + keep-alive)
+ - 5xx / 429 응답에 대해 지수 백오프 재시도 (Retry-After 준수)
+ - 기사/피드 수집용 세션(get_crawl_session)은 연결 실패만 한 번 재시도:
+   429/5xx 감속과 실패 집계는 호스트별 스케줄러(scheduler.py)가 맡아야 첫 응답부터 반응함
+ - 연결/읽기 타임아웃 분리
+ - http_get_streamed: 본문을 조금씩 읽으며 바이트 상한 / 호출자 조건(stop)에서 다운로드 중단
+ - 설정은 환경 변수로 조정 가능
+"""
+
+import codecs
+import os
+import re
+import threading
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))   # 호스트 풀 개수
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))           # 호스트당 커넥션 수
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+# 스트리밍 수집 시 응답 본문 상한 (압축 해제 후 바이트)
+HTTP_MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+HTTP_STREAM_CHUNK = 16 * 1024
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# response: 헤더/상태 (본문은 이미 소비됨), text: 읽은 만큼의 본문,
+# nbytes: 전송 바이트(압축 상태), truncated: 상한 도달, stopped: stop() 으로 조기 종료
+StreamedBody = namedtuple("StreamedBody", "response text nbytes truncated stopped")
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+_session = None
+_crawl_session = None
+_session_lock = threading.Lock()
+
+
+def _build_retry(crawl: bool = False) -> Retry:
+    if crawl:
+        # 같은 요청을 슬롯 하나 안에서 반복하지 않음 (429 를 네 번 보내거나 죽은 호스트에 40초씩 묶이지 않도록)
+        return Retry(
+            total=None, connect=1, read=0, status=0, other=0,
+            status_forcelist=(), allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+    return Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=HTTP_MAX_RETRIES,
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def build_session(crawl: bool = False) -> requests.Session:
+    """커넥션 풀과 재시도 정책이 설정된 새 세션 생성 (crawl=True 면 수집용 최소 재시도)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=_build_retry(crawl),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """프로세스 공용 세션 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def get_crawl_session() -> requests.Session:
+    """스케줄러를 거치는 기사/피드 수집용 세션 (재시도는 스케줄러와 서킷 브레이커가 담당)"""
+    global _crawl_session
+    if _crawl_session is None:
+        with _session_lock:
+            if _crawl_session is None:
+                _crawl_session = build_session(crawl=True)
+    return _crawl_session
+
+
+def http_get(url: str, headers=None, timeout=None, session=None, **kwargs) -> requests.Response:
+    """공용 세션(또는 session)으로 GET 요청 (timeout 미지정 시 (연결, 읽기) 기본값 사용)"""
+    session = session or get_session()
+    return session.get(url, headers=headers, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def _stream_encoding(r, head: bytes) -> str:
+    """Content-Type 의 charset → 문서 앞부분 <meta charset> → utf-8"""
+    if "charset" in (r.headers.get("Content-Type") or "").lower() and r.encoding:
+        return r.encoding
+    m = _META_CHARSET.search(head[:4096])
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def http_get_streamed(url: str, headers=None, timeout=None, max_bytes=None, stop=None,
+                      session=None) -> StreamedBody:
+    """
+    본문을 HTTP_STREAM_CHUNK 단위로 받아 디코딩하면서 stop(텍스트 조각) 을 호출.
+    stop 이 True 를 돌려주거나 max_bytes 를 넘으면 나머지는 받지 않고 연결을 닫는다.
+    2xx 가 아니면 본문을 읽지 않음 (text="")
+    """
+    max_bytes = HTTP_MAX_BODY_BYTES if max_bytes is None else max_bytes
+    session = session or get_session()
+    r = session.get(url, headers=headers, timeout=timeout or DEFAULT_TIMEOUT, stream=True)
+    if not 200 <= r.status_code < 300:
+        r.close()
+        return StreamedBody(r, "", 0, False, False)
+
+    parts, decoder, read = [], None, 0
+    truncated = stopped = False
+    try:
+        for chunk in r.iter_content(HTTP_STREAM_CHUNK):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(_stream_encoding(r, chunk))(errors="replace")
+            if read + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - read]
+                truncated = True
+            read += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if truncated:
+                break
+            if stop is not None and stop(text):
+                stopped = True
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+        raw = getattr(r, "raw", None)
+        nbytes = raw.tell() if raw is not None and hasattr(raw, "tell") else read
+    finally:
+        # 다 읽지 않은 응답은 커넥션을 풀에 돌려주지 못하고 끊는다 (남은 본문 수신보다 싸다)
+        r.close()
+    return StreamedBody(r, "".join(parts), nbytes, truncated, stopped)
+
+
+def close_session() -> None:
+    """공용 세션들과 커넥션 풀 정리"""
+    global _session, _crawl_session
+    with _session_lock:
+        for session in (_session, _crawl_session):
+            if session is not None:
+                session.close()
+        _session = _crawl_session = None
@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+새 기사 자동 수집 (RSS/Atom/뉴스 사이트맵 폴링)
+ - 언론사 규칙(publishers.py)의 feeds 주소를 주기적으로 확인해서 처음 보는 기사만 작업 큐에 넣음
+ - 피드마다 ETag/Last-Modified 를 저장해 조건부 GET → 바뀌지 않았으면 304 한 번으로 끝
+ - 사이트맵 인덱스는 lastmod 가 바뀐 하위 사이트맵만 다시 받음
+ - 본 적 있는 기사 키(canonical.py)는 SQLite 에 영구 저장, 앞단의 Bloom 필터로 처음 보는 기사는 DB 조회 없이 판정
+ - 작업 큐가 가득 차면 남은 URL 은 "본 것"으로 표시하지 않고 다음 주기에 다시 시도
+ - 피드 요청도 기사 수집과 같은 호스트별 스케줄러(scheduler.py)를 거침 (브레이커가 열린 언론사는 이번 주기 건너뜀)
+
+사용 예:
+    python -m analyzer.ingest --once                    # 한 번 확인하고 분석이 끝날 때까지 대기
+    python -m analyzer.ingest --interval 300            # 5분마다 확인
+    python -m analyzer.ingest --once --seed             # 현재 피드 내용은 분석 없이 "본 것"으로만 표시
+    python -m analyzer.ingest --interval 300 --service http://127.0.0.1:8080   # 분석 서비스로 제출
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+from analyzer.canonical import article_key, canonical_url
+from analyzer.http_client import get_crawl_session, get_session, http_get
+from analyzer.metrics import record_ingest
+from analyzer.publishers import PUBLISHERS, find_publisher
+from analyzer.scheduler import get_crawl_scheduler
+
+INGEST_PATH = os.getenv("INGEST_PATH", os.path.join(".cache", "ingest.sqlite3"))
+INGEST_INTERVAL = float(os.getenv("INGEST_INTERVAL", "300"))
+# 피드 하나에서 한 주기에 넣을 최대 기사 수 (나머지는 다음 주기)
+INGEST_MAX_NEW = int(os.getenv("INGEST_MAX_NEW", "50"))
+INGEST_BLOOM_CAPACITY = int(os.getenv("INGEST_BLOOM_CAPACITY", "1000000"))
+INGEST_BLOOM_ERROR = 0.001
+# 사이트맵 인덱스에서 따라갈 하위 사이트맵 수 상한 (최신순)
+MAX_CHILD_SITEMAPS = 5
+
+FeedLink = namedtuple("FeedLink", "url updated")
+IngestStats = namedtuple("IngestStats", "feeds not_modified errors links new submitted deferred")
+
+
+# -------------------------------------------------
+# Bloom 필터
+# -------------------------------------------------
+class BloomFilter:
+    """
+    확률적 집합: "없음"은 확실, "있음"은 error_rate 확률로 틀릴 수 있음.
+    해시 한 번(blake2b 128비트)을 둘로 나눠 k 개 위치를 만든다 (double hashing)
+    """
+
+    def __init__(self, capacity=INGEST_BLOOM_CAPACITY, error_rate=INGEST_BLOOM_ERROR, bits=None):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+# -------------------------------------------------
+# 본 URL / 피드 상태 저장소
+# -------------------------------------------------
+class SeenIndex:
+    """
+    본 적 있는 기사 URL (정확한 집합은 SQLite, 앞단에 Bloom 필터).
+    Bloom 비트는 save() 때 함께 저장하고, 행 수가 맞지 않으면 열 때 다시 만든다
+    """
+
+    def __init__(self, path=INGEST_PATH, capacity=INGEST_BLOOM_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._db = None
+        self._bloom = None
+        self.stats = {"bloom_negative": 0, "bloom_positive": 0, "false_positive": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS seen (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    publisher TEXT,
+                    source TEXT,
+                    first_seen REAL NOT NULL
+                ) WITHOUT ROWID"""
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_seen_time ON seen (first_seen)")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS feeds (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    lastmod TEXT,
+                    checked_at REAL
+                )"""
+            )
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS bloom (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    capacity INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    bits BLOB NOT NULL
+                )"""
+            )
+            self._db = db
+        return self._db
+
+    def _filter(self) -> BloomFilter:
+        """잠금 안에서 호출"""
+        if self._bloom is None:
+            db = self._conn()
+            rows = db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            saved = db.execute("SELECT capacity, count, bits FROM bloom WHERE id = 1").fetchone()
+            if saved is not None and saved[1] == rows and rows < saved[0]:
+                bloom = BloomFilter(saved[0], bits=saved[2])
+                bloom.count = rows
+            else:
+                bloom = self._rebuild(max(self.capacity, rows * 2))
+            self._bloom = bloom
+        return self._bloom
+
+    def _rebuild(self, capacity: int) -> BloomFilter:
+        bloom = BloomFilter(capacity)
+        for (key,) in self._conn().execute("SELECT key FROM seen"):
+            bloom.add(key)
+        return bloom
+
+    def filter_new(self, urls) -> list:
+        """처음 보는 기사의 대표 URL 만 (입력 순서 유지, 같은 기사의 변형 URL 은 하나로)"""
+        keys = {}
+        for url in urls:
+            keys.setdefault(article_key(url), canonical_url(url))
+        with self._lock:
+            bloom = self._filter()
+            maybe = [key for key in keys if key in bloom]
+            self.stats["bloom_negative"] += len(keys) - len(maybe)
+            self.stats["bloom_positive"] += len(maybe)
+            known = set()
+            db = self._conn()
+            for i in range(0, len(maybe), 500):
+                part = maybe[i:i + 500]
+                known.update(r[0] for r in db.execute(
+                    f"SELECT key FROM seen WHERE key IN ({', '.join('?' * len(part))})", part
+                ))
+            self.stats["false_positive"] += len(maybe) - len(known)
+        return [url for key, url in keys.items() if key not in known]
+
+    def add(self, urls, publisher: str = "", source: str = ""):
+        now = time.time()
+        rows = [(article_key(url), canonical_url(url), publisher, source, now) for url in urls]
+        if not rows:
+            return
+        with self._lock:
+            bloom = self._filter()
+            db = self._conn()
+            before, count = db.total_changes, bloom.count
+            db.execute("BEGIN")
+            db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?, ?, ?)", rows)
+            db.execute("COMMIT")
+            for row in rows:
+                bloom.add(row[0])
+            # 이미 있던 URL 은 행 수에 안 들어가므로 실제 추가된 행 수로 맞춤 (저장된 비트 재사용 판정용)
+            bloom.count = count + db.total_changes - before
+            if bloom.full:
+                self._bloom = self._rebuild(bloom.capacity * 2)
+
+    def __contains__(self, url: str) -> bool:
+        return not self.filter_new([url])
+
+    def save(self):
+        """Bloom 비트 저장 (다음 실행에서 전체 URL 을 다시 읽지 않도록)"""
+        with self._lock:
+            if self._bloom is None:
+                return
+            self._conn().execute(
+                "INSERT OR REPLACE INTO bloom VALUES (1, ?, ?, ?)",
+                (self._bloom.capacity, self._bloom.count, bytes(self._bloom.bits)),
+            )
+
+    def recent(self, limit: int = 20) -> list:
+        """최근에 발견한 기사 (대표 URL, publisher, first_seen)"""
+        with self._lock:
+            return self._conn().execute(
+                "SELECT url, publisher, first_seen FROM seen ORDER BY first_seen DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    # ---------- 피드 상태 ----------
+    def feed_state(self, url: str):
+        """(etag, last_modified, lastmod) 또는 None"""
+        with self._lock:
+            return self._conn().execute(
+                "SELECT etag, last_modified, lastmod FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+
+    def save_feed_state(self, url: str, etag=None, last_modified=None, lastmod=None):
+        with self._lock:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, lastmod, time.time()),
+            )
+
+    def close(self):
+        self.save()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_seen_index() -> SeenIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SeenIndex()
+    return _index
+
+
+# -------------------------------------------------
+# 피드 파싱
+# -------------------------------------------------
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(el, name: str) -> str:
+    for child in el:
+        if _local(child.tag) == name:
+            return (child.text or "").strip()
+    return ""
+
+
+def parse_feed(content: bytes):
+    """
+    RSS / Atom / 사이트맵 / 사이트맵 인덱스 → (is_index, [FeedLink]).
+    is_index 가 True 면 링크는 기사가 아니라 하위 사이트맵
+    """
+    root = ET.fromstring(content)
+    kind = _local(root.tag)
+    links = []
+    if kind in ("urlset", "sitemapindex"):
+        entry = "sitemap" if kind == "sitemapindex" else "url"
+        for el in root:
+            if _local(el.tag) == entry:
+                loc = _child_text(el, "loc")
+                if loc:
+                    links.append(FeedLink(loc, _child_text(el, "lastmod")))
+        return kind == "sitemapindex", links
+
+    for el in root.iter():
+        name = _local(el.tag)
+        if name == "item":             # RSS
+            link = _child_text(el, "link") or _child_text(el, "guid")
+            updated = _child_text(el, "pubDate")
+        elif name == "entry":          # Atom
+            link = ""
+            for child in el:
+                if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+                    link = child.get("href", "")
+                    break
+            updated = _child_text(el, "updated")
+        else:
+            continue
+        if link.startswith(("http://", "https://")):
+            links.append(FeedLink(link, updated))
+    return False, links
+
+
+# -------------------------------------------------
+# 폴링
+# -------------------------------------------------
+def feed_sources(publishers=None) -> list:
+    """[(언론사, 피드 URL)] (publishers 를 주면 그 언론사만)"""
+    return [
+        (spec.name, feed)
+        for spec in PUBLISHERS.values()
+        if not publishers or spec.name in publishers
+        for feed in spec.feeds
+    ]
+
+
+class Ingester:
+    """
+    피드 폴링 → 새 URL → submit(url) 호출.
+    submit 이 QueueFull 을 던지면 그 피드의 남은 URL 은 다음 주기로 미룬다
+    """
+
+    def __init__(self, index=None, sources=None, max_new=INGEST_MAX_NEW):
+        self.index = index or get_seen_index()
+        self.sources = feed_sources() if sources is None else list(sources)
+        self.max_new = max_new
+
+    def fetch_links(self, feed_url: str, publisher: str, updates: list, depth: int = 0):
+        """
+        피드 하나의 링크 목록, 바뀌지 않았으면 None.
+        새 ETag/lastmod 는 updates 에만 모아 두고, 링크를 모두 처리한 뒤 저장한다
+        (중간에 미뤄진 URL 이 있는데 저장하면 다음 주기에 304 로 놓치게 됨)
+        """
+        state = self.index.feed_state(feed_url)
+        headers = {}
+        if state is not None:
+            if state[0]:
+                headers["If-None-Match"] = state[0]
+            if state[1]:
+                headers["If-Modified-Since"] = state[1]
+        with get_crawl_scheduler().slot(feed_url) as slot:
+            r = http_get(feed_url, headers=headers, session=get_crawl_session())
+            slot.response(r)
+        if r.status_code == 304:
+            record_ingest("not_modified", publisher)
+            return None
+        r.raise_for_status()
+        is_index, links = parse_feed(r.content)
+        lastmod = state[2] if state is not None else None
+        record_ingest("fetched", publisher)
+        if not is_index:
+            updates.append((feed_url, r.headers.get("ETag"), r.headers.get("Last-Modified"), lastmod))
+            return links
+        if depth > 0:
+            return []
+
+        # 인덱스: lastmod 가 저장된 값과 다른 하위 사이트맵만 (최신순 상한)
+        articles = []
+        for child in sorted(links, key=lambda link: link.updated, reverse=True)[:MAX_CHILD_SITEMAPS]:
+            child_state = self.index.feed_state(child.url)
+            if child.updated and child_state is not None and child_state[2] == child.updated:
+                continue
+            child_updates = []
+            found = self.fetch_links(child.url, publisher, child_updates, depth + 1)
+            articles.extend(found or ())
+            etag, last_modified = child_updates[0][1:3] if child_updates else (child_state or (None, None))[:2]
+            updates.append((child.url, etag, last_modified, child.updated))
+        updates.append((feed_url, r.headers.get("ETag"), r.headers.get("Last-Modified"), lastmod))
+        return articles
+
+    def poll_once(self, submit=None, seed: bool = False) -> IngestStats:
+        """
+        모든 피드를 한 번 확인. submit(url) 이 없으면 새 기사 수만 세고 아무것도 저장하지 않음 (dry run),
+        seed=True 면 제출 없이 "본 것"으로만 표시
+        """
+        from analyzer.jobs import QueueFull
+
+        counts = dict.fromkeys(IngestStats._fields, 0)
+        for publisher, feed_url in self.sources:
+            counts["feeds"] += 1
+            updates = []
+            try:
+                links = self.fetch_links(feed_url, publisher, updates)
+            except Exception:
+                counts["errors"] += 1
+                record_ingest("error", publisher)
+                continue
+            if links is None:
+                counts["not_modified"] += 1
+                continue
+
+            # 피드에 섞인 다른 사이트 링크는 제외 (등록된 언론사 기사만)
+            urls = [link.url.strip() for link in links if find_publisher(link.url) is not None]
+            new = self.index.filter_new(urls)
+            counts["links"] += len(urls)
+            counts["new"] += len(new)
+            record_ingest("new", publisher, len(new))
+            if submit is None and not seed:
+                continue
+
+            accepted = new
+            if not seed:
+                accepted = []
+                for url in new[:self.max_new]:
+                    try:
+                        submit(url)
+                    except QueueFull:
+                        break
+                    accepted.append(url)
+                counts["submitted"] += len(accepted)
+                counts["deferred"] += len(new) - len(accepted)
+                record_ingest("submitted", publisher, len(accepted))
+                record_ingest("deferred", publisher, len(new) - len(accepted))
+            self.index.add(accepted, publisher, feed_url)
+            if len(accepted) == len(new):
+                for update in updates:
+                    self.index.save_feed_state(*update)
+        self.index.save()
+        return IngestStats(**counts)
+
+    def run(self, submit, interval=INGEST_INTERVAL, stop=None, on_cycle=None):
+        """stop(threading.Event)이 설정될 때까지 interval 초마다 poll_once"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            stats = self.poll_once(submit)
+            if on_cycle is not None:
+                on_cycle(stats)
+            stop.wait(interval)
+
+
+def service_submitter(base_url: str):
+    """분석 서비스(service.py)의 POST /jobs 로 제출하는 submit 함수 (503 → QueueFull)"""
+    from analyzer.jobs import QueueFull
+
+    endpoint = base_url.rstrip("/") + "/jobs"
+
+    def submit(url: str):
+        r = get_session().post(endpoint, json={"url": url}, timeout=10)
+        if r.status_code == 503:
+            raise QueueFull(r.text)
+        r.raise_for_status()
+        return r.json()
+
+    return submit
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="언론사 RSS/사이트맵에서 새 기사를 찾아 분석 작업으로 넣기")
+    parser.add_argument("--once", action="store_true", help="한 번만 확인")
+    parser.add_argument("--interval", type=float, default=INGEST_INTERVAL, help="확인 주기(초)")
+    parser.add_argument("--publisher", action="append", help="이 언론사만 (여러 번 지정 가능)")
+    parser.add_argument("--feed", action="append", default=[], help="추가 피드 URL (언론사는 링크 호스트로 판정)")
+    parser.add_argument("--max-new", type=int, default=INGEST_MAX_NEW, help="피드당 한 주기 최대 제출 수")
+    parser.add_argument("--service", help="로컬 작업 큐 대신 분석 서비스 주소로 제출")
+    parser.add_argument("--seed", action="store_true", help="현재 피드 내용을 분석 없이 본 것으로 표시")
+    parser.add_argument("--dry-run", action="store_true", help="새 기사 수만 출력 (표시/제출 안 함)")
+    args = parser.parse_args(argv)
+
+    sources = feed_sources(args.publisher) + [("custom", feed) for feed in args.feed]
+    if not sources:
+        print("확인할 피드가 없습니다.", file=sys.stderr)
+        return 1
+    ingester = Ingester(sources=sources, max_new=args.max_new)
+
+    queue = None
+    if args.dry_run or args.seed:
+        submit = None
+    elif args.service:
+        submit = service_submitter(args.service)
+    else:
+        from analyzer.jobs import get_job_queue
+        queue = get_job_queue()
+        submit = queue.submit
+
+    def report(stats: IngestStats):
+        print(
+            f"[{time.strftime('%H:%M:%S')}] 피드 {stats.feeds}개 (변경 없음 {stats.not_modified}, "
+            f"오류 {stats.errors}) · 링크 {stats.links} · 새 기사 {stats.new} · "
+            f"제출 {stats.submitted} · 다음으로 미룸 {stats.deferred}",
+            file=sys.stderr,
+        )
+
+    try:
+        if args.once or args.dry_run or args.seed:
+            report(ingester.poll_once(submit, seed=args.seed))
+            if queue is not None:
+                queue.wait_idle()
+        else:
+            ingester.run(submit, interval=args.interval, on_cycle=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingester.index.close()
+        if queue is not None:
+            queue.shutdown(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
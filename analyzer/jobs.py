@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+기사 분석 백그라운드 작업 큐 (프로세스 전체 공유)
+ - 수집 → 정리 → 예비 판정 → 유사 기사 확인 → 분석(스트리밍) 을 작업 스레드에서 실행
+ - 같은 기사(기사 키, canonical.py)의 작업이 진행 중이거나 최근에 끝났으면 새로 만들지 않고 그 작업을 돌려줌
+   → 모바일/AMP/추적 파라미터가 붙은 URL 도 같은 작업
+   → 여러 사용자가 같은 기사를 열어도 수집/분석은 한 번
+ - 화면 쪽은 job.snapshot() 을 주기적으로 읽거나 job.wait_for_change() 로 갱신을 기다림
+ - 대기 작업이 JOB_MAX_PENDING 개를 넘으면 QueueFull
+ - URL 대신 본문(text)을 직접 넣으면 수집 단계 없이 분석 (같은 본문끼리 중복 제거)
+
+사용 예:
+    queue = get_job_queue()
+    job = queue.submit(url)
+    job.wait_for_change(version, timeout=1.0)
+"""
+
+import hashlib
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from analyzer.batch import MIN_ARTICLE_LENGTH
+from analyzer.canonical import article_key, canonical_url
+from analyzer.crawler_auto import get_article_text
+from analyzer.dedup import plan_analysis, remember_analysis, resolve_plan
+from analyzer.gpt_analyzer import analyze_bias_stream
+from analyzer.history import record_analysis
+from analyzer.metrics import record_job, trace
+from analyzer.normalize import normalize_article
+from analyzer.result_cache import normalize_text
+from analyzer.result_model import AnalysisResult
+from analyzer.triage import get_triage_model
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+# 끝난 작업을 보관하는 시간 (이 안에 같은 URL 을 요청하면 결과를 그대로 공유)
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "600"))
+JOB_MAX_FINISHED = 1000
+
+# 작업 상태
+QUEUED, CRAWLING, ANALYZING, DONE, FAILED = "queued", "crawling", "analyzing", "done", "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+
+class QueueFull(Exception):
+    """대기 작업이 너무 많음 (잠시 후 다시 요청)"""
+
+
+class Job:
+    """작업 하나의 진행 상태. 필드 변경은 update() 로만 하고 변경마다 version 이 올라간다"""
+
+    def __init__(self, job_id: str, url: str, text=None):
+        self.id = job_id
+        self.url = url
+        self.text = text            # 직접 받은 본문 (있으면 수집 생략)
+        self.state = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.rows = []              # 스트리밍 중 완성된 (항목명, 내용)
+        self.provisional = None     # TriageScore (사전 분류기가 있을 때)
+        self.result = None          # AnalysisResult
+        self.dedup = None           # "new" / "reused" / "diff"
+        self.duplicate_of = None
+        self.error = None
+        self.detail = None
+        self.timing = None          # metrics.Trace
+        self.version = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def update(self, **fields):
+        with self._cond:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._cond.notify_all()
+
+    def add_row(self, row):
+        with self._cond:
+            self.rows = self.rows + [row]     # 읽는 쪽이 잠금 없이 목록을 써도 되도록 교체
+            self.version += 1
+            self._cond.notify_all()
+
+    def wait_for_change(self, version: int, timeout=None) -> int:
+        """version 이후 변경이 있거나 끝날 때까지 대기, 현재 version 반환"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version or self.finished, timeout)
+            return self.version
+
+    def snapshot(self) -> dict:
+        """JSON 으로 내보낼 수 있는 현재 상태"""
+        with self._cond:
+            data = {
+                "id": self.id,
+                "url": self.url,
+                "state": self.state,
+                "version": self.version,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "rows": [list(r) for r in self.rows],
+                "dedup": self.dedup,
+                "duplicate_of": self.duplicate_of,
+            }
+            if self.provisional is not None:
+                data["provisional"] = {"risk": self.provisional.risk,
+                                       "confidence": round(self.provisional.confidence, 3)}
+            if self.result is not None:
+                data["result"] = self.result.to_dict()
+            if self.error is not None:
+                data["error"] = self.error
+            return data
+
+
+def run_article_job(job: Job):
+    """작업 스레드에서 기사 하나를 끝까지 처리 (app.py 의 예전 동기 처리와 같은 순서)"""
+    with trace() as timing:
+        try:
+            job.update(state=CRAWLING, started_at=time.time(), timing=timing)
+            fetched_at = time.time()
+            article = job.text if job.text is not None else get_article_text(job.url)
+            if not article or article.startswith("__ERROR__") or len(article) < MIN_ARTICLE_LENGTH:
+                job.update(state=FAILED, finished_at=time.time(),
+                           error="기사 본문을 충분히 가져오지 못했습니다.", detail=(article or "")[:300])
+                record_job(FAILED)
+                return
+
+            job.update(state=ANALYZING)
+            # 바이라인/저작권 문구/중복 문장 등을 빼고 분석 (토큰 절약)
+            cleaned = normalize_article(article, job.url)
+
+            # 로컬 사전 분류기(학습된 경우)로 예비 위험도를 먼저 알림
+            triage_model = get_triage_model()
+            if triage_model is not None:
+                job.update(provisional=triage_model.score([cleaned.text])[0])
+
+            # 이미 분석한 기사와 거의 같으면 결과 재사용 / 달라진 문장만 분석
+            plan = plan_analysis(cleaned.text)
+            if plan.status == "new":
+                for row in analyze_bias_stream(cleaned.text):
+                    job.add_row(row)
+                result = AnalysisResult.from_rows(job.rows)
+            else:
+                result = resolve_plan(plan)
+                job.update(rows=result.rows())
+
+            job.update(
+                state=DONE, finished_at=time.time(), result=result, dedup=plan.status,
+                duplicate_of=plan.match.url if plan.match is not None else None,
+            )
+            record_job(DONE)
+        except Exception as e:
+            job.update(state=FAILED, finished_at=time.time(), error=f"{type(e).__name__}: {e}")
+            record_job(FAILED)
+            return
+
+    # 중복 색인/기록 저장 실패가 이미 끝난(비용을 낸) 분석을 실패로 만들지 않도록 따로 처리
+    try:
+        if plan.status != "reused":
+            remember_analysis(job.url, cleaned.text, result)
+        record_analysis(job.url, cleaned.text, result, fetched_at=fetched_at, status=plan.status)
+    except Exception as e:
+        print(f"분석 기록 저장 실패 ({job.url}): {type(e).__name__}: {e}", file=sys.stderr)
+
+
+class JobQueue:
+    """
+    기사 키로 중복 제거되는 작업 큐 + 작업 스레드 풀.
+    runner(job) 가 실제 처리 함수 (기본: run_article_job)
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING,
+                 result_ttl=JOB_RESULT_TTL, runner=run_article_job):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._runner = runner
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._by_url = {}               # 기사 키 → 진행 중/최근 작업
+        self._by_id = OrderedDict()     # id → 작업 (오래된 순)
+        self._ids = itertools.count(1)
+        self.closed = False
+        self.stats = {"submitted": 0, "shared": 0, "rejected": 0}
+
+    @staticmethod
+    def _key(url: str, text=None) -> str:
+        if text is not None and not url:
+            return "text:" + hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return article_key(url)
+
+    def _expire(self, now: float):
+        """보관 시간이 지났거나 개수 상한을 넘은 끝난 작업 정리 (잠금 안에서 호출, 오래된 순)"""
+        for job in list(self._by_id.values()):
+            if not job.finished:
+                continue
+            if now - job.finished_at <= self.result_ttl and len(self._by_id) <= JOB_MAX_FINISHED:
+                continue
+            del self._by_id[job.id]
+            key = self._key(job.url, job.text)
+            if self._by_url.get(key) is job:
+                del self._by_url[key]
+
+    def pending(self) -> int:
+        """대기 + 실행 중 작업 수"""
+        return sum(1 for job in self._by_url.values() if not job.finished)
+
+    def submit(self, url: str = "", text=None) -> Job:
+        """
+        같은 URL(또는 본문)의 진행 중/최근 성공 작업이 있으면 그것을, 없으면 새 작업을 돌려준다.
+        text 를 주면 수집하지 않고 그 본문을 분석 (url 은 기록용, 생략 가능)
+        """
+        url = canonical_url(url) if url.strip() else ""
+        key = self._key(url, text)
+        with self._lock:
+            if self.closed:
+                raise QueueFull("queue is shutting down")
+            self._expire(time.time())
+            job = self._by_url.get(key)
+            if job is not None and job.state != FAILED:
+                self.stats["shared"] += 1
+                record_job("shared")
+                return job
+            if self.pending() >= self.max_pending:
+                self.stats["rejected"] += 1
+                record_job("rejected")
+                raise QueueFull(f"{self.pending()} jobs pending")
+            job = Job(f"{next(self._ids):x}-{int(time.time() * 1000):x}", url, text)
+            self._by_url[key] = job
+            self._by_id[job.id] = job
+            self.stats["submitted"] += 1
+            record_job("submitted")
+        self._pool.submit(self._runner, job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._by_id.get(job_id)
+
+    def find(self, url: str):
+        with self._lock:
+            return self._by_url.get(self._key(url))
+
+    def close(self):
+        """새 작업 접수 중단 (진행 중인 작업은 계속)"""
+        with self._lock:
+            self.closed = True
+
+    def wait_idle(self, timeout=None) -> bool:
+        """대기/실행 중 작업이 모두 끝날 때까지 대기. 시간 안에 끝나면 True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                running = [job for job in self._by_url.values() if not job.finished]
+            if not running:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            job = running[0]
+            job.wait_for_change(job.version, timeout=min(1.0, remaining) if remaining is not None else 1.0)
+
+    def shutdown(self, wait: bool = True):
+        self.close()
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+수집 → 분석 파이프라인 단계별 계측
+ - timed("fetch", publisher="kbs") 로 감싼 구간의 소요 시간을 히스토그램에 기록
+ - 다운로드 바이트 / 본문 길이 / 프롬프트·응답 토큰 수 집계
+ - trace() 안에서 실행하면 현재 요청의 단계별 내역도 따로 모아 줌 (UI 타이밍 패널용)
+ - render_prometheus() 로 Prometheus 텍스트 포맷 출력
+
+METRICS_ENABLED=0 이면 전역 집계는 끄고 trace() 내역만 남긴다.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LENGTH_BUCKETS = (200, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+def _label_key(label_names, labels) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in label_names)
+
+
+def _format_labels(label_names, values, extra=()) -> str:
+    pairs = [(n, v) for n, v in zip(label_names, values) if v != ""] + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Gauge:
+    """현재 값 (대기 작업 수 등) — 내보내기 직전에 set()"""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # 라벨 값 → [버킷별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.label_names, key, [("le", f"{bound:g}")])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _format_labels(self.label_names, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "nfa_stage_seconds", "파이프라인 단계별 소요 시간(초)", ("stage", "publisher", "outcome"),
+)
+DOWNLOAD_BYTES = Counter(
+    "nfa_download_bytes_total", "다운로드한 응답 본문 바이트 수", ("source", "publisher"),
+)
+ARTICLE_CHARS = Histogram(
+    "nfa_article_chars", "수집된 본문 글자 수", ("publisher",), buckets=LENGTH_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "nfa_llm_tokens_total", "LLM 사용 토큰 수 (API usage 기준)", ("kind", "model"),
+)
+
+NORMALIZE_SAVED = Counter(
+    "nfa_normalize_saved_total", "본문 정리로 줄어든 양 (kind=chars|tokens, 토큰은 추정치)", ("kind", "publisher"),
+)
+
+JOB_EVENTS = Counter(
+    "nfa_jobs_total", "작업 큐 이벤트 (submitted/shared/rejected/done/failed)", ("event",),
+)
+JOBS_PENDING = Gauge("nfa_jobs_pending", "대기 + 실행 중 작업 수")
+HTTP_REQUESTS = Counter(
+    "nfa_http_requests_total", "분석 서비스 HTTP 요청 수", ("route", "code"),
+)
+INGEST_EVENTS = Counter(
+    "nfa_ingest_total", "새 기사 수집 이벤트 (fetched/not_modified/error = 피드 수, new/submitted/deferred = 기사 수)",
+    ("event", "publisher"),
+)
+CRAWL_EVENTS = Counter(
+    "nfa_crawl_total", "수집 스케줄러 이벤트 (throttled = 429/403 감속, breaker_rejected = 브레이커로 거절)",
+    ("event", "host"),
+)
+BREAKER_OPEN = Gauge("nfa_breaker_open", "서킷 브레이커 열림 여부 (1 = 열림)", ("name",))
+
+_REGISTRY = [STAGE_SECONDS, DOWNLOAD_BYTES, ARTICLE_CHARS, LLM_TOKENS, NORMALIZE_SAVED,
+             JOB_EVENTS, JOBS_PENDING, HTTP_REQUESTS, INGEST_EVENTS, CRAWL_EVENTS, BREAKER_OPEN]
+
+
+# -------------------------------------------------
+# 요청 단위 추적 (현재 컨텍스트에서만 보임)
+# -------------------------------------------------
+class Trace:
+    """trace() 구간에서 기록된 단계별 내역"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ended = None
+        self.stages = []     # {"stage", "seconds", "publisher", "outcome"}
+        self.values = {}     # "download_bytes", "prompt_tokens" 등 누적값
+
+    def add(self, name, amount):
+        self.values[name] = self.values.get(name, 0) + amount
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.ended or time.perf_counter()) - self.started
+
+    def rows(self) -> list:
+        """UI 표시용: 단계별 (이름, 소요 ms) — 같은 단계는 합산, 첫 등장 순서 유지"""
+        merged = {}
+        for s in self.stages:
+            merged[s["stage"]] = merged.get(s["stage"], 0.0) + s["seconds"]
+        return [{"단계": k, "ms": round(v * 1000, 1)} for k, v in merged.items()]
+
+
+_current_trace = ContextVar("nfa_trace", default=None)
+
+
+@contextmanager
+def trace():
+    """with trace() as t: ... → t.stages / t.values 에 이 구간의 계측 내역이 쌓인다"""
+    t = Trace()
+    token = _current_trace.set(t)
+    try:
+        yield t
+    finally:
+        t.ended = time.perf_counter()
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+# -------------------------------------------------
+# 기록 함수
+# -------------------------------------------------
+class _Stage:
+    __slots__ = ("outcome", "seconds")
+
+    def __init__(self):
+        self.outcome = "ok"
+        self.seconds = 0.0      # with 블록이 끝난 뒤 채워짐
+
+
+@contextmanager
+def timed(stage: str, publisher: str = ""):
+    """
+    with timed("parse", publisher="kbs") as st:
+        ...
+        st.outcome = "empty"     # 필요하면 결과 라벨 지정 (예외 시 자동으로 "error")
+    """
+    st = _Stage()
+    start = time.perf_counter()
+    try:
+        yield st
+    except BaseException:
+        st.outcome = "error"
+        raise
+    finally:
+        st.seconds = time.perf_counter() - start
+        record_stage(stage, st.seconds, publisher, st.outcome)
+
+
+def record_stage(stage: str, seconds: float, publisher: str = "", outcome: str = "ok"):
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, stage=stage, publisher=publisher, outcome=outcome)
+    t = _current_trace.get()
+    if t is not None:
+        t.stages.append({"stage": stage, "seconds": seconds, "publisher": publisher, "outcome": outcome})
+
+
+def record_download(nbytes: int, source: str = "http", publisher: str = ""):
+    if METRICS_ENABLED:
+        DOWNLOAD_BYTES.inc(nbytes, source=source, publisher=publisher)
+    t = _current_trace.get()
+    if t is not None:
+        t.add("download_bytes", nbytes)
+
+
+def record_article(publisher: str, text: str):
+    if METRICS_ENABLED:
+        ARTICLE_CHARS.observe(len(text), publisher=publisher)
+    t = _current_trace.get()
+    if t is not None:
+        t.values["article_chars"] = len(text)
+
+
+def record_normalize(publisher: str, chars_saved: int, tokens_saved: int):
+    if METRICS_ENABLED:
+        NORMALIZE_SAVED.inc(chars_saved, kind="chars", publisher=publisher)
+        NORMALIZE_SAVED.inc(tokens_saved, kind="tokens", publisher=publisher)
+    t = _current_trace.get()
+    if t is not None:
+        t.add("chars_saved", chars_saved)
+        t.add("tokens_saved", tokens_saved)
+
+
+def record_usage(usage, model: str = ""):
+    """OpenAI 형식 usage({"prompt_tokens", "completion_tokens"}) 기록"""
+    if not usage:
+        return
+    t = _current_trace.get()
+    for kind in ("prompt", "completion"):
+        n = usage.get(f"{kind}_tokens")
+        if not isinstance(n, int):
+            continue
+        if METRICS_ENABLED:
+            LLM_TOKENS.inc(n, kind=kind, model=model)
+        if t is not None:
+            t.add(f"{kind}_tokens", n)
+
+
+def record_job(event: str):
+    if METRICS_ENABLED:
+        JOB_EVENTS.inc(event=event)
+
+
+def record_http(route: str, code: int):
+    if METRICS_ENABLED:
+        HTTP_REQUESTS.inc(route=route, code=code)
+
+
+def record_ingest(event: str, publisher: str = "", n: int = 1):
+    if METRICS_ENABLED and n:
+        INGEST_EVENTS.inc(n, event=event, publisher=publisher)
+
+
+def record_crawl(event: str, host: str = ""):
+    if METRICS_ENABLED:
+        CRAWL_EVENTS.inc(event=event, host=host)
+
+
+def set_breaker_state(name: str, is_open: bool):
+    if METRICS_ENABLED:
+        BREAKER_OPEN.set(int(is_open), name=name)
+
+
+# -------------------------------------------------
+# 내보내기
+# -------------------------------------------------
+def render_prometheus() -> str:
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str) -> None:
+    """node_exporter textfile collector 용 파일로 저장 (원자적 교체)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
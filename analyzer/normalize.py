@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+분석 전 본문 정리 (수집 → 정리 → 분석)
+ - 중복 문장 제거 (중첩 태그를 함께 수집하면서 생긴 반복 조각 포함)
+ - 공통 잡음 제거: 저작권/재배포 금지 문구, 기자 이메일, 바이라인, 사진 설명, 홍보 링크, 영상 크레디트
+ - 언론사별 잡음은 publishers.py 의 ExtractorSpec.boilerplate 에 선언
+ - 줄어든 글자 수 / 추정 토큰 수를 함께 반환
+
+사용 예:
+    result = normalize_article(text, url)
+    analyze_bias(result.text)
+"""
+
+import re
+from collections import namedtuple
+
+from analyzer.chunking import estimate_tokens, split_sentences
+from analyzer.metrics import record_normalize, timed
+from analyzer.publishers import find_publisher
+
+NormalizedText = namedtuple("NormalizedText", "text chars_saved tokens_saved dropped")
+
+# 문장 전체를 버리는 공통 패턴
+_BOILERPLATE = re.compile(
+    r"무단\s*(?:전재|복제|배포)|재배포\s*금지|저작권자\s*[(ⓒ©]|copyright\s*(?:by|[(ⓒ©]|\d{4})"
+    r"|all rights reserved|^[ⓒ©]\s*\S{1,20}$|[ⓒ©]\s*\S+\s*(?:무단|all rights)"
+    # ▶ 관련기사 / ☞ 바로가기 같은 짧은 링크형 줄만 (■ 소제목으로 시작하는 본문 문장은 남김)
+    r"|^[▶☞▷]\s*\S.{0,40}$|^(?:사진|그래픽|영상)\s*[=:]|제보하기|기사\s*제보|구독\s*하기|카카오톡\s*[:：@]",
+    re.I,
+)
+# 문장 일부만 지우는 공통 패턴
+_INLINE_NOISE = [
+    # (서울=연합뉴스) 홍길동 기자 = / [OO일보 홍길동 기자] 형태의 바이라인
+    re.compile(
+        r"\([^()=]{1,20}=(?:연합뉴스|뉴스1|뉴시스|[가-힣A-Za-z]{1,10}(?:뉴스|일보|신문|통신|방송))\)"
+        r"\s*(?:[가-힣]{2,4}\s*(?:기자|특파원)\s*=\s*)?"
+    ),
+    re.compile(r"\[[^\[\]]{0,20}[가-힣]{2,4}\s*(?:기자|특파원)\]"),
+    # 사진/자료 출처 괄호
+    re.compile(r"[(\[]\s*(?:사진|그래픽|자료|출처|이미지)\s*[=:][^)\]]{0,40}[)\]]"),
+    # 이메일
+    re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+    # 방송 크레디트 (촬영기자:홍길동/영상편집:김철수)
+    re.compile(r"(?:촬영기자|영상취재|영상편집|영상디자인|그래픽|자료조사|취재지원)\s*[:：]\s*[가-힣]{2,4}(?:\s*[/·,]\s*)?"),
+]
+# 본문 끝 "홍길동 기자" 같은 단독 바이라인
+_BYLINE_ONLY = re.compile(r"^[가-힣]{2,4}\s*(?:기자|특파원|논설위원|선임기자)\.?$")
+# [앵커] [앵커] 처럼 연달아 반복된 라벨
+_REPEATED_LABEL = re.compile(r"(\[[^\[\]]{1,10}\])(?:\s*\1)+")
+# get_text(strip=True) 로 붙어 버린 문장 경계 ("...합니다.다음 문장")
+_GLUED_SENTENCE = re.compile(r"(?<=[다요]\.)(?=[가-힣A-Za-z\"“‘'])")
+
+_MIN_DEDUPE_CHARS = 8   # 이보다 짧은 문장("네." 등)은 반복돼도 남김
+
+
+def _dedupe_key(sentence: str) -> str:
+    return re.sub(r"[\W_]+", "", sentence).lower()
+
+
+def _strip_repeated_prefix(sentence: str, recent: list) -> str:
+    """
+    중첩 태그 텍스트가 다음 문장 앞에 그대로 붙은 경우 ("B. B 다음 문장.") 앞부분 B 를 제거.
+    직전 문장(recent) 하나와 통째로 같은 단어 단위 접두어만 지운다
+    (일부만 겹치는 접두어는 실제 본문일 수 있으므로 남김)
+    """
+    recent_keys = {_dedupe_key(s) for s in recent}
+    words = sentence.split()
+    for k in range(len(words) - 1, 0, -1):
+        key = _dedupe_key(" ".join(words[:k]))
+        if len(key) < _MIN_DEDUPE_CHARS:
+            break
+        if key in recent_keys:
+            return " ".join(words[k:])
+    return sentence
+
+
+def _is_boilerplate(sentence: str, spec) -> bool:
+    if _BOILERPLATE.search(sentence) or _BYLINE_ONLY.match(sentence):
+        return True
+    return spec is not None and any(p.search(sentence) for p in spec.boilerplate_patterns)
+
+
+def strip_boilerplate(text: str, spec=None) -> NormalizedText:
+    """spec(ExtractorSpec 또는 None) 규칙으로 본문 정리"""
+    text = _REPEATED_LABEL.sub(r"\1", _GLUED_SENTENCE.sub(" ", text))
+    for pattern in _INLINE_NOISE:
+        text = pattern.sub(" ", text)
+
+    kept = []
+    seen = set()
+    dropped = 0
+    for sentence in split_sentences(text):
+        sentence = re.sub(r"\s+", " ", sentence).strip()
+        if not sentence or _is_boilerplate(sentence, spec):
+            dropped += 1
+            continue
+        key = _dedupe_key(sentence)
+        recent = kept[-3:]
+        if len(key) >= _MIN_DEDUPE_CHARS and (key in seen or sentence in " ".join(recent)):
+            dropped += 1
+            continue
+        sentence = _strip_repeated_prefix(sentence, recent)
+        seen.add(_dedupe_key(sentence))
+        kept.append(sentence)
+    return NormalizedText(" ".join(kept), 0, 0, dropped)
+
+
+def normalize_article(text: str, url: str = "") -> NormalizedText:
+    """
+    get_article_text 결과를 분석 전에 정리한다.
+    url 로 언론사를 찾아 해당 언론사 잡음 규칙도 적용. 정리 결과가 비면 원문을 그대로 돌려준다.
+    """
+    spec = find_publisher(url) if url else None
+    publisher = spec.name if spec is not None else "generic"
+    with timed("normalize", publisher):
+        result = strip_boilerplate(text, spec)
+        cleaned = result.text or text
+        chars_saved = len(text) - len(cleaned)
+        tokens_saved = estimate_tokens(text) - estimate_tokens(cleaned)
+    record_normalize(publisher, chars_saved, tokens_saved)
+    return NormalizedText(cleaned, chars_saved, tokens_saved, result.dropped)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 테스트용 OpenRouter 대역 서버 (API 키/과금 없이 서비스·일괄 분석 부하 테스트)
+ - /chat/completions 형식 요청에 고정 형식의 분석 결과로 응답
+ - response_format 이 있으면 JSON, stream=true 면 SSE, 그 외에는 '항목명: 내용' 텍스트
+ - 위험도는 프롬프트 해시로 정해서 같은 본문이면 항상 같은 결과
+ - STUB_LATENCY 초만큼 지연 (실제 LLM 응답 시간 흉내)
+
+사용 예:
+    python -m analyzer.openrouter_stub --port 8799
+    OPENROUTER_URL=http://127.0.0.1:8799/api/v1/chat/completions OPENROUTER_API_KEY=stub streamlit run app.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from analyzer.result_model import TEXT_FIELDS, AnalysisResult, RiskLevel
+
+STUB_LATENCY = float(os.getenv("STUB_LATENCY", "0.5"))
+
+
+def stub_result(prompt: str) -> AnalysisResult:
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    risk = list(RiskLevel)[digest[0] % len(RiskLevel)]
+    values = {field: f"(stub) {field} 분석" for field in TEXT_FIELDS}
+    values["risk_reason"] = f"(stub) 프롬프트 {len(prompt)}자 기준 임의 판정"
+    return AnalysisResult(risk=risk, extra=(), **values)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = STUB_LATENCY
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        prompt = (body.get("messages") or [{}])[-1].get("content", "")
+        result = stub_result(prompt)
+        content = result.to_json() if body.get("response_format") else result.to_text()
+        usage = {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2}
+        time.sleep(self.latency)
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for line in content.splitlines(keepends=True):
+                chunk = {"choices": [{"delta": {"content": line}}]}
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\ndata: [DONE]\n\n".encode())
+            return
+
+        data = json.dumps(
+            {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": usage},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_stub(host="127.0.0.1", port=0, latency=STUB_LATENCY):
+    """백그라운드 스레드로 대역 서버 시작 → (서버, chat completions URL)"""
+    handler = type("StubHandler", (_StubHandler,), {"latency": latency})
+    server = _StubServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="openrouter-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v1/chat/completions"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="로컬 테스트용 OpenRouter 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency", type=float, default=STUB_LATENCY)
+    args = parser.parse_args(argv)
+
+    handler = type("StubHandler", (_StubHandler,), {"latency": args.latency})
+    server = _StubServer((args.host, args.port), handler)
+    print(f"OpenRouter stub: http://{args.host}:{args.port}/api/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
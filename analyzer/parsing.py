@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+HTML 파서 추상화
+ - 파서 백엔드 선택: html.parser 또는 lxml(C 구현)
+ - 기사 컨테이너 셀렉터로 SoupStrainer 를 만들어 본문 서브트리만 파싱
+   (페이지 전체 DOM 을 만들지 않으므로 대형 포털 페이지에서 특히 빠름)
+
+ - 스트리밍 수집용 ContainerEndDetector: 받는 중인 HTML 에서 기사 컨테이너가 닫히는 순간을 감지
+   (이후 본문은 받을 필요 없음)
+
+HTML_PARSER 환경 변수: "html.parser"(기본) / "lxml" / "auto"(lxml 있으면 lxml)
+ - 서브트리 파싱은 백엔드와 무관하게 기존 추출 결과와 동일
+ - lxml 은 잘못 닫힌 <p> 등을 html.parser 와 다르게 복구하므로,
+   결과 동일성을 벤치마크로 확인한 뒤 켜는 것을 권장
+"""
+
+import os
+import re
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+HTML_PARSER = os.getenv("HTML_PARSER", "html.parser")
+
+
+def _resolve_backend(name: str) -> str:
+    if name != "auto":
+        return name
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+PARSER_BACKEND = _resolve_backend(HTML_PARSER)
+
+
+# -------------------------------------------------
+# 단순 셀렉터 → 파싱 단계 필터
+# -------------------------------------------------
+# tag / #id / .class / [attr] 조합만 지원 (하위 선택자 등은 서브트리 파싱 불가)
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:#[\w-]+|\.[\w-]+|\[[\w-]+\])*)$")
+_SELECTOR_PART = re.compile(r"#([\w-]+)|\.([\w-]+)|\[([\w-]+)\]")
+
+
+def _compile_simple(selector: str):
+    m = _SIMPLE_SELECTOR.match(selector.strip())
+    if not m or not selector.strip():
+        return None
+    tag = (m.group(1) or "").lower() or None
+    ids, classes, attrs = [], [], []
+    for id_, cls, attr in _SELECTOR_PART.findall(m.group(2)):
+        if id_:
+            ids.append(id_)
+        elif cls:
+            classes.append(cls)
+        else:
+            attrs.append(attr)
+    return tag, ids, classes, attrs
+
+
+def _attr_matches(compiled, name, attrs) -> bool:
+    tag, ids, classes, required = compiled
+    if tag and name != tag:
+        return False
+    attrs = attrs or {}
+    if ids and any(attrs.get("id") != i for i in ids):
+        return False
+    if classes:
+        value = attrs.get("class") or ""
+        have = value if isinstance(value, (list, tuple)) else value.split()
+        if any(c not in have for c in classes):
+            return False
+    return all(a in attrs for a in required)
+
+
+class ContainerStrainer(SoupStrainer):
+    """
+    기사 컨테이너 셀렉터 중 하나와 일치하는 요소(및 그 하위 전체)만 트리로 만든다.
+    bs4 4.12(search_tag) / 4.13+(allow_tag_creation) 모두 지원.
+    """
+
+    def __init__(self, compiled, extra=None):
+        super().__init__()
+        self._compiled = compiled
+        self._extra = extra
+
+    def _wanted(self, name, attrs) -> bool:
+        if any(_attr_matches(c, name, attrs) for c in self._compiled):
+            return True
+        return bool(self._extra and self._extra(name, attrs or {}))
+
+    # bs4 4.12
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self._wanted(markup_name, markup_attrs)
+
+    def search(self, markup):
+        return None
+
+    # bs4 4.13+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._wanted(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    @property
+    def excludes_everything(self):
+        return False
+
+
+def compile_strainer(selectors: str, extra=None):
+    """
+    "div.a, #b, div[data-x]" 형태의 셀렉터 목록 → ContainerStrainer.
+    하나라도 단순 셀렉터가 아니면 None (→ 전체 파싱으로 대체)
+    extra(name, attrs) 를 주면 해당 조건의 요소도 함께 보존한다.
+    """
+    compiled = [_compile_simple(s) for s in selectors.split(",")]
+    if any(c is None for c in compiled):
+        return None
+    return ContainerStrainer(compiled, extra)
+
+
+class ContainerEndDetector(HTMLParser):
+    """
+    feed(조각) 을 반복 호출하는 증분 파서. 셀렉터와 일치하는 요소가 열렸다가
+    같은 깊이에서 닫히고 그 안에 글자가 있었으면 closed=True (같은 이름의 중첩 태그는 깊이로 셈).
+    내용 없이 닫힌 요소(자리표시용 빈 div 등)는 무시하고 다음 일치 요소를 기다린다
+    """
+
+    def __init__(self, compiled):
+        super().__init__(convert_charrefs=False)
+        self._compiled = compiled
+        self._tag = None
+        self._depth = 0
+        self._has_text = False
+        self.closed = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._tag is None:
+            if any(_attr_matches(c, tag, dict(attrs)) for c in self._compiled):
+                self._tag, self._depth = tag, 1
+        elif tag == self._tag:
+            self._depth += 1
+
+    def handle_data(self, data):
+        if self._tag is not None and not self._has_text:
+            self._has_text = bool(data.strip())
+
+    def handle_endtag(self, tag):
+        if tag == self._tag and not self.closed:
+            self._depth -= 1
+            if self._depth == 0:
+                self.closed = self._has_text
+                if not self.closed:
+                    self._tag = None
+
+    def push(self, text: str) -> bool:
+        """조각 하나를 파싱하고 컨테이너가 닫혔는지 반환 (닫힌 뒤에는 파싱 생략)"""
+        if not self.closed:
+            self.feed(text)
+        return self.closed
+
+
+def compile_end_detector(selectors: str):
+    """
+    셀렉터 목록 → 매 요청마다 새 ContainerEndDetector 를 만드는 함수.
+    단순 셀렉터가 아니면 None (→ 조기 종료 없이 끝까지 수집)
+    """
+    compiled = [_compile_simple(s) for s in selectors.split(",")]
+    if any(c is None for c in compiled):
+        return None
+    return lambda: ContainerEndDetector(compiled)
+
+
+def make_soup(markup: str, parse_only=None) -> BeautifulSoup:
+    """설정된 백엔드로 BeautifulSoup 생성 (parse_only 로 서브트리만 파싱 가능)"""
+    return BeautifulSoup(markup, PARSER_BACKEND, parse_only=parse_only)
+
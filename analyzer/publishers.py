@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+언론사별 본문 추출 규칙 레지스트리
+ - 언론사마다 코드를 쓰지 않고 ExtractorSpec(호스트, 컨테이너 셀렉터, 제거 태그,
+   수집 태그, JSON 엔드포인트)만 등록하면 공용 추출 엔진이 처리
+ - 새 기사 자동 수집(ingest.py)용 RSS/뉴스 사이트맵 주소도 같은 규칙에 선언
+ - 기사 ID 규칙(article_id, article_url, canonical_host)으로 URL 변형을 하나의 기사 키로 묶음 (canonical.py)
+ - 셀렉터/서브트리 필터는 등록 시점에 한 번만 컴파일
+ - URL → 언론사 조회는 호스트 접미사 dict 조회 (if/elif 부분 문자열 검색 X)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import soupsieve
+
+from analyzer.fetch_cache import PUBLISHER_MAX_AGE
+from analyzer.parsing import compile_end_detector, compile_strainer
+
+
+@dataclass
+class ExtractorSpec:
+    name: str
+    hosts: Tuple[str, ...]                      # 호스트 접미사 (예: "chosun.com" → www/m 등 모두 포함)
+    # 본문 컨테이너 셀렉터 목록 (문서 순서상 첫 일치).
+    # 튜플이면 우선순위 그룹: 앞 그룹에서 못 찾을 때만 다음 그룹 시도
+    container: Union[str, Tuple[str, ...]]
+    strip: str = ""                             # 컨테이너 안에서 제거할 요소 셀렉터
+    collect: Tuple[str, ...] = ("p",)           # 텍스트를 모을 태그, 비어 있으면 컨테이너 전체 텍스트
+    skip_prefixes: Tuple[str, ...] = ()         # 이 문구로 시작하는 조각은 버림 (소문자 비교)
+    container_fallback: Optional[Callable] = None   # (tag 이름, attrs) → bool, 셀렉터 실패 시 대체 컨테이너
+    json_url: Optional[Callable] = None         # 기사 URL → JSON 엔드포인트 URL (없으면 None)
+    json_body_path: Tuple[str, ...] = ()        # JSON 안에서 본문 HTML 까지의 키 경로
+    json_min_length: int = 200                  # JSON 본문이 이보다 짧으면 HTML 로 재시도
+    max_age: Optional[float] = None             # 수집 캐시 max-age (초)
+    boilerplate: Tuple[str, ...] = ()           # 분석 전 정리 단계에서 버릴 문장 정규식 (normalize.py)
+    feeds: Tuple[str, ...] = ()                 # 새 기사 목록 RSS/Atom/뉴스 사이트맵 URL (ingest.py)
+    # URL 정규화 (canonical.py)
+    article_id: str = ""                        # 경로(+?쿼리)에서 기사 ID 를 뽑는 정규식 (첫 그룹)
+    article_url: str = ""                       # 기사 ID → 대표 URL 템플릿 ("{id}"), 없으면 경로 유지
+    canonical_host: str = ""                    # 모바일/AMP/맨 도메인 호스트를 바꿀 대표 호스트
+    keep_params: Tuple[str, ...] = ()           # 기사 URL 에서 남길 쿼리 파라미터 (나머지는 제거)
+
+    # 등록 시 한 번만 컴파일되는 값들
+    strainer: object = field(init=False, repr=False, default=None)
+    container_selectors: tuple = field(init=False, repr=False, default=())
+    strip_selector: object = field(init=False, repr=False, default=None)
+    boilerplate_patterns: tuple = field(init=False, repr=False, default=())
+    article_id_pattern: object = field(init=False, repr=False, default=None)
+    end_detector: object = field(init=False, repr=False, default=None)
+
+    def __post_init__(self):
+        self.hosts = tuple(h.lower().lstrip(".") for h in self.hosts)
+        groups = (self.container,) if isinstance(self.container, str) else tuple(self.container)
+        self.container_selectors = tuple(soupsieve.compile(g) for g in groups)
+        self.strip_selector = soupsieve.compile(self.strip) if self.strip else None
+        self.strainer = compile_strainer(", ".join(groups), extra=self.container_fallback)
+        self.boilerplate_patterns = tuple(re.compile(p, re.I) for p in self.boilerplate)
+        self.article_id_pattern = re.compile(self.article_id) if self.article_id else None
+        # 스트리밍 수집: 첫 우선순위 그룹의 컨테이너가 닫히면 나머지는 받지 않음
+        # (뒤 그룹은 앞 그룹이 없을 때만 쓰이므로 먼저 닫혀도 멈추면 안 됨)
+        self.end_detector = compile_end_detector(groups[0])
+
+
+PUBLISHERS = {}      # name → ExtractorSpec
+_HOST_INDEX = {}     # 호스트 접미사 → ExtractorSpec
+
+
+def register_publisher(spec: ExtractorSpec) -> ExtractorSpec:
+    """언론사 규칙 등록 (같은 이름이면 교체)"""
+    old = PUBLISHERS.get(spec.name)
+    if old is not None:
+        for host in old.hosts:
+            _HOST_INDEX.pop(host, None)
+    PUBLISHERS[spec.name] = spec
+    for host in spec.hosts:
+        _HOST_INDEX[host] = spec
+    if spec.max_age is not None:
+        PUBLISHER_MAX_AGE[spec.name] = spec.max_age
+    return spec
+
+
+def find_publisher(url: str) -> Optional[ExtractorSpec]:
+    """URL 의 호스트(및 상위 도메인)로 등록된 규칙 조회, 없으면 None"""
+    host = (urlsplit(url.strip()).hostname or "").lower()
+    # news.kbs.co.kr → kbs.co.kr → co.kr → kr 순으로 확인 (라벨 수만큼만 조회)
+    while host:
+        spec = _HOST_INDEX.get(host)
+        if spec is not None:
+            return spec
+        _, _, host = host.partition(".")
+    return None
+
+
+# -------------------------------------------------
+# 기본 등록 언론사
+# -------------------------------------------------
+# 섹션/연/월/일/기사 ID (ID 는 대문자+숫자, 대소문자 구분)
+_CHOSUN_ARTICLE = re.compile(r"chosun\.com/(?!__data/)(.+?)/(\d{4})/(\d{2})/(\d{2})/([A-Z0-9]{10,})/?(?:[?#]|$)")
+
+
+def _chosun_json_url(url: str):
+    m = _CHOSUN_ARTICLE.search(url)
+    if not m:
+        return None
+    section, year, month, day, article_id = m.groups()
+    return (
+        f"https://www.chosun.com/__data/fusion/cached/page/article/"
+        f"{section}/{year}/{month}/{day}/{article_id}.json"
+    )
+
+
+def _is_jam_content(name, attrs) -> bool:
+    return name == "div" and "jam_content" in (attrs.get("id") or "")
+
+
+CHOSUN = register_publisher(ExtractorSpec(
+    name="chosun",
+    hosts=("chosun.com",),
+    container="div.article-body, section.article-body, div[data-fusion-container]",
+    json_url=_chosun_json_url,
+    json_body_path=("props", "pageProps", "article", "body"),
+    feeds=(
+        "https://www.chosun.com/arc/outboundfeeds/rss/?outputType=xml",
+        "https://www.chosun.com/arc/outboundfeeds/news-sitemap/?outputType=xml",
+    ),
+    article_id=r"^/(?!__data/)[\w/-]+?/\d{4}/\d{2}/\d{2}/([A-Z0-9]{10,})/?$",
+    canonical_host="www.chosun.com",
+))
+
+_JTBC_STRIP = "script, iframe, figure, div.ad_area, .set_contents_image_ad, .set_contents_video_ad"
+
+JTBC = register_publisher(ExtractorSpec(
+    name="jtbc",
+    hosts=("jtbc.co.kr",),
+    container="#ijam_content, #article_content, #article_content_area, .article_content",
+    strip=_JTBC_STRIP,
+    collect=("p", "span", "b"),
+    skip_prefixes=("advertisement",),
+    container_fallback=_is_jam_content,
+    boilerplate=(r"^JTBC\s*[가-힣]{2,4}입니다", r"^\[?(?:JTBC\s*)?뉴스룸\]?$"),
+    feeds=("https://fs.jtbc.co.kr/RSS/newsflash.xml",),
+    article_id=r"(?i)(?:/article/|news_id=)NB(\d+)",
+    article_url="https://news.jtbc.co.kr/article/NB{id}",
+    canonical_host="news.jtbc.co.kr",
+))
+
+# Selenium 으로 렌더링된 JTBC 페이지 (호스트 등록 없이 엔진에서만 사용)
+JTBC_RENDERED = ExtractorSpec(
+    name="jtbc",
+    hosts=(),
+    container=("#ijam_content", "#article_content, .article_content, article"),
+    strip=_JTBC_STRIP,
+    collect=("p", "span", "b"),
+    skip_prefixes=("advertisement",),
+    boilerplate=JTBC.boilerplate,
+)
+
+HANI = register_publisher(ExtractorSpec(
+    name="hani",
+    hosts=("hani.co.kr",),
+    container="div.article-text, div.text, #article-text",
+    boilerplate=(r"^한겨레\s*(?:구독|후원|뉴스레터)",),
+    feeds=("https://www.hani.co.kr/rss/",),
+    article_id=r"^/arti/(?:[\w-]+/)*(\d+)\.html?$",
+    canonical_host="www.hani.co.kr",
+))
+
+KBS = register_publisher(ExtractorSpec(
+    name="kbs",
+    hosts=("kbs.co.kr",),
+    container="div.detail-body, div.detail_body, .view_cont",
+    boilerplate=(r"^KBS\s*뉴스\s*[가-힣]{2,4}입니다", r"^KBS\s*[가-힣]{2,4}입니다"),
+    # feeds 없음: KBS 가 공개하는 RSS 는 KBS World(world.kbs.co.kr) 기사 링크라서
+    # news.kbs.co.kr 본문 셀렉터/ncd 기사 ID 와 맞지 않음 (확인된 news.kbs.co.kr 피드/사이트맵 주소가 생기면 추가)
+    article_id=r"[?&]ncd=(\d+)",
+    article_url="https://news.kbs.co.kr/news/pc/view/view.do?ncd={id}",
+    canonical_host="news.kbs.co.kr",
+))
+
+MBC = register_publisher(ExtractorSpec(
+    name="mbc",
+    hosts=("imbc.com", "mbc.co.kr"),
+    container="div.news_cont, div.news_body, div#content",
+    boilerplate=(r"^MBC\s*뉴스\s*[가-힣]{2,4}입니다",),
+    feeds=("https://imnews.imbc.com/rss/news/news_00.xml",),
+    article_id=r"/article/(\d+_\d+)\.html?$",
+    canonical_host="imnews.imbc.com",
+))
+
+YONHAP = register_publisher(ExtractorSpec(
+    name="yonhap",
+    hosts=("yna.co.kr",),
+    container="div.story-news, article.story-news",
+    strip="script, iframe, figure, aside, div.comp-box, p.txt-copyright, p.adrs",
+    boilerplate=(r"^<?저작권자\(c\)\s*연합뉴스", r"^연합뉴스\s*(?:TV|앱)"),
+    feeds=("https://www.yna.co.kr/rss/news.xml",),
+    article_id=r"^/view/(AKR\d+)",
+    article_url="https://www.yna.co.kr/view/{id}",
+    canonical_host="www.yna.co.kr",
+))
+
+JOONGANG = register_publisher(ExtractorSpec(
+    name="joongang",
+    hosts=("joongang.co.kr",),
+    container="div#article_body, div.article_body",
+    strip="script, iframe, figure, div.ab_photo, div.ad_wrap",
+    article_id=r"^/article/(\d+)",
+    article_url="https://www.joongang.co.kr/article/{id}",
+    canonical_host="www.joongang.co.kr",
+))
+
+DONGA = register_publisher(ExtractorSpec(
+    name="donga",
+    hosts=("donga.com",),
+    container="section.news_view, div.article_txt",
+    strip="script, style, iframe, figure, div.articlePhotoC, div.view_ad06, div.a_ad",
+    collect=(),   # 본문이 <p> 없이 텍스트 노드 + <br> 로 구성
+    feeds=("https://rss.donga.com/total.xml",),
+    article_id=r"^/news/(?:[\w-]+/)*article/all/(\d{8}/\d+)",
+    canonical_host="www.donga.com",
+))
+
+SBS = register_publisher(ExtractorSpec(
+    name="sbs",
+    hosts=("sbs.co.kr",),
+    container="div.text_area, div.main_text",
+    strip="script, style, iframe, figure, div.ad_area",
+    collect=(),
+    boilerplate=(r"^SBS\s*[가-힣]{2,4}입니다", r"^\(?사진\s*=\s*SBS"),
+    feeds=("https://news.sbs.co.kr/news/SectionRssFeed.do?sectionId=01",),
+    article_id=r"[?&]news_id=(N\d+)",
+    article_url="https://news.sbs.co.kr/news/endPage.do?news_id={id}",
+    canonical_host="news.sbs.co.kr",
+))
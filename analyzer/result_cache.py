@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 분석 결과 캐시 (2단계)
+ - 1단계: 프로세스 메모리 LRU
+ - 2단계: 디스크 SQLite (프로세스 재시작/Streamlit rerun 후에도 유지)
+ - 키: sha256(모델명 + 프롬프트 템플릿 버전 + 정규화된 기사 본문)
+ - TTL + 개수 기반 축출, 적중/실패 카운터 제공
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", os.path.join(".cache", "analysis.sqlite3"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))   # 초, 0 이하면 무기한
+RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "512"))
+RESULT_CACHE_DISK_ENTRIES = int(os.getenv("RESULT_CACHE_DISK_ENTRIES", "50000"))
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화: 유니코드 NFC + 공백 압축"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def make_key(model: str, prompt_version: str, text: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, prompt_version, normalize_text(text)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """메모리 LRU + SQLite 2단계 캐시"""
+
+    def __init__(self, path=RESULT_CACHE_PATH, ttl=RESULT_CACHE_TTL,
+                 max_memory_entries=RESULT_CACHE_MEMORY_ENTRIES,
+                 max_disk_entries=RESULT_CACHE_DISK_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (value, expires_at)
+        self._db = None
+        self._writes_since_evict = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    # ---------- SQLite ----------
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL
+                )"""
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_results_expires ON results(expires_at)")
+            self._db = db
+        return self._db
+
+    def _expires_at(self, now: float):
+        return now + self.ttl if self.ttl and self.ttl > 0 else None
+
+    # ---------- 메모리 LRU ----------
+    def _memory_put(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # ---------- 공개 API ----------
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                value, expires_at = hit
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.stats["misses"] += 1
+                return None
+            self._conn().execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._memory_put(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+            return row[0]
+
+    def set(self, key: str, value: str, model: str = ""):
+        now = time.time()
+        expires_at = self._expires_at(now)
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+            self._conn().execute(
+                "INSERT OR REPLACE INTO results (key, model, value, created_at, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, now, now, expires_at),
+            )
+            self.stats["sets"] += 1
+            self._writes_since_evict += 1
+            # 매 쓰기마다 COUNT(*) 하지 않도록 일정 간격으로만 축출
+            if self._writes_since_evict >= 64:
+                self._evict_locked(now)
+
+    def evict(self) -> int:
+        """만료 항목 삭제 + 디스크 상한 초과분을 오래 안 쓴 순서로 삭제"""
+        with self._lock:
+            return self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float) -> int:
+        self._writes_since_evict = 0
+        db = self._conn()
+        removed = db.execute(
+            "DELETE FROM results WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        (count,) = db.execute("SELECT COUNT(*) FROM results").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            removed += db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        self.stats["evictions"] += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn().execute("DELETE FROM results")
+
+    def snapshot(self) -> dict:
+        """적중/실패 카운터 + 적중률"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """프로세스 공용 결과 캐시"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+분석 결과 모델
+ - AnalysisResult: 6개 분석 항목 + 위험도(RiskLevel) 를 필드로 가진 작은 불변 객체 (__slots__)
+ - 구조화 출력(JSON schema) 응답은 한 번의 검증으로 변환
+ - JSON 이 아니면 기존 '항목명: 내용' 텍스트 파서로 대체 (이전 캐시/인덱스 결과도 그대로 읽힘)
+ - 캐시/인덱스에는 to_json(), 화면에는 rows() 사용
+
+사용 예:
+    result = AnalysisResult.parse(content)
+    result.risk is RiskLevel.HIGH
+    rows_to_html_table(result.rows(), risk=result.risk)
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Tuple
+
+from analyzer.formatter import parse_result_rows
+
+
+class RiskLevel(str, Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+    @property
+    def label(self) -> str:
+        return _LEVEL_LABELS[self]
+
+    @classmethod
+    def from_text(cls, value: str) -> Optional["RiskLevel"]:
+        """문장 안에서 가장 먼저 나오는 등급 표현 ('높음', 'medium' 등), 없으면 None"""
+        m = _LEVEL_PATTERN.search(value)
+        return _LEVEL_BY_WORD[m.group(0).lower()] if m else None
+
+
+_LEVEL_WORDS = {
+    RiskLevel.LOW: ("낮음", "낮다", "low"),
+    RiskLevel.MEDIUM: ("보통", "중간", "medium"),
+    RiskLevel.HIGH: ("높음", "높다", "high"),
+}
+_LEVEL_LABELS = {RiskLevel.LOW: "낮음", RiskLevel.MEDIUM: "보통", RiskLevel.HIGH: "높음"}
+_LEVEL_BY_WORD = {w: level for level, words in _LEVEL_WORDS.items() for w in words}
+# 영어 등급은 단어 단위로만 ("Below", "Highlight" 안의 low/high 는 등급이 아님)
+_LEVEL_PATTERN = re.compile(
+    "|".join(rf"\b{w}\b" if w.isascii() else w for w in _LEVEL_BY_WORD), re.I,
+)
+
+# (필드, 표에 보이는 항목명, 텍스트 결과에서 항목을 알아보는 단어) — 프롬프트 ANALYSIS_ITEMS 순서
+ITEMS = (
+    ("framing", "프레이밍 방식 및 관점", ("프레이밍", "관점")),
+    ("emotional", "감정적 표현 및 선동 요소", ("감정", "선동")),
+    ("fact_opinion", "사실과 의견 구분의 명확성", ("사실", "의견")),
+    ("balance", "정보의 균형성 및 누락 여부", ("균형", "누락")),
+    ("sources", "출처와 근거의 신뢰도", ("출처", "근거", "신뢰")),
+    ("risk_reason", "종합 위험도 평가", ("위험도",)),
+)
+TEXT_FIELDS = tuple(field for field, _, _ in ITEMS)
+
+# OpenRouter response_format (json_schema, strict)
+RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **{field: {"type": "string", "description": label} for field, label, _ in ITEMS},
+        "risk": {"type": "string", "enum": [level.value for level in RiskLevel]},
+    },
+    "required": [*TEXT_FIELDS, "risk"],
+    "additionalProperties": False,
+}
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "news_frame_analysis", "strict": True, "schema": RESULT_SCHEMA},
+}
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.S)
+# "높음 - 이유" / "**높음**: 이유" / "(높음) 이유" 의 앞쪽 등급 표기
+# 구분 기호만 지움 (\W 로 지우면 "높음 (감정적 표현 다수)" 의 여는 괄호까지 먹음)
+_LEVEL_SEP = r"[\s*\-–—:,.]*"
+_LEVEL_WORD = r"(?:낮음|보통|중간|높음|low\b|medium\b|high\b)"
+_LEADING_LEVEL = re.compile(
+    rf"^{_LEVEL_SEP}(?:\({_LEVEL_WORD}\)|\[{_LEVEL_WORD}\]|{_LEVEL_WORD}){_LEVEL_SEP}", re.I,
+)
+
+
+@dataclass(frozen=True)
+class AnalysisResult:
+    __slots__ = ("framing", "emotional", "fact_opinion", "balance", "sources",
+                 "risk", "risk_reason", "extra")
+
+    framing: str
+    emotional: str
+    fact_opinion: str
+    balance: str
+    sources: str
+    risk: Optional[RiskLevel]
+    risk_reason: str
+    extra: Tuple[Tuple[str, str], ...]    # 텍스트 결과에서 6개 항목에 안 맞는 행
+
+    # ---------- 변환 ----------
+    @classmethod
+    def from_json(cls, content: str) -> "AnalysisResult":
+        """구조화 출력 응답 (코드 블록/앞뒤 설명이 붙어 있어도 첫 JSON 객체) → 결과. 형식이 아니면 ValueError"""
+        m = _JSON_OBJECT.search(content)
+        if not m:
+            raise ValueError("no JSON object in response")
+        return cls.from_dict(json.loads(m.group(0)))
+
+    @classmethod
+    def from_dict(cls, data) -> "AnalysisResult":
+        if not isinstance(data, dict) or not any(k in data for k in (*TEXT_FIELDS, "risk")):
+            raise ValueError("not an analysis result object")
+        values = {}
+        for field in TEXT_FIELDS:
+            value = data.get(field, "")
+            if not isinstance(value, str):
+                raise ValueError(f"{field} must be a string")
+            values[field] = value.strip()
+        risk = data.get("risk")
+        if isinstance(risk, str):
+            try:
+                risk = RiskLevel(risk.strip().lower())
+            except ValueError:
+                risk = RiskLevel.from_text(risk)
+        elif risk is not None:
+            raise ValueError("risk must be a string")
+        if risk is None:
+            risk = RiskLevel.from_text(values["risk_reason"])
+        return cls(risk=risk, extra=(), **values)
+
+    @classmethod
+    def from_rows(cls, pairs) -> "AnalysisResult":
+        """(항목명, 내용) 목록 → 결과 (항목명 단어로 필드를 찾음, 위험도는 내용의 등급 표현)"""
+        values = dict.fromkeys(TEXT_FIELDS, "")
+        risk, extra = None, []
+        for key, value in pairs:
+            # 위험도 항목부터 확인 ('종합 위험도 평가 및 이유' 가 다른 단어와 겹치지 않도록)
+            field = next((f for f, _, words in reversed(ITEMS) if any(w in key for w in words)), None)
+            if field is None or values[field]:
+                extra.append((key, value))
+                continue
+            if field == "risk_reason":
+                risk = RiskLevel.from_text(value)
+                value = _LEADING_LEVEL.sub("", value, count=1) if risk is not None else value
+            values[field] = value
+        return cls(risk=risk, extra=tuple(extra), **values)
+
+    @classmethod
+    def from_text(cls, result_text: str) -> "AnalysisResult":
+        return cls.from_rows(parse_result_rows(result_text))
+
+    @classmethod
+    def parse(cls, content: str) -> "AnalysisResult":
+        """LLM 응답/캐시 값 → 결과. JSON 이면 검증 후 변환, 아니면 텍스트 파서"""
+        if content.lstrip().startswith(("{", "```")):
+            try:
+                return cls.from_json(content)
+            except ValueError:
+                pass
+        return cls.from_text(content)
+
+    @classmethod
+    def coerce(cls, value) -> "AnalysisResult":
+        """AnalysisResult / dict(batch JSONL) / 문자열(캐시, 이전 결과) 모두 허용"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls.from_dict(value)
+        return cls.parse(value or "")
+
+    # ---------- 출력 ----------
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in TEXT_FIELDS}
+        data["risk"] = self.risk.value if self.risk is not None else None
+        if self.extra:
+            data["extra"] = [list(pair) for pair in self.extra]
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def rows(self) -> list:
+        """표 렌더링용 (항목명, 내용) — 비어 있는 항목은 생략"""
+        pairs = []
+        for field, label, _ in ITEMS:
+            value = getattr(self, field)
+            if field == "risk_reason" and self.risk is not None:
+                value = f"{self.risk.label} - {value}" if value else self.risk.label
+            if value:
+                pairs.append((label, value))
+        return pairs + list(self.extra)
+
+    def to_text(self) -> str:
+        """기존 '항목명: 내용' 텍스트 형식 (갱신 분석 프롬프트 등)"""
+        return "\n".join(f"{k}: {v}" for k, v in self.rows())
+
+    def __str__(self) -> str:
+        return self.to_text()
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+호스트별 예의 있는 수집 스케줄러 + 서킷 브레이커
+ - 호스트마다 토큰 버킷 (초당 CRAWL_RATE 회, 순간 CRAWL_BURST 회까지)
+ - robots.txt 의 Crawl-delay / Request-rate 가 더 느리면 그 속도를 따름 (호스트당 한 번 조회, 하루 보관)
+ - 429/403 응답이면 그 호스트 속도를 절반으로 (Retry-After 가 있으면 그동안 멈춤),
+   성공이 이어지면 조금씩 원래 속도로 복귀 (AIMD)
+ - 호스트별 서킷 브레이커: 연속 실패(연결 오류/타임아웃/5xx/403)가 BREAKER_FAILURES 번이면
+   BREAKER_RESET 초 동안 요청 없이 바로 CircuitOpen → 죽은 언론사에 작업자가 10초씩 묶이지 않음
+ - 같은 브레이커를 OpenRouter 호출(gpt_analyzer, async_client)에도 사용
+
+사용 예:
+    with get_crawl_scheduler().slot(url) as slot:     # 토큰 대기, 브레이커가 열려 있으면 CircuitOpen
+        r = http_get(url, session=get_crawl_session())   # 재시도 없는 수집용 세션
+        slot.response(r)                              # 상태 코드 / Retry-After 반영
+    with get_breaker("openrouter").guard() as g:
+        r = requests.post(...)
+        g.status = r.status_code
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from analyzer.metrics import record_crawl, record_stage, set_breaker_state
+
+CRAWL_RATE = float(os.getenv("CRAWL_RATE", "2"))
+CRAWL_BURST = float(os.getenv("CRAWL_BURST", "4"))
+CRAWL_MIN_RATE = 0.05                   # 감속 하한 (20초에 한 번)
+CRAWL_RECOVER_STEP = 0.1                # 성공 한 번에 되찾는 속도 (목표 속도 대비 비율)
+CRAWL_MAX_PAUSE = 300                   # Retry-After 로 멈추는 최대 시간(초)
+ROBOTS_ENABLED = os.getenv("ROBOTS_ENABLED", "1") != "0"
+ROBOTS_TTL = 24 * 3600
+ROBOTS_USER_AGENT = os.getenv("ROBOTS_USER_AGENT", "news-frame-analyzer")
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "30"))
+# HALF_OPEN 시험 요청이 이 시간 안에 결과를 알리지 않으면 실패로 보고 다시 OPEN
+BREAKER_PROBE_TIMEOUT = float(os.getenv("BREAKER_PROBE_TIMEOUT", "60"))
+
+# 감속 대상 응답 (차단/과다 요청 신호)
+SLOWDOWN_STATUS = (403, 429)
+
+
+class CircuitOpen(Exception):
+    """브레이커가 열려 있어 요청하지 않음 (retry_in 초 뒤 다시 시도 가능)"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+# -------------------------------------------------
+# 토큰 버킷
+# -------------------------------------------------
+class TokenBucket:
+    """
+    초당 rate 개씩 채워지는 용량 burst 의 버킷 (스레드 공용).
+    reserve() 는 토큰을 미리 가져가고 기다릴 시간만 돌려줌 → 잠금을 쥔 채 잠들지 않고 도착 순서대로 분배
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# -------------------------------------------------
+# 서킷 브레이커
+# -------------------------------------------------
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """
+    연속 실패 failures 번 → OPEN (reset_timeout 초 동안 즉시 CircuitOpen)
+    → 시간이 지나면 HALF_OPEN: 시험 요청 하나만 통과, 성공하면 CLOSED / 실패하면 다시 OPEN
+    시험 요청이 probe_timeout 초 안에 결과를 알리지 않으면 (취소/유실) 실패로 보고 다시 OPEN
+    """
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET,
+                 probe_timeout: float = BREAKER_PROBE_TIMEOUT):
+        self.name = name
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self._count = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def before(self):
+        """요청 직전 호출. 열려 있으면 CircuitOpen"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == HALF_OPEN and self._probing and now - self._probe_started >= self.probe_timeout:
+                self._probing = False
+                self._opened_at = now
+                self._set(OPEN)
+            remaining = self._opened_at + self.reset_timeout - now
+            if self.state == OPEN and remaining <= 0:
+                self._set(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self._probe_started = now
+                return
+        record_crawl("breaker_rejected", self.name)
+        raise CircuitOpen(self.name, max(0.0, remaining))
+
+    def success(self):
+        with self._lock:
+            self._count = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set(CLOSED)
+
+    def failure(self):
+        with self._lock:
+            self._count += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self._count >= self.failures:
+                self._opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._set(OPEN)
+
+    def _set(self, state: str):
+        self.state = state
+        set_breaker_state(self.name, state == OPEN)
+
+    @contextmanager
+    def guard(self):
+        """
+        before() + 결과 기록. with 블록에서 g.status 에 HTTP 상태를 넣으면
+        5xx 는 실패, 그 밖의 응답은 성공 (서버는 살아 있음). 예외는 실패로 기록 후 다시 던짐.
+        스트리밍 응답을 with 블록 안에서 읽는 제너레이터를 소비자가 중간에 닫으면(GeneratorExit) 성공
+        """
+        self.before()
+        outcome = _Outcome()
+        try:
+            yield outcome
+        except GeneratorExit:
+            self.success()
+            raise
+        except BaseException:
+            self.failure()
+            raise
+        if outcome.status is not None and outcome.status >= 500:
+            self.failure()
+        else:
+            self.success()
+
+
+class _Outcome:
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = None
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """이름별 공용 브레이커 (예: "openrouter", 호스트명)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+# -------------------------------------------------
+# 호스트별 스케줄러
+# -------------------------------------------------
+def _retry_after_seconds(value) -> float:
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class HostState:
+    def __init__(self, host: str, rate: float, burst: float):
+        self.host = host
+        self.target_rate = rate         # robots.txt 반영 후 목표 속도
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = get_breaker(host)
+        self.robots_checked_at = None
+        self.lock = threading.Lock()
+
+
+class _Slot:
+    """slot() 안에서 응답을 알려 주는 객체"""
+    __slots__ = ("status", "retry_after")
+
+    def __init__(self):
+        self.status = None
+        self.retry_after = None
+
+    def response(self, r):
+        self.status = r.status_code
+        self.retry_after = r.headers.get("Retry-After")
+
+
+class CrawlScheduler:
+    def __init__(self, rate=CRAWL_RATE, burst=CRAWL_BURST, robots=ROBOTS_ENABLED):
+        self.rate = rate
+        self.burst = burst
+        self.robots = robots
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url: str) -> HostState:
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            with self._lock:
+                state = self._hosts.setdefault(host, HostState(host, self.rate, self.burst))
+        if self.robots:
+            self._check_robots(state, parts.scheme or "https")
+        return state
+
+    def _check_robots(self, state: HostState, scheme: str):
+        """robots.txt Crawl-delay/Request-rate → 목표 속도 (처음 호출한 스레드만 조회, 나머지는 대기)"""
+        now = time.time()
+        if state.robots_checked_at is not None and now - state.robots_checked_at < ROBOTS_TTL:
+            return
+        with state.lock:
+            if state.robots_checked_at is not None and now - state.robots_checked_at < ROBOTS_TTL:
+                return
+            rate = self.rate
+            delay = robots_delay(f"{scheme}://{state.host}/robots.txt")
+            if delay:
+                rate = min(rate, 1.0 / delay)
+            state.target_rate = rate
+            state.bucket.set_rate(min(state.bucket.rate, rate) if state.robots_checked_at else rate)
+            state.robots_checked_at = now
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        토큰을 받을 때까지 대기한 뒤 요청 구간을 실행. 브레이커가 열려 있으면 바로 CircuitOpen.
+        블록 안에서 slot.response(r) 로 응답을 알려 주면 감속/복귀와 브레이커에 반영
+        """
+        state = self.host(url)
+        state.breaker.before()
+        slot = _Slot()
+        try:
+            wait = state.bucket.reserve()
+            if wait > 0:
+                record_stage("crawl.wait", wait, state.host)
+                time.sleep(wait)
+            yield slot
+        except BaseException:
+            state.breaker.failure()
+            raise
+        self._observe(state, slot)
+
+    def _observe(self, state: HostState, slot: _Slot):
+        status = slot.status
+        if status in SLOWDOWN_STATUS:
+            # 곱셈 감속 + Retry-After 동안 정지
+            state.bucket.set_rate(max(CRAWL_MIN_RATE, state.bucket.rate / 2))
+            pause = min(CRAWL_MAX_PAUSE, _retry_after_seconds(slot.retry_after))
+            if pause:
+                state.bucket.pause(pause)
+            record_crawl("throttled", state.host)
+        elif state.bucket.rate < state.target_rate and (status is None or status < 400):
+            # 덧셈 복귀
+            state.bucket.set_rate(min(state.target_rate, state.bucket.rate + state.target_rate * CRAWL_RECOVER_STEP))
+
+        if status is not None and (status >= 500 or status == 403):
+            state.breaker.failure()
+        else:
+            state.breaker.success()
+
+    def rates(self) -> dict:
+        """호스트 → 현재 초당 요청 수"""
+        with self._lock:
+            return {host: state.bucket.rate for host, state in self._hosts.items()}
+
+
+def robots_delay(robots_url: str) -> float:
+    """robots.txt 의 Crawl-delay(또는 Request-rate 환산) 초, 없거나 조회 실패면 0"""
+    from analyzer.http_client import get_crawl_session, http_get
+
+    try:
+        r = http_get(robots_url, timeout=(3.05, 5), session=get_crawl_session())
+        if r.status_code != 200:
+            return 0.0
+        parser = RobotFileParser()
+        parser.parse(r.text.splitlines())
+    except Exception:
+        return 0.0
+    delay = parser.crawl_delay(ROBOTS_USER_AGENT) or 0
+    rate = parser.request_rate(ROBOTS_USER_AGENT)
+    if rate is not None and rate.requests:
+        delay = max(delay, rate.seconds / rate.requests)
+    return float(delay)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_crawl_scheduler() -> CrawlScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = CrawlScheduler()
+    return _scheduler
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+분석 HTTP 서비스 (Streamlit 없이 내부 도구가 호출하는 작업 API)
+ - POST /jobs            {"url": ...} / {"text": ..., "url": 선택} / {"urls": [...]} → 202 + 작업 id
+ - GET  /jobs/<id>        작업 상태/결과 (폴링)
+ - GET  /jobs/<id>/events 서버 전송 이벤트(SSE): 상태가 바뀔 때마다 작업 스냅샷, 끝나면 end
+ - GET  /metrics          Prometheus 텍스트 포맷 (metrics.py)
+ - GET  /healthz          정상 200, 종료 대기 중 503
+ - 부하 제한: 동시 연결 수 상한 + 작업 큐 대기 상한 → 넘으면 503 + Retry-After
+ - SIGTERM/SIGINT: 새 작업 접수를 멈추고 진행 중인 작업이 끝날 때까지(최대 SERVICE_DRAIN_TIMEOUT) 기다린 뒤 종료
+ - --stub: 내장 OpenRouter 대역 서버(openrouter_stub.py)로 API 키 없이 실행
+
+사용 예:
+    python -m analyzer.service --port 8080 --workers 32
+    python -m analyzer.service --stub
+    curl -XPOST localhost:8080/jobs -d '{"url": "https://news.kbs.co.kr/..."}'
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from analyzer import gpt_analyzer
+from analyzer.jobs import JobQueue, QueueFull
+from analyzer.metrics import JOBS_PENDING, record_http, render_prometheus
+
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "32"))
+SERVICE_MAX_PENDING = int(os.getenv("SERVICE_MAX_PENDING", "500"))
+SERVICE_MAX_CONNECTIONS = int(os.getenv("SERVICE_MAX_CONNECTIONS", "256"))
+SERVICE_DRAIN_TIMEOUT = float(os.getenv("SERVICE_DRAIN_TIMEOUT", "60"))
+SERVICE_RETRY_AFTER = 5           # 503 응답의 Retry-After (초)
+SERVICE_MAX_BULK = 200            # 일괄 제출 한 번의 최대 URL 수
+SERVICE_MAX_BODY = 2 * 1024 * 1024
+SSE_KEEPALIVE = 15.0
+
+_JOB_PATH = re.compile(r"^/jobs/([\w-]+)(/events)?$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "news-frame-analyzer"
+    service = None      # AnalysisService (서버마다 하위 클래스로 지정)
+
+    def log_message(self, *args):
+        pass
+
+    # ---------- 공통 ----------
+    def handle(self):
+        # 동시 연결 상한: 넘으면 요청을 읽자마자 503 (작업 스레드가 무한정 늘지 않도록)
+        if not self.service.connections.acquire(blocking=False):
+            self._overloaded_connection()
+            return
+        try:
+            super().handle()
+        finally:
+            self.service.connections.release()
+
+    def _overloaded_connection(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if self.parse_request():
+            self._send_json(503, {"error": "too many connections"}, route="overload",
+                            headers={"Retry-After": str(SERVICE_RETRY_AFTER)})
+
+    def _send(self, code: int, body: bytes, content_type: str, route: str, headers=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        record_http(route, code)
+
+    def _send_json(self, code: int, data, route: str, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self._send(code, body, "application/json; charset=utf-8", route, headers)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > SERVICE_MAX_BODY:
+            raise ValueError("request body too large")
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    # ---------- 라우팅 ----------
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/") or "/"
+        if path == "/healthz":
+            self._healthz()
+        elif path == "/metrics":
+            self._metrics()
+        else:
+            m = _JOB_PATH.match(path)
+            if m and m.group(2):
+                self._events(m.group(1))
+            elif m:
+                self._get_job(m.group(1))
+            else:
+                self._send_json(404, {"error": "not found"}, route="other")
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if path != "/jobs":
+            self._send_json(404, {"error": "not found"}, route="other")
+            return
+        if self.service.draining:
+            self._send_json(503, {"error": "shutting down"}, route="jobs",
+                            headers={"Retry-After": str(SERVICE_RETRY_AFTER)})
+            return
+        try:
+            data = self._read_json()
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)}, route="jobs")
+            return
+        if "urls" in data:
+            self._submit_bulk(data["urls"])
+        else:
+            self._submit_one(data)
+
+    # ---------- 핸들러 ----------
+    def _healthz(self):
+        queue = self.service.queue
+        code = 503 if self.service.draining else 200
+        self._send_json(code, {
+            "status": "draining" if self.service.draining else "ok",
+            "pending": queue.pending(),
+            "workers": queue.workers,
+        }, route="healthz")
+
+    def _metrics(self):
+        JOBS_PENDING.set(self.service.queue.pending())
+        self._send(200, render_prometheus().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8",
+                   route="metrics")
+
+    def _submit_one(self, data: dict):
+        url, text = data.get("url") or "", data.get("text")
+        if not isinstance(url, str) or (text is not None and not isinstance(text, str)) or not (url or text):
+            self._send_json(400, {"error": "'url' or 'text' is required"}, route="jobs")
+            return
+        try:
+            job = self.service.queue.submit(url, text)
+        except QueueFull as e:
+            self._send_json(503, {"error": "queue full", "detail": str(e)}, route="jobs",
+                            headers={"Retry-After": str(SERVICE_RETRY_AFTER)})
+            return
+        self._send_json(202, job.snapshot(), route="jobs", headers={"Location": f"/jobs/{job.id}"})
+
+    def _submit_bulk(self, urls):
+        if not isinstance(urls, list) or not all(isinstance(u, str) and u.strip() for u in urls):
+            self._send_json(400, {"error": "'urls' must be a list of URLs"}, route="jobs")
+            return
+        if len(urls) > SERVICE_MAX_BULK:
+            self._send_json(413, {"error": f"at most {SERVICE_MAX_BULK} URLs per request"}, route="jobs")
+            return
+        # 큐가 차면 나머지는 거절 목록으로 (받은 작업은 그대로 진행)
+        jobs, rejected = [], []
+        for url in urls:
+            try:
+                job = self.service.queue.submit(url)
+            except QueueFull:
+                rejected.append(url)
+                continue
+            jobs.append({"id": job.id, "url": job.url, "state": job.state})
+        code = 202 if jobs or not urls else 503
+        headers = {"Retry-After": str(SERVICE_RETRY_AFTER)} if rejected else None
+        self._send_json(code, {"jobs": jobs, "rejected": rejected}, route="jobs", headers=headers)
+
+    def _get_job(self, job_id: str):
+        job = self.service.queue.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": "unknown job"}, route="job")
+            return
+        self._send_json(200, job.snapshot(), route="job")
+
+    def _events(self, job_id: str):
+        job = self.service.queue.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": "unknown job"}, route="events")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        record_http("events", 200)
+        self.close_connection = True
+        version = -1
+        try:
+            while True:
+                current = job.version
+                if current != version:
+                    snapshot = job.snapshot()
+                    version = snapshot["version"]
+                    payload = json.dumps(snapshot, ensure_ascii=False)
+                    self.wfile.write(f"id: {version}\nevent: job\ndata: {payload}\n\n".encode("utf-8"))
+                    if job.finished:
+                        self.wfile.write(b"event: end\ndata: {}\n\n")
+                        self.wfile.flush()
+                        return
+                    self.wfile.flush()
+                if job.wait_for_change(version, timeout=SSE_KEEPALIVE) == version and not job.finished:
+                    # 프록시가 유휴 연결을 끊지 않도록 주석 줄
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # 기본 listen 대기열(5)로는 동시 요청이 몰리면 연결이 리셋됨
+    request_queue_size = 256
+
+
+class AnalysisService:
+    """HTTP 서버 + 작업 큐. serve_forever() 는 drain() 이 끝날 때까지 돌아온다"""
+
+    def __init__(self, host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS,
+                 max_pending=SERVICE_MAX_PENDING, max_connections=SERVICE_MAX_CONNECTIONS, queue=None):
+        self.queue = queue or JobQueue(workers=workers, max_pending=max_pending)
+        self.connections = threading.BoundedSemaphore(max_connections)
+        self.draining = False
+        handler = type("ServiceHandler", (_Handler,), {"service": self})
+        self.server = _Server((host, port), handler)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever(poll_interval=0.2)
+        finally:
+            self.server.server_close()
+
+    def drain(self, timeout=SERVICE_DRAIN_TIMEOUT) -> bool:
+        """새 작업 접수를 멈추고 진행 중인 작업을 기다린 뒤 서버 종료. 모두 끝났으면 True"""
+        self.draining = True
+        self.queue.close()
+        drained = self.queue.wait_idle(timeout)
+        # SSE 구독자가 마지막 상태를 받을 시간
+        time.sleep(0.2)
+        self.server.shutdown()
+        self.queue.shutdown(wait=drained)
+        return drained
+
+
+def use_stub_openrouter(latency=None):
+    """내장 OpenRouter 대역 서버를 띄우고 분석 호출이 그쪽을 보도록 설정"""
+    from analyzer.openrouter_stub import STUB_LATENCY, start_stub
+
+    _, url = start_stub(latency=STUB_LATENCY if latency is None else latency)
+    gpt_analyzer.OPENROUTER_URL = url
+    gpt_analyzer.OPENROUTER_API_KEY = gpt_analyzer.OPENROUTER_API_KEY or "stub"
+    return url
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="뉴스 기사 분석 HTTP 서비스 (작업 API)")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="동시에 처리할 작업 수")
+    parser.add_argument("--max-pending", type=int, default=SERVICE_MAX_PENDING, help="대기 작업 상한 (넘으면 503)")
+    parser.add_argument("--max-connections", type=int, default=SERVICE_MAX_CONNECTIONS)
+    parser.add_argument("--drain-timeout", type=float, default=SERVICE_DRAIN_TIMEOUT)
+    parser.add_argument("--stub", action="store_true", help="내장 OpenRouter 대역 서버 사용 (로컬 테스트)")
+    parser.add_argument("--stub-latency", type=float, help="대역 서버 응답 지연 (초)")
+    args = parser.parse_args(argv)
+
+    if args.stub:
+        print(f"OpenRouter stub: {use_stub_openrouter(args.stub_latency)}", file=sys.stderr)
+    service = AnalysisService(args.host, args.port, args.workers, args.max_pending, args.max_connections)
+
+    def on_signal(signum, frame):
+        if service.draining:
+            return
+        print(f"종료 요청: 진행 중인 작업 {service.queue.pending()}건을 기다립니다 "
+              f"(최대 {args.drain_timeout:g}s)", file=sys.stderr)
+        # serve_forever 가 도는 스레드에서 shutdown() 을 부르면 멈추므로 별도 스레드
+        threading.Thread(target=service.drain, args=(args.drain_timeout,), daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+    print(f"listening on {service.address} (workers={args.workers}, max_pending={args.max_pending})",
+          file=sys.stderr)
+    service.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+언론사 × 수집 전략별 성공률 기록
+ - 전략(예: http → selenium)은 비용이 싼 순서로 시도하는 것이 기본
+ - 충분히 시도했는데 성공률이 낮은 싼 전략은 뒤로 미뤄서 곧바로 다음 단계부터 시도
+ - 미룬 전략도 STRATEGY_EXPLORE_EVERY 번에 한 번은 원래 순서로 먼저 시도 (사이트가 복구됐는지 확인)
+ - 기록은 STRATEGY_DECAY 로 오래된 것부터 흐려짐 → 일시적인 장애로 미뤄진 전략도 다시 올라옴
+ - STRATEGY_STATS_PATH 가 있으면 JSON 으로 저장/복원
+"""
+
+import json
+import os
+import threading
+
+STRATEGY_STATS_PATH = os.getenv("STRATEGY_STATS_PATH", os.path.join(".cache", "strategy_stats.json"))
+STRATEGY_MIN_ATTEMPTS = int(os.getenv("STRATEGY_MIN_ATTEMPTS", "10"))
+STRATEGY_DEMOTE_BELOW = float(os.getenv("STRATEGY_DEMOTE_BELOW", "0.2"))
+STRATEGY_EXPLORE_EVERY = int(os.getenv("STRATEGY_EXPLORE_EVERY", "10"))
+# 기록 한 번마다 기존 값에 곱하는 비율 (0.95 → 최근 약 20회 위주)
+STRATEGY_DECAY = float(os.getenv("STRATEGY_DECAY", "0.95"))
+_SAVE_EVERY = 20
+
+
+class StrategyStats:
+    def __init__(self, path=STRATEGY_STATS_PATH, min_attempts=STRATEGY_MIN_ATTEMPTS,
+                 demote_below=STRATEGY_DEMOTE_BELOW, explore_every=STRATEGY_EXPLORE_EVERY,
+                 decay=STRATEGY_DECAY):
+        self.path = path
+        self.min_attempts = min_attempts
+        self.demote_below = demote_below
+        self.explore_every = explore_every
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._stats = {}   # (publisher, strategy) → {"attempts", "successes", "seconds"} (감쇠된 값)
+        self._orders = {}  # publisher → order() 호출 수
+        self._dirty = 0
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            for key, value in raw.items():
+                publisher, _, strategy = key.partition("/")
+                self._stats[(publisher, strategy)] = value
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            raw = {f"{p}/{s}": dict(v) for (p, s), v in self._stats.items()}
+            self._dirty = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def record(self, publisher: str, strategy: str, success: bool, seconds: float = 0.0):
+        with self._lock:
+            st = self._stats.setdefault((publisher, strategy), {"attempts": 0, "successes": 0, "seconds": 0.0})
+            st["attempts"] = st["attempts"] * self.decay + 1
+            st["successes"] = st["successes"] * self.decay + int(success)
+            st["seconds"] = st["seconds"] * self.decay + seconds
+            self._dirty += 1
+            should_save = self._dirty >= _SAVE_EVERY
+        if should_save:
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    def success_rate(self, publisher: str, strategy: str):
+        """기록이 없으면 None"""
+        with self._lock:
+            st = self._stats.get((publisher, strategy))
+        if not st or not st["attempts"]:
+            return None
+        return st["successes"] / st["attempts"]
+
+    def order(self, publisher: str, strategies) -> list:
+        """
+        strategies 는 비용이 싼 순서. 성공률이 낮다고 판명된 전략은 맨 뒤로 보낸다.
+        explore_every 번에 한 번은 원래 순서 그대로 (미룬 전략의 통계가 다시 쌓이도록)
+        """
+        preferred, demoted = [], []
+        with self._lock:
+            self._orders[publisher] = calls = self._orders.get(publisher, 0) + 1
+            if self.explore_every and calls % self.explore_every == 0:
+                return list(strategies)
+            for strategy in strategies:
+                st = self._stats.get((publisher, strategy))
+                if (st and st["attempts"] >= self.min_attempts
+                        and st["successes"] / st["attempts"] < self.demote_below):
+                    demoted.append(strategy)
+                else:
+                    preferred.append(strategy)
+        # 모두 성공률이 낮으면 원래(비용) 순서 유지
+        return preferred + demoted if preferred else list(strategies)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for (publisher, strategy), st in self._stats.items():
+                attempts = st["attempts"]
+                out.setdefault(publisher, {})[strategy] = {
+                    "attempts": round(attempts, 1),
+                    "success_rate": st["successes"] / attempts if attempts else 0.0,
+                    "avg_seconds": st["seconds"] / attempts if attempts else 0.0,
+                }
+            return out
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_strategy_stats() -> StrategyStats:
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = StrategyStats()
+    return _stats
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 사전 분류기 (LLM 호출 전 위험도 예비 판정)
+ - 지금까지 쌓인 analyze_bias 결과(유사 기사 인덱스, batch --include-text JSONL)를 학습 데이터로 사용
+ - TF-IDF + 선형 모델 (scikit-learn, CPU 전용). 벡터화는 한 번, 항목별 분류기는 여러 개
+ - 결과 표의 '낮음/보통/높음' 표현이 있는 항목(종합 위험도, 감정적 표현 등)마다 분류기 학습
+ - score() 는 여러 본문을 한 번에 벡터화해서 예측 (초당 수천 건)
+
+TRIAGE_TOKENIZER:
+ - "char"(기본): 글자 2~4-gram. 형태소 분석 없이 빠름
+ - "okt": konlpy Okt 형태소 (JVM 필요, 정확도↑ 속도↓). konlpy 가 없으면 "char" 로 대체
+
+사용 예:
+    python -m analyzer.triage train --from-index --jsonl results.jsonl
+    python -m analyzer.triage score urls_texts.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from analyzer.result_model import AnalysisResult, RiskLevel
+
+TRIAGE_MODEL_PATH = os.getenv("TRIAGE_MODEL_PATH", os.path.join(".cache", "triage.joblib"))
+TRIAGE_TOKENIZER = os.getenv("TRIAGE_TOKENIZER", "char")
+# 이 확신도 미만이거나 '높음' 예측이면 LLM 분석 대상
+TRIAGE_CONFIDENT = float(os.getenv("TRIAGE_CONFIDENT", "0.8"))
+TRIAGE_MIN_EXAMPLES = 30
+
+RISK_ITEM = "risk"
+
+TriageScore = namedtuple("TriageScore", "risk confidence probs items")
+LEVEL_NAMES = {"low": "낮음", "medium": "보통", "high": "높음"}
+
+
+# -------------------------------------------------
+# 라벨 추출
+# -------------------------------------------------
+def level_of(value: str):
+    """항목 내용에서 가장 먼저 나오는 등급 표현 → "low"/"medium"/"high", 없으면 None"""
+    level = RiskLevel.from_text(value)
+    return level.value if level is not None else None
+
+
+def _item_name(key: str) -> str:
+    """'6. 종합 위험도 평가' → 'risk', 그 외는 번호/공백 제거한 항목명"""
+    key = re.sub(r"^[\d.\s*#-]+", "", key).strip()
+    return RISK_ITEM if "위험도" in key else key
+
+
+def labels_from_result(result) -> dict:
+    """analyze_bias 결과 (AnalysisResult / batch JSONL dict / 텍스트) → {항목: 등급}"""
+    try:
+        result = AnalysisResult.coerce(result)
+    except ValueError:
+        return {}
+    labels = {}
+    if result.risk is not None:
+        labels[RISK_ITEM] = result.risk.value
+    for key, value in result.rows():
+        level = level_of(value)
+        if level is not None:
+            labels.setdefault(_item_name(key), level)
+    return labels
+
+
+# -------------------------------------------------
+# 학습 데이터
+# -------------------------------------------------
+def iter_index_examples(index=None):
+    """유사 기사 인덱스(dedup.py)에 저장된 (본문, 결과)"""
+    from analyzer.dedup import get_dedup_index
+
+    yield from (index or get_dedup_index()).iter_analyzed()
+
+
+def iter_jsonl_examples(path: str):
+    """batch --include-text 로 만든 JSONL 의 (본문, 결과)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("ok") and record.get("text") and record.get("result"):
+                yield record["text"], record["result"]
+
+
+# -------------------------------------------------
+# 모델
+# -------------------------------------------------
+class OktTokenizer:
+    """konlpy Okt 형태소 토크나이저 (모델과 함께 저장할 수 있도록 Okt 인스턴스는 지연 생성)"""
+
+    def __init__(self):
+        self._okt = None
+
+    def __call__(self, text):
+        if self._okt is None:
+            from konlpy.tag import Okt
+            self._okt = Okt()
+        return self._okt.morphs(text, norm=True, stem=True)
+
+    def __getstate__(self):
+        return {"_okt": None}
+
+
+def _okt_available() -> bool:
+    try:
+        import konlpy  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_vectorizer(tokenizer: str):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    common = dict(sublinear_tf=True, min_df=2, max_df=0.9, max_features=200000, dtype=np.float32)
+    if tokenizer == "okt" and _okt_available():
+        return TfidfVectorizer(tokenizer=OktTokenizer(), token_pattern=None, lowercase=False,
+                               ngram_range=(1, 2), **common), "okt"
+    return TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), **common), "char"
+
+
+class TriageModel:
+    def __init__(self, vectorizer, heads: dict, meta: dict):
+        self.vectorizer = vectorizer
+        self.heads = heads        # 항목 → LogisticRegression
+        self.meta = meta
+
+    @classmethod
+    def train(cls, examples, tokenizer=TRIAGE_TOKENIZER, min_examples=TRIAGE_MIN_EXAMPLES,
+              holdout=0.2, seed=0):
+        """
+        examples: (본문, analyze_bias 결과) 반복자.
+        항목마다 라벨이 min_examples 개 이상이고 2개 등급 이상 있을 때만 분류기를 만든다.
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        texts, labels = [], []
+        for text, result in examples:
+            item_labels = labels_from_result(result)
+            if item_labels:
+                texts.append(text)
+                labels.append(item_labels)
+        if len(texts) < min_examples:
+            raise ValueError(f"학습 데이터 부족: {len(texts)}건 (최소 {min_examples}건)")
+
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(texts))
+        n_test = int(len(texts) * holdout) if len(texts) >= 5 * min_examples else 0
+        test_idx, train_idx = order[:n_test], order[n_test:]
+
+        vectorizer, used_tokenizer = _build_vectorizer(tokenizer)
+        X_train = vectorizer.fit_transform([texts[i] for i in train_idx])
+        X_test = vectorizer.transform([texts[i] for i in test_idx]) if n_test else None
+
+        heads, report = {}, {}
+        items = Counter(k for item_labels in labels for k in item_labels)
+        for item in items:
+            rows = [j for j, i in enumerate(train_idx) if item in labels[i]]
+            y = [labels[train_idx[j]][item] for j in rows]
+            if len(rows) < min_examples or len(set(y)) < 2:
+                continue
+            clf = LogisticRegression(max_iter=1000, class_weight="balanced", C=4.0)
+            clf.fit(X_train[rows], y)
+            heads[item] = clf
+            if n_test:
+                test_rows = [j for j, i in enumerate(test_idx) if item in labels[i]]
+                if test_rows:
+                    pred = clf.predict(X_test[test_rows])
+                    truth = [labels[test_idx[j]][item] for j in test_rows]
+                    report[item] = {"accuracy": float(np.mean(pred == np.array(truth))), "n": len(test_rows)}
+        if RISK_ITEM not in heads:
+            raise ValueError("종합 위험도 라벨이 충분하지 않아 학습할 수 없습니다")
+
+        meta = {
+            "tokenizer": used_tokenizer,
+            "examples": len(texts),
+            "trained_at": time.time(),
+            "holdout": report,
+        }
+        return cls(vectorizer, heads, meta)
+
+    def save(self, path=TRIAGE_MODEL_PATH):
+        import joblib
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        joblib.dump({"vectorizer": self.vectorizer, "heads": self.heads, "meta": self.meta}, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=TRIAGE_MODEL_PATH):
+        import joblib
+
+        data = joblib.load(path)
+        return cls(data["vectorizer"], data["heads"], data["meta"])
+
+    def score(self, texts) -> list:
+        """본문 목록 → TriageScore 목록 (한 번에 벡터화)"""
+        texts = list(texts)
+        if not texts:
+            return []
+        X = self.vectorizer.transform(texts)
+        item_probs = {item: (clf.classes_, clf.predict_proba(X)) for item, clf in self.heads.items()}
+        classes, risk = item_probs[RISK_ITEM]
+        best = risk.argmax(axis=1)
+
+        out = []
+        for n in range(len(texts)):
+            items = {
+                item: str(cls_[p[n].argmax()])
+                for item, (cls_, p) in item_probs.items() if item != RISK_ITEM
+            }
+            out.append(TriageScore(
+                risk=str(classes[best[n]]),
+                confidence=float(risk[n, best[n]]),
+                probs={str(c): float(risk[n, k]) for k, c in enumerate(classes)},
+                items=items,
+            ))
+        return out
+
+
+def needs_llm(score: TriageScore, confident: float = TRIAGE_CONFIDENT) -> bool:
+    """확신이 낮거나 위험도 '높음'으로 예측되면 LLM 전체 분석 필요"""
+    return score.risk == "high" or score.confidence < confident
+
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+
+def get_triage_model(path=TRIAGE_MODEL_PATH):
+    """저장된 모델 (파일이 없거나 scikit-learn 이 없으면 None). 파일이 바뀌면 다시 읽음"""
+    global _model, _model_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _model_lock:
+        if _model is None or _model_mtime != mtime:
+            try:
+                _model = TriageModel.load(path)
+            except (ImportError, OSError, ValueError, KeyError):
+                return None
+            _model_mtime = mtime
+        return _model
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="로컬 위험도 사전 분류기 학습/평가")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_train = sub.add_parser("train", help="누적된 분석 결과로 학습")
+    p_train.add_argument("--jsonl", action="append", default=[], help="batch --include-text 결과 (여러 번 지정 가능)")
+    p_train.add_argument("--from-index", action="store_true", help="유사 기사 인덱스에 저장된 결과 사용")
+    p_train.add_argument("--tokenizer", choices=["char", "okt"], default=TRIAGE_TOKENIZER)
+    p_train.add_argument("-o", "--output", default=TRIAGE_MODEL_PATH)
+
+    p_score = sub.add_parser("score", help="JSONL 의 text 필드를 일괄 예측")
+    p_score.add_argument("input", help="text 필드가 있는 JSONL ('-' 이면 stdin)")
+    p_score.add_argument("--model", default=TRIAGE_MODEL_PATH)
+    p_score.add_argument("--batch-size", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        def examples():
+            if args.from_index:
+                yield from iter_index_examples()
+            for path in args.jsonl:
+                yield from iter_jsonl_examples(path)
+
+        model = TriageModel.train(examples(), tokenizer=args.tokenizer)
+        model.save(args.output)
+        print(json.dumps(model.meta, ensure_ascii=False, indent=1), file=sys.stderr)
+        return 0
+
+    model = TriageModel.load(args.model)
+    fp = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    started, total = time.perf_counter(), 0
+    with fp:
+        batch = []
+        for line in itertools.chain(fp, [None]):
+            if line is not None:
+                record = json.loads(line)
+                if record.get("text"):
+                    batch.append(record)
+            if batch and (line is None or len(batch) >= args.batch_size):
+                for record, score in zip(batch, model.score(r["text"] for r in batch)):
+                    print(json.dumps({
+                        "url": record.get("url"), "risk": score.risk,
+                        "confidence": round(score.confidence, 3), "needs_llm": needs_llm(score),
+                    }, ensure_ascii=False))
+                total += len(batch)
+                batch = []
+    seconds = time.perf_counter() - started
+    print(f"{total}건 / {seconds:.2f}s ({total / seconds if seconds else 0:.0f}건/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,23 @@
 뉴스 분석기 (모바일 UI + 자동 크롤러)
  - 국내 주요 언론 본문 수집 및 편향 분석
  - 결과를 HTML 표로 시각화
+ - 수집/분석은 공유 작업 큐(analyzer/jobs.py)에서 실행, 화면은 진행 상황만 폴링
+ - 지난 분석 기록 조회 / 위험도 추이 (LLM 재호출 없음)
+ - 언론사 RSS/사이트맵에서 새로 발견한 기사 목록 (analyzer/ingest.py)
 """
 
+import time
+from datetime import datetime
+
 import streamlit as st
 import webbrowser
 from streamlit.components.v1 import html as st_html
 
-from analyzer.crawler_auto import get_article_text
-from analyzer.gpt_analyzer import analyze_bias
-from analyzer.formatter import result_to_html_table
+from analyzer.formatter import rows_to_html_table
+from analyzer.history import get_history_store
+from analyzer.ingest import Ingester, get_seen_index
+from analyzer.jobs import ANALYZING, CRAWLING, FAILED, QUEUED, JobQueue, QueueFull
+from analyzer.triage import LEVEL_NAMES
 
 # ------------------------------
 # 페이지 설정
@@ -93,19 +101,175 @@ analyze_btn = st.button("분석 시작")
 # ------------------------------
 # 분석 프로세스
 # ------------------------------
-if analyze_btn and url:
-    with st.spinner("기사 수집 중..."):
-        article = get_article_text(url)
+def show_timing(t):
+    """이번 요청의 단계별 소요 시간 / 다운로드 / 토큰 사용량"""
+    with st.expander(f"⏱ 단계별 소요 시간 (총 {t.total_seconds:.2f}초)"):
+        st.table(t.rows())
+        v = t.values
+        st.caption(
+            f"다운로드 {v.get('download_bytes', 0) / 1024:.1f} KB · "
+            f"본문 {v.get('article_chars', 0)}자 (정리로 {v.get('chars_saved', 0)}자, "
+            f"약 {v.get('tokens_saved', 0)}토큰 절감) · "
+            f"토큰 {v.get('prompt_tokens', 0)} + {v.get('completion_tokens', 0)}"
+        )
+
+
+@st.cache_resource
+def get_queue() -> JobQueue:
+    """모든 세션이 공유하는 작업 큐 (rerun/새 세션에서도 같은 객체)"""
+    return JobQueue()
+
+
+JOB_POLL_SECONDS = 0.7
+JOB_STATE_MESSAGES = {
+    QUEUED: "분석 대기 중...",
+    CRAWLING: "기사 수집 중...",
+    ANALYZING: "분석 중... 완료된 항목부터 표시됩니다.",
+}
+
 
-    if not article or article.startswith("__ERROR__") or len(article) < 200:
-        st.error("기사 본문을 충분히 가져오지 못했습니다. 다른 URL로 시도해 주세요.")
-        st.text(article[:300])
+def show_job(job) -> bool:
+    """작업 진행 상황/결과 표시. 아직 진행 중이면 True (다시 그려야 함)"""
+    if job.state == FAILED:
+        st.error(job.error or "분석에 실패했습니다. 다른 URL로 시도해 주세요.")
+        if job.detail:
+            st.text(job.detail)
+        return False
+
+    st.subheader("분석 결과")
+    if job.provisional is not None and not job.finished:
+        guess = job.provisional
+        st.info(
+            f"예비 위험도: {LEVEL_NAMES.get(guess.risk, guess.risk)} "
+            f"(로컬 모델 추정, 확신도 {guess.confidence:.0%})",
+            icon="🔎",
+        )
+    if not job.finished:
+        st.info(JOB_STATE_MESSAGES[job.state], icon="⏳")
+    elif job.dedup == "reused":
+        st.success(f"거의 같은 기사의 분석 결과를 재사용했습니다: {job.duplicate_of}")
+    elif job.dedup == "diff":
+        st.success(f"유사 기사({job.duplicate_of})와 달라진 문장만 반영해 분석했습니다.")
     else:
-        with st.spinner("분석 중..."):
-            result = analyze_bias(article)
         st.success("분석이 완료되었습니다.")
-        st.subheader("분석 결과")
-        st_html(result_to_html_table(result), height=520, scrolling=True)
+
+    rows = job.rows
+    if rows:
+        risk = job.result.risk if job.result is not None else None
+        st_html(rows_to_html_table(rows, risk=risk), height=520, scrolling=True)
+    if job.finished and job.timing is not None:
+        show_timing(job.timing)
+    return not job.finished
+
+
+# 분석은 작업 큐에서 실행 → 이 화면은 진행 상황만 주기적으로 다시 그림
+queue = get_queue()
+if analyze_btn and url:
+    try:
+        # 다른 사용자가 같은 기사를 분석 중이면 그 작업을 함께 봄
+        st.session_state.job_id = queue.submit(url).id
+    except QueueFull:
+        st.warning("분석 요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+
+job_id = st.session_state.get("job_id")
+current_job = queue.get(job_id) if job_id else None
+polling = show_job(current_job) if current_job is not None else False
+
+# ------------------------------
+# 새 기사 (RSS/사이트맵)
+# ------------------------------
+def show_ingested(limit=15):
+    """피드에서 새로 발견한 기사 목록. [새 기사 확인] 은 피드만 조건부 GET 으로 확인하고 새 기사만 큐에 넣음"""
+    index = get_seen_index()
+    with st.expander("🆕 새로 올라온 기사"):
+        if st.button("새 기사 확인"):
+            try:
+                stats = Ingester(index).poll_once(queue.submit)
+                st.caption(f"새 기사 {stats.new}건 중 {stats.submitted}건 분석 시작 (변경 없는 피드 {stats.not_modified}개)")
+            except Exception as e:
+                st.warning(f"피드 확인 실패: {e}")
+        for i, (article_url, publisher, first_seen) in enumerate(index.recent(limit)):
+            c1, c2 = st.columns([5, 1])
+            c1.caption(f"{datetime.fromtimestamp(first_seen).strftime('%m-%d %H:%M')} · {publisher}")
+            c1.markdown(f"[{article_url}]({article_url})")
+            if c2.button("보기", key=f"ingested-{i}"):
+                try:
+                    # 이미 분석 중/분석된 기사면 그 작업을 그대로 보여 줌
+                    st.session_state.job_id = queue.submit(article_url).id
+                    st.rerun()
+                except QueueFull:
+                    st.warning("분석 요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+
+
+show_ingested()
+
+# ------------------------------
+# 분석 기록
+# ------------------------------
+HISTORY_PERIODS = {"최근 1일": 1, "최근 7일": 7, "최근 30일": 30, "전체": None}
+HISTORY_RISKS = {"전체": None, "높음": "high", "보통": "medium", "낮음": "low"}
+
+
+def show_history():
+    """언론사/위험도/기간으로 지난 분석 결과 조회 (키셋 페이지) + 일자별 위험도 추이"""
+    store = get_history_store()
+    with st.expander("📚 분석 기록"):
+        c1, c2, c3 = st.columns(3)
+        publisher = c1.selectbox("언론사", ["전체", *store.publishers()])
+        risk = c2.selectbox("위험도", list(HISTORY_RISKS))
+        period = c3.selectbox("기간", list(HISTORY_PERIODS), index=1)
+        days = HISTORY_PERIODS[period]
+        filters = dict(
+            publisher=None if publisher == "전체" else publisher,
+            risk=HISTORY_RISKS[risk],
+            since=time.time() - days * 86400 if days else None,
+        )
+        # 조건이 바뀌면 첫 페이지부터 (since 는 rerun 마다 달라지므로 기간 이름으로 비교)
+        signature = (filters["publisher"], filters["risk"], period)
+        if st.session_state.get("history_filters") != signature:
+            st.session_state.history_filters = signature
+            st.session_state.history_cursors = [None]
+        cursors = st.session_state.history_cursors
+
+        page = store.query(cursor=cursors[-1], **filters)
+        st.caption(f"조건에 맞는 분석 {store.count(**filters)}건 · {len(cursors)}페이지")
+        st.dataframe(
+            [
+                {
+                    "시각": datetime.fromtimestamp(e.fetched_at).strftime("%m-%d %H:%M"),
+                    "언론사": e.publisher,
+                    "위험도": e.risk.label if e.risk is not None else "-",
+                    "이유": e.risk_reason,
+                    "URL": e.url,
+                }
+                for e in page.entries
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+        prev_col, next_col = st.columns(2)
+        if len(cursors) > 1 and prev_col.button("이전 페이지"):
+            cursors.pop()
+            st.rerun()
+        if page.next_cursor is not None and next_col.button("다음 페이지"):
+            cursors.append(page.next_cursor)
+            st.rerun()
+
+        trend = {}
+        for row in store.trend(publisher=filters["publisher"], since=filters["since"]):
+            day = trend.setdefault(row.day, {"낮음": 0, "보통": 0, "높음": 0})
+            day["낮음"] += row.low
+            day["보통"] += row.medium
+            day["높음"] += row.high
+        if trend:
+            st.caption("일자별 위험도 추이")
+            st.bar_chart(
+                {"일자": list(trend), **{k: [d[k] for d in trend.values()] for k in ("낮음", "보통", "높음")}},
+                x="일자",
+            )
+
+
+show_history()
 
 # ------------------------------
 # 하단 안내
@@ -116,3 +280,8 @@ st.markdown("""
 © 2025 Park Tae-woong | Powered by OpenRouter.ai
 </p>
 """, unsafe_allow_html=True)
+
+# 진행 중인 작업이 있으면 잠시 후 다시 그림 (작업 자체는 백그라운드에서 계속)
+if polling:
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+오프라인 본문 추출 벤치마크
+ - benchmarks/fixtures 의 녹화된 HTML/JSON 을 공용 HTTP 세션에 가짜 어댑터로 연결해서
+   analyzer/crawler_auto.get_article_text 를 네트워크 없이 그대로 실행
+ - 각 기사를 거대한 포털형 페이지(메뉴/스크립트 잡음)로 감싼 케이스도 자동 생성
+ - 케이스별 초당 기사 수, p50/p95 지연, 최대 메모리, 골든 결과 일치 여부 출력
+
+사용 예:
+    python -m benchmarks.bench_extractors                     # 기본 실행 (케이스당 20회)
+    python -m benchmarks.bench_extractors --parser lxml       # 파서 백엔드 비교
+    python -m benchmarks.bench_extractors --json out.json     # 결과 저장
+    python -m benchmarks.bench_extractors --compare out.json  # 이전 결과와 p50 비교
+    python -m benchmarks.bench_extractors --update-golden     # 골든 결과 재기록
+"""
+
+import os
+import sys
+
+# analyzer 모듈이 import 시점에 읽는 설정 (캐시/브라우저/통계 파일/수집 속도 제한 없이 순수 추출만 측정)
+os.environ.setdefault("FETCH_CACHE_ENABLED", "0")
+os.environ.setdefault("STRATEGY_STATS_PATH", "")
+os.environ.setdefault("CRAWL_RATE", "1e9")
+os.environ.setdefault("ROBOTS_ENABLED", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import io
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from analyzer import crawler_auto, parsing
+from analyzer.http_client import get_crawl_session, get_session
+from analyzer.publishers import find_publisher
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+GOLDEN = FIXTURES / "golden"
+
+
+class _Body(io.BytesIO):
+    """읽은 바이트 수를 기록하는 응답 본문 (닫힌 뒤에도 확인 가능)"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.read_bytes = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.read_bytes += len(data)
+        return data
+
+
+class FixtureAdapter(BaseAdapter):
+    """URL → 녹화된 응답 본문 (없는 URL 은 404)"""
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+        self.bytes_read = []    # 응답 본문 (_Body.read_bytes = 실제로 받은 바이트)
+
+    def add(self, url: str, body: bytes, content_type: str):
+        self.routes[requests.Request("GET", url).prepare().url] = (body, content_type)
+
+    def send(self, request, **kwargs):
+        resp = requests.Response()
+        resp.request = request
+        resp.url = request.url
+        resp.encoding = "utf-8"
+        route = self.routes.get(request.url)
+        if route is None:
+            resp.status_code = 404
+            resp._content = b""
+            resp.headers = CaseInsensitiveDict()
+        else:
+            resp.status_code = 200
+            resp.raw = _Body(route[0])      # stream=True 요청도 조금씩 읽을 수 있도록
+            resp.headers = CaseInsensitiveDict({"Content-Type": route[1]})
+            self.bytes_read.append(resp.raw)
+        return resp
+
+    def close(self):
+        pass
+
+
+def portal_page(html: str, kb: int) -> str:
+    """기사 HTML 앞뒤에 포털형 잡음(메뉴, 링크 목록, 스크립트)을 kb 킬로바이트 정도 삽입"""
+    block = (
+        '<div class="portal-section"><h4>많이 본 뉴스</h4><ul>'
+        + "".join(f'<li><a href="/n/{i}">주요 뉴스 제목 {i}</a><span>12:0{i % 10}</span></li>' for i in range(40))
+        + "</ul><script>window.__ads = window.__ads || []; __ads.push({slot: 'side'});</script>"
+        '<p class="promo">구독하고 더 많은 기사를 받아보세요</p></div>'
+    )
+    repeat = max(1, kb * 1024 // (2 * len(block.encode("utf-8"))))
+    noise = block * repeat
+    head, sep, tail = html.partition("<body>")
+    if not sep:
+        return noise + html + noise
+    body, sep2, end = tail.rpartition("</body>")
+    return f"{head}<body>{noise}{body}{noise}{sep2}{end}"
+
+
+def load_cases(portal_kb: int) -> list:
+    manifest = json.loads((FIXTURES / "manifest.json").read_text(encoding="utf-8"))
+    cases = []
+    for case in manifest["cases"]:
+        case = dict(case, golden=case["name"])
+        case["body"] = (FIXTURES / case["html"]).read_text(encoding="utf-8")
+        cases.append(case)
+        if portal_kb > 0 and "json" not in case:
+            # URL 은 같고 응답만 다름 (URL 정규화가 쿼리 표시를 지우므로 실행 직전에 응답을 바꿔 끼움)
+            cases.append(dict(case, name=f"portal-{case['name']}", body=portal_page(case["body"], portal_kb)))
+    return cases
+
+
+def route_case(adapter: FixtureAdapter, case):
+    """이 케이스의 HTML(과 JSON) 응답을 연결 (같은 URL 의 이전 케이스 응답은 교체)"""
+    adapter.add(case["url"], case["body"].encode("utf-8"), "text/html; charset=utf-8")
+    if case.get("json"):
+        spec = find_publisher(case["url"])
+        json_url = spec.json_url(case["url"]) if spec and spec.json_url else None
+        if json_url:
+            body = (FIXTURES / case["json"]).read_bytes()
+            adapter.add(json_url, body, "application/json")
+
+
+def install_fixtures() -> FixtureAdapter:
+    adapter = FixtureAdapter()
+    for session in (get_session(), get_crawl_session()):
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return adapter
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_case(case, iterations: int, adapter: FixtureAdapter) -> dict:
+    url = case["url"]
+    # 메모리는 tracemalloc 오버헤드가 지연 측정을 왜곡하지 않도록 별도 1회 실행
+    adapter.bytes_read.clear()
+    tracemalloc.start()
+    text = crawler_auto.get_article_text(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    read_kb = sum(body.read_bytes for body in adapter.bytes_read) / 1024
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        crawler_auto.get_article_text(url)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+
+    golden_path = GOLDEN / f"{case['golden']}.txt"
+    golden = golden_path.read_text(encoding="utf-8") if golden_path.exists() else None
+    return {
+        "name": case["name"],
+        "page_kb": round(len(case["body"].encode("utf-8")) / 1024, 1),
+        "read_kb": round(read_kb, 1),
+        "articles_per_sec": iterations / total if total else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "peak_kb": peak / 1024,
+        "text_length": len(text),
+        "golden": None if golden is None else golden == text,
+        "text": text,
+    }
+
+
+def print_report(results, baseline=None):
+    base = {r["name"]: r for r in (baseline or [])}
+    header = f"{'case':<22}{'page KB':>9}{'read KB':>9}{'art/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'peak KB':>10}{'chars':>7}  golden"
+    if base:
+        header += "   p50 Δ"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        golden = {True: "ok", False: "MISMATCH", None: "-"}[r["golden"]]
+        line = (
+            f"{r['name']:<22}{r['page_kb']:>9.1f}{r.get('read_kb', r['page_kb']):>9.1f}{r['articles_per_sec']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['peak_kb']:>10.0f}{r['text_length']:>7}  {golden:<8}"
+        )
+        old = base.get(r["name"])
+        if old and old["p50_ms"]:
+            line += f" {100 * (r['p50_ms'] - old['p50_ms']) / old['p50_ms']:+7.1f}%"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="오프라인 본문 추출 벤치마크")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--portal-kb", type=int, default=1500, help="포털형 잡음 크기 (0 이면 생략)")
+    parser.add_argument("--parser", choices=["html.parser", "lxml"], help="파서 백엔드 강제 지정")
+    parser.add_argument("-k", "--filter", default="", help="이름에 이 문자열이 포함된 케이스만 실행")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    parser.add_argument("--compare", help="이전 --json 결과와 p50 비교")
+    parser.add_argument("--update-golden", action="store_true", help="현재 추출 결과로 골든 파일 갱신")
+    args = parser.parse_args(argv)
+
+    if args.parser:
+        parsing.PARSER_BACKEND = args.parser
+    crawler_auto.USE_SELENIUM_FOR_JTBC = False
+
+    cases = [c for c in load_cases(args.portal_kb) if args.filter in c["name"]]
+    adapter = install_fixtures()
+
+    if args.update_golden:
+        GOLDEN.mkdir(exist_ok=True)
+        for case in cases:
+            if case["golden"] == case["name"]:
+                route_case(adapter, case)
+                text = crawler_auto.get_article_text(case["url"])
+                (GOLDEN / f"{case['name']}.txt").write_text(text, encoding="utf-8")
+                print(f"golden 갱신: {case['name']} ({len(text)}자)")
+        return 0
+
+    print(f"parser={parsing.PARSER_BACKEND} iterations={args.iterations}\n")
+    results = []
+    for case in cases:
+        route_case(adapter, case)
+        results.append(run_case(case, args.iterations, adapter))
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+    print_report(results, baseline)
+
+    if args.json:
+        payload = {
+            "parser": parsing.PARSER_BACKEND,
+            "iterations": args.iterations,
+            "results": [{k: v for k, v in r.items() if k != "text"} for r in results],
+        }
+        Path(args.json).write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    mismatches = [r["name"] for r in results if r["golden"] is False]
+    if mismatches:
+        print(f"\n골든 불일치: {', '.join(mismatches)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,15 +5,13 @@
  - Chrome Headless 사용
 """
 
-import re, time
+import re
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+from analyzer.browser_pool import get_chrome_pool
 
 def clean_text(text):
     return re.sub(r"\s+", " ", text).strip()
@@ -21,23 +19,17 @@ def clean_text(text):
 def get_jtbc_article(url):
     """JTBC 뉴스 본문 수집 (Selenium 완전 렌더링)"""
     try:
-        # ✅ Chrome 설정
-        chrome_opts = Options()
-        chrome_opts.add_argument("--headless=new")
-        chrome_opts.add_argument("--disable-gpu")
-        chrome_opts.add_argument("--no-sandbox")
-        chrome_opts.add_argument("--log-level=3")
-
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_opts)
-        driver.get(url)
+        # ✅ 공용 Chrome 풀에서 브라우저 임대 (매번 새로 띄우지 않음)
+        with get_chrome_pool().lease() as driver:
+            driver.get(url)
 
-        # ✅ JS 렌더링 완료 대기
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#ijam_content"))
-        )
-        time.sleep(1.5)
+            # ✅ JS 렌더링 완료 대기
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#ijam_content p"))
+            )
+            page_source = driver.page_source
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        soup = BeautifulSoup(page_source, "html.parser")
         article = soup.select_one("#ijam_content")
 
         if not article:
@@ -55,8 +47,6 @@ def get_jtbc_article(url):
             if t and not t.lower().startswith("advertisement"):
                 texts.append(t)
 
-        driver.quit()
-
         text = clean_text(" ".join(texts))
         if len(text) < 100:
             return "__ERROR__: 본문 추출 실패 (짧음)"